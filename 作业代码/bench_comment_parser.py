@@ -0,0 +1,191 @@
+# 评论切分基准测试：对录制好的评论区转储逐平台统计解析速度（行/秒）和切分准确率
+# 转储目录约定：
+#   微博_xxx.txt            —— 从评论区复制出来的原始内容（文件名以平台名开头：微博/B站/抖音）
+#   微博_xxx.expected.txt   —— 可选，人工校对过的切分结果，每行一条评论
+# comment_dumps/里有各平台的小样例（已匿名化）；--check 另外核对新解析器与旧版规则逐条一致、且耗时随行数线性增长
+import argparse
+import os
+import random
+import re
+import time
+from collections import Counter, defaultdict
+import comment_parser
+from paste_ingest import EXPECTED_SUFFIX
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "comment_dumps")
+
+# ---------------------- 1. 收集转储 ----------------------
+def read_lines(path):
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def find_dumps(paths, platform=None):
+    """产出 (平台, 转储路径, 标注路径或None)；平台优先用--platform，否则从文件名开头识别"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            files.append(path)
+    for path in files:
+        name = os.path.basename(path)
+        if not name.lower().endswith(".txt") or name.endswith(EXPECTED_SUFFIX):
+            continue
+        plat = platform or next((p for p in comment_parser.PARSERS if name.startswith(p)), None)
+        if plat is None:
+            print(f"⚠️ 跳过 {name}：无法从文件名识别平台（请以微博/B站/抖音开头或指定--platform）")
+            continue
+        expected = path[:-len(".txt")] + EXPECTED_SUFFIX
+        yield plat, path, expected if os.path.exists(expected) else None
+
+
+# ---------------------- 2. 准确率 ----------------------
+def boundary_scores(predicted, expected):
+    """
+    按评论逐条比对（多重集合）：切对一条=解析出的评论与标注完全一致
+    :return: (精确率, 召回率, F1)
+    """
+    hit = sum((Counter(predicted) & Counter(expected)).values())
+    precision = hit / len(predicted) if predicted else 0.0
+    recall = hit / len(expected) if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+# ---------------------- 3. 跑基准 ----------------------
+def run_benchmark(paths, platform=None, repeat=3):
+    totals = defaultdict(lambda: {"files": 0, "lines": 0, "seconds": 0.0, "comments": 0,
+                                  "pred": [], "gold": []})
+    for plat, path, expected in find_dumps(paths, platform):
+        lines = read_lines(path)  # 先读进内存，只计解析耗时
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            comments = list(comment_parser.parse(plat, lines))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        t = totals[plat]
+        t["files"] += 1
+        t["lines"] += len(lines)
+        t["seconds"] += best
+        t["comments"] += len(comments)
+        if expected:
+            t["pred"].extend(comments)
+            t["gold"].extend(read_lines(expected))
+
+    if not totals:
+        print("❌ 没有找到可测试的转储文件")
+        return {}
+
+    print(f"\n{'平台':<6}{'文件':>6}{'行数':>10}{'评论':>8}{'行/秒':>12}{'精确率':>9}{'召回率':>9}{'F1':>9}")
+    print("-" * 70)
+    report = {}
+    for plat, t in totals.items():
+        speed = t["lines"] / t["seconds"] if t["seconds"] else float("inf")
+        scores = boundary_scores(t["pred"], t["gold"]) if t["gold"] else None
+        report[plat] = {"lines_per_sec": speed, "scores": scores}
+        acc = "".join(f"{s:>9.1%}" for s in scores) if scores else f"{'（无标注）':>20}"
+        print(f"{plat:<6}{t['files']:>6}{t['lines']:>10}{t['comments']:>8}{speed:>12,.0f}{acc}")
+    return report
+
+
+# ---------------------- 4. 旧版规则（各采集脚本原来的写法，只用来核对） ----------------------
+def legacy_merged_comments(lines, is_new_comment, min_len=5):
+    """旧版微博/B站：逐行判断是否新评论，续行用空格接到上一条后面"""
+    current_comment = ""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if is_new_comment(line):
+            if current_comment and len(current_comment) > min_len:
+                yield current_comment
+            current_comment = line
+        else:
+            current_comment = current_comment + " " + line if current_comment else line
+    if current_comment and len(current_comment) > min_len:
+        yield current_comment
+
+def legacy_weibo_is_new(line):
+    return (
+        ("·" in line and any(key in line for key in ["前", "天", "月", "年", ":"]))
+        or ("赞" in line and line[:3].isdigit())
+    )
+
+def legacy_bilibili_is_new(line):
+    return (
+        (2 <= len(line) <= 20 and not line[0].isdigit())
+        or any(key in line for key in ["-", "前", "时", "分", "赞"])
+    )
+
+def legacy_douyin(lines):
+    """旧版抖音：整份内容拼成一个字符串后按标点切开，再过滤（不含去重）"""
+    irrelevant_pattern = re.compile(r"^\d+(\.\d+)?万?赞$|^\d+$|[\U00010000-\U0010ffff]", re.UNICODE)
+    merged_text = " ".join(line.strip() for line in lines if line.strip())
+    potential_comments = re.split(r"([。！？；：，、）])", merged_text)
+    for i in range(0, len(potential_comments), 2):
+        comment_part = potential_comments[i]
+        punct_part = potential_comments[i + 1] if i + 1 < len(potential_comments) else ""
+        item = comment_part.strip() + punct_part if comment_part.strip() else ""
+        if item and not irrelevant_pattern.match(item) and len(item.strip()) >= 5:
+            cleaned_comment = re.sub(r"^@\w+\s*", "", item.strip())
+            if cleaned_comment:
+                yield cleaned_comment
+
+LEGACY = {
+    "微博": lambda lines: legacy_merged_comments(lines, legacy_weibo_is_new),
+    "B站": lambda lines: legacy_merged_comments(lines, legacy_bilibili_is_new),
+    "抖音": legacy_douyin,
+}
+
+
+# ---------------------- 5. 自检：与旧版一致、线性耗时 ----------------------
+# 随机转储的素材：用户名、时间、点赞行、正文片段、标点、表情、@回复
+FRAGMENTS = ["用户甲", "小明·3分钟前", "阿花·昨天 12:30", "128赞", "1.2万赞", "2024-05-01", "42",
+             "这首歌太好听了", "建模还能再优化一下", "期待新专辑", "回复@路人乙", "@路人丙 说得对",
+             "真的哭死", "演唱会门票抢到了", "😀", "a", "前排", "12:45", " ", ""]
+PUNCTS = ["", "", "", "，", "。", "！", "？", "、", "）", "："]
+
+def random_dump(rng, n_lines):
+    return ["".join(rng.choice(FRAGMENTS) + rng.choice(PUNCTS) for _ in range(rng.randint(1, 4)))
+            for _ in range(n_lines)]
+
+def check_equivalence(rounds=300, seed=0):
+    """随机转储上逐平台比对：新解析器的输出与旧版规则逐条相同"""
+    rng = random.Random(seed)
+    for plat, legacy in LEGACY.items():
+        for _ in range(rounds):
+            lines = random_dump(rng, rng.randint(0, 60))
+            new, old = list(comment_parser.parse(plat, lines)), list(legacy(lines))
+            assert new == old, f"{plat}切分结果与旧版不一致：\n输入={lines}\n新={new}\n旧={old}"
+        print(f"✅ {plat}：{rounds}份随机转储的切分结果与旧版一致")
+
+def check_linear_time(n_lines=100_000, max_ratio=4.0):
+    """
+    没有标点/边界的长输入（抖音短评论、微博长续行）：行数翻10倍，耗时应约翻10倍
+    （逐行重扫缓冲区时是平方增长，10倍行数要慢约100倍）
+    """
+    for plat, line in (("抖音", "好听好听好听"), ("微博", "续行内容没有时间"), ("B站", "这是一条超过二十个字的续行内容所以不算新评论的开头")):
+        seconds = []
+        for n in (n_lines // 10, n_lines):
+            start = time.perf_counter()
+            for _ in comment_parser.parse(plat, [line] * n):
+                pass
+            seconds.append(time.perf_counter() - start)
+        per_line = (seconds[1] / n_lines) / (seconds[0] / (n_lines // 10))
+        assert per_line < max_ratio, f"{plat}：{n_lines}行每行耗时是{n_lines // 10}行时的{per_line:.1f}倍，不是线性"
+        print(f"✅ {plat}：{n_lines}行无边界输入耗时{seconds[1]:.2f}秒（每行耗时比{per_line:.1f}，线性）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="评论切分基准：逐平台报告解析速度和切分准确率")
+    parser.add_argument("paths", nargs="*", default=[SAMPLE_DIR],
+                        help="转储文件或目录（标注文件为同名.expected.txt；默认用comment_dumps/里的样例）")
+    parser.add_argument("--platform", choices=list(comment_parser.PARSERS), help="统一指定平台（默认从文件名识别）")
+    parser.add_argument("--repeat", type=int, default=3, help="每份转储重复解析次数，取最快一次")
+    parser.add_argument("--check", action="store_true", help="先自检：与旧版规则逐条一致、耗时随行数线性增长")
+    args = parser.parse_args()
+    if args.check:
+        check_equivalence()
+        check_linear_time()
+    run_benchmark(args.paths, platform=args.platform, repeat=args.repeat)
@@ -1,94 +1,50 @@
 import time
 import os
-from openpyxl import Workbook
+from paste_ingest import iter_pasted_lines, iter_dumps, parse_batch_args, save_comments, print_preview
+from near_dup import DEFAULT_THRESHOLD
+from comment_parser import parse
 
 # 获取桌面路径（适配Windows系统）
 desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-print("=== B站评论批量整理（保存到桌面Excel版） ===")
-print("操作步骤：")
-print("1. 在B站评论区，Ctrl+A全选评论，Ctrl+C复制")
-print("2. 在此处Ctrl+V粘贴所有内容")
-print("3. 新起一行输入“完成”，按回车生成Excel文件")
-print()
-print("请粘贴评论内容：")
 
-# 读取粘贴内容，直到输入“完成”
-all_lines = []
-while True:
-    try:
-        line = input()
-        if line.strip() == "完成":
-            break
-        if line.strip():
-            all_lines.append(line.strip())
-    except:
-        break
-
-print(f"接收到 {len(all_lines)} 行文本，正在处理...")
-
-# 识别有效评论，处理跨多行内容
-comments = []
-current_comment = ""
-for line in all_lines:
-    line = line.strip()
-    if not line:
-        continue
-    
-    # 判定新评论：含用户名、时间或点赞特征
-    is_new_comment = (
-        (2 <= len(line) <= 20 and not line[0].isdigit())
-        or any(key in line for key in ["-", "前", "时", "分", "赞"])
-    )
-    
-    if is_new_comment:
-        if current_comment and len(current_comment) > 5:
-            comments.append(current_comment)
-        current_comment = line
+def process_dump(lines, excel_path, dedup_threshold=DEFAULT_THRESHOLD):
+    """处理一份评论内容：边读边合并评论并流式写入Excel，返回识别到的评论数"""
+    stats = {}
+    # 新评论开头的判定规则见comment_parser.py（B站）
+    comments = parse("B站", lines, stats=stats)
+    # 流式写入Excel（只写模式，评论数再多内存也不涨；没有评论时不生成文件）
+    count, preview = save_comments(comments, excel_path, sheet_title="B站评论",
+                                   dedup_threshold=dedup_threshold, stats=stats)
+    print(f"接收到 {stats['lines']} 行文本，成功识别 {count} 条评论（近重复合并后 {stats['clusters']} 簇）")
+    if count:
+        print(f"文件路径：{excel_path}")
+        print_preview(preview, count)
+    return count
+
+if __name__ == "__main__":
+    args = parse_batch_args("B站评论整理：不带参数为交互粘贴，带文件/目录/“-”为批量处理页面转储")
+    if args.paths:
+        # 批量模式：一次处理多份转储，无需人工值守
+        out_dir = args.out_dir or os.getcwd()
+        total = 0
+        for name, lines in iter_dumps(args.paths):
+            print(f"\n=== 处理：{name} ===")
+            total += process_dump(lines, os.path.join(out_dir, f"B站评论_{name}.xlsx"), args.dedup_threshold)
+        print(f"\n批量处理完成，共识别 {total} 条评论")
     else:
-        current_comment = current_comment + " " + line if current_comment else line
-
-# 保存最后一条评论
-if current_comment and len(current_comment) > 5:
-    comments.append(current_comment)
-
-print(f"成功识别 {len(comments)} 条评论")
-
-# 生成Excel文件并保存到桌面
-if comments:
-    # 生成带时间戳的文件名，避免重复
-    filename = f"B站评论_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
-    # 拼接桌面完整路径
-    excel_path = os.path.join(desktop_path, filename)
-    
-    # 创建Excel工作簿
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "B站评论"
-    
-    # 写入表头
-    ws.append(['序号', '评论内容', '评论级别', '采集时间'])
-    
-    # 写入评论数据
-    for i, com in enumerate(comments, 1):
-        # 区分一级/二级评论
-        level = "二级评论" if ("回复" in com or "@" in com) else "一级评论"
-        # 写入当前行数据
-        ws.append([i, com, level, time.strftime("%Y-%m-%d %H:%M:%S")])
-    
-    # 保存Excel文件到桌面
-    wb.save(excel_path)
-    print(f"\nExcel文件已保存到桌面：{filename}")
-    print(f"文件路径：{excel_path}")
-    
-    # 预览前10条评论
-    print("\n前10条评论预览：")
-    print("-" * 50)
-    for i, com in enumerate(comments[:10], 1):
-        preview = com[:50] + "..." if len(com) > 50 else com
-        print(f"{i}. {preview}")
-    if len(comments) > 10:
-        print(f"... 还有 {len(comments)-10} 条评论")
-else:
-    print("\n未识别到有效评论，请重新复制评论区内容（避开广告/按钮文字）")
-
-input("\n按回车键退出...")
+        print("=== B站评论批量整理（保存到桌面Excel版） ===")
+        print("操作步骤：")
+        print("1. 在B站评论区，Ctrl+A全选评论，Ctrl+C复制")
+        print("2. 在此处Ctrl+V粘贴所有内容")
+        print("3. 新起一行输入“完成”，按回车生成Excel文件")
+        print()
+        print("请粘贴评论内容：")
+
+        # 生成带时间戳的文件名
+        filename = f"B站评论_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+        excel_path = os.path.join(args.out_dir or desktop_path, filename)
+        if process_dump(iter_pasted_lines(), excel_path, args.dedup_threshold):
+            print(f"\nExcel文件已保存：{filename}")
+        else:
+            print("\n未识别到有效评论，请重新复制评论区内容（避开广告/按钮文字）")
+        input("\n按回车键退出...")
@@ -0,0 +1,122 @@
+# 多平台评论切分引擎：每个平台一个编译好的边界判定器，解析器按“新评论/续行”状态逐行推进
+import re
+
+# ---------------------- 1. 按行合并的平台（微博/B站） ----------------------
+class LineBoundaryParser:
+    """
+    按行切分评论的状态机
+    每读一行先用边界正则判定：命中=新评论开头（结束上一条），未命中=上一条评论的续行
+    续行先存进列表，评论结束时才拼接一次（很长的评论也不会反复复制字符串）
+    :param boundary: 新评论开头的正则（re.search命中即为边界）
+    :param min_len: 评论最短长度（不超过该长度的丢弃）
+    """
+
+    def __init__(self, boundary, min_len=5):
+        self.boundary = re.compile(boundary)
+        self.min_len = min_len
+        self.current = []
+        self.lines = 0
+
+    def is_new_comment(self, line):
+        return self.boundary.search(line) is not None
+
+    def _flush(self):
+        comment = " ".join(self.current)
+        self.current = []
+        if len(comment) > self.min_len:
+            yield comment
+
+    def feed(self, line):
+        """喂入一行，产出因这行而结束的评论"""
+        line = line.strip()
+        if not line:
+            return
+        self.lines += 1
+        if self.is_new_comment(line):
+            yield from self._flush()
+        self.current.append(line)
+
+    def close(self):
+        """输入结束，产出最后一条评论"""
+        yield from self._flush()
+
+
+# ---------------------- 2. 按标点切分的平台（抖音） ----------------------
+class PunctuationParser:
+    """
+    按标点切分评论的状态机（评论区复制出来没有可靠的行边界）
+    行与行用空格拼接后按标点切开，最后一段没遇到标点前留在缓冲区等下一行
+    每行只扫描这一行本身：没有标点的行先存进列表，遇到标点（或输入结束）时才拼接一次，总耗时与输入大小成正比
+    """
+
+    def __init__(self, punct=r"[。！？；：，、）]", min_len=5,
+                 irrelevant=r"^\d+(\.\d+)?万?赞$|^\d+$|[\U00010000-\U0010ffff]"):
+        self.splitter = re.compile(f"({punct})")
+        self.irrelevant = re.compile(irrelevant, re.UNICODE)
+        self.reply_prefix = re.compile(r"^@\w+\s*")
+        self.min_len = min_len
+        self.buffer = []   # 还没遇到标点的片段（按行）
+        self.lines = 0
+
+    def _emit(self, item):
+        # 过滤点赞数、纯数字、表情、过短内容，去掉开头的@用户名
+        item = item.strip()
+        if item and not self.irrelevant.match(item) and len(item) >= self.min_len:
+            cleaned = self.reply_prefix.sub("", item)
+            if cleaned:
+                yield cleaned
+
+    def feed(self, line):
+        line = line.strip()
+        if not line:
+            return
+        self.lines += 1
+        parts = self.splitter.split(line)
+        if len(parts) == 1:
+            self.buffer.append(line)
+            return
+        # parts = [片段, 标点, 片段, 标点, ..., 未结束片段]；第一段接在缓冲区后面
+        if self.buffer:
+            self.buffer.append(parts[0])
+            parts[0] = " ".join(self.buffer)
+        for i in range(0, len(parts) - 1, 2):
+            if parts[i].strip():
+                yield from self._emit(parts[i].strip() + parts[i + 1])
+        self.buffer = [parts[-1]] if parts[-1] else []
+
+    def close(self):
+        tail = " ".join(self.buffer)
+        if tail.strip():
+            yield from self._emit(tail)
+        self.buffer = []
+
+
+# ---------------------- 3. 平台注册表 ----------------------
+# 微博：用户名+“·”+时间（如“张三·1小时前”“李四·昨天 12:30”），或以数字开头的点赞行（如“100赞”）
+WEIBO_BOUNDARY = r"·.*[前天月年:]|[前天月年:].*·|^\d{3}.*赞"
+# B站：2~20字且不以数字开头的短行（用户名），或含时间/点赞特征
+BILIBILI_BOUNDARY = r"^(?!\d).{2,20}$|[-前时分赞]"
+
+PARSERS = {
+    "微博": lambda: LineBoundaryParser(WEIBO_BOUNDARY),
+    "B站": lambda: LineBoundaryParser(BILIBILI_BOUNDARY),
+    "抖音": lambda: PunctuationParser(),
+}
+
+def get_parser(platform):
+    """新建某平台的解析器（每份转储用一个新的实例）"""
+    if platform not in PARSERS:
+        raise ValueError(f"不支持的平台：{platform}（可选：{'、'.join(PARSERS)}）")
+    return PARSERS[platform]()
+
+def parse(platform, lines, stats=None):
+    """
+    逐行解析评论区内容，产出评论（生成器，内存占用与输入大小无关）
+    :param stats: 传入字典时在stats["lines"]里记录读到的非空行数
+    """
+    parser = get_parser(platform)
+    for line in lines:
+        yield from parser.feed(line)
+    yield from parser.close()
+    if stats is not None:
+        stats["lines"] = parser.lines
@@ -0,0 +1,207 @@
+# 共现关系抽取：词→整数ID（昵称归一到本名），评论内滑动窗口里的“实体×词”共现用scipy.sparse稀疏矩阵一次算完，再按PMI阈值筛出带权关系
+# 全程是整个语料的numpy向量化运算，不按评论逐条嵌套循环；共现计数/文档频率/评论数可累加，新评论用partial_fit()追加，状态存成.npz
+import os
+import numpy as np
+from scipy import sparse
+
+# ---------------------- 1. 默认配置 ----------------------
+# 昵称/别名 → 实体本名（分词时当成本名统计）
+ALIASES = {
+    "颖宝": "赵丽颖", "赵姐": "赵丽颖", "丽颖": "赵丽颖",
+    "天依": "洛天依", "殿下": "洛天依", "洛殿": "洛天依",
+}
+WINDOW = 5        # 滑动窗口：实体前后各5个词之内算共现
+MIN_COUNT = 2     # 至少在几条评论里共现
+MIN_PMI = 1.0     # 点互信息阈值（log2，1.0=共现概率是随机搭配的2倍）
+
+
+# ---------------------- 2. 词表（整数编码） ----------------------
+class Vocabulary:
+    """词 → 整数ID；别名与本名共用同一个ID，解码时得到本名"""
+
+    def __init__(self, aliases=None):
+        self.ids = {}
+        self.words = []
+        for alias, name in (aliases or {}).items():
+            self.ids[alias] = self.id(name)
+
+    def id(self, word):
+        wid = self.ids.get(word)
+        if wid is None:
+            wid = self.ids[word] = len(self.words)
+            self.words.append(word)
+        return wid
+
+    @classmethod
+    def from_words(cls, words, aliases=None):
+        """按保存下来的词表还原（ID与保存时相同）"""
+        vocab = cls()
+        vocab.words = list(words)
+        vocab.ids = {w: i for i, w in enumerate(vocab.words)}
+        for alias, name in (aliases or {}).items():
+            vocab.ids[alias] = vocab.ids[name]
+        return vocab
+
+    def __len__(self):
+        return len(self.words)
+
+    def encode(self, docs):
+        """
+        把分好词的评论拼成一条词流
+        :return: (词ID数组, 每个词所属评论的下标数组)
+        """
+        lengths = np.fromiter((len(words) for words in docs), dtype=np.int64, count=len(docs))
+        tokens = np.fromiter((self.id(w) for words in docs for w in words), dtype=np.int64,
+                             count=int(lengths.sum()))
+        return tokens, np.repeat(np.arange(len(docs), dtype=np.int64), lengths)
+
+
+def _doc_freq(tokens, doc_index, size):
+    """每个词出现在多少条评论里（同一评论里出现多次只算一次）"""
+    pairs = np.unique(doc_index * size + tokens)
+    return np.bincount(pairs % size, minlength=size)
+
+
+# ---------------------- 3. 共现矩阵 ----------------------
+class CooccurrenceGraph:
+    """
+    fit()/partial_fit()后：
+    counts：实体×词的稀疏矩阵，值=在多少条评论里窗口内共现
+    pmi：同形状的PMI矩阵；links：每条共现对应的(评论ID, 实体行, 词ID)，用于追溯来源评论
+    batch_start：最近一次partial_fit()新增的共现从links的第几条开始
+    """
+
+    def __init__(self, entities, aliases=ALIASES, window=WINDOW):
+        self.vocab = Vocabulary(aliases)
+        self.aliases = aliases
+        self.entities = list(entities)
+        self.rows = np.array([self.vocab.id(e) for e in self.entities], dtype=np.int64)
+        self.window = window
+        self._reset()
+
+    def _reset(self):
+        empty = np.empty(0, dtype=np.int64)
+        self.counts = sparse.csr_matrix((len(self.rows), len(self.vocab)), dtype=np.int64)
+        self.doc_freq = np.zeros(len(self.vocab), dtype=np.int64)
+        self.n_docs = 0
+        self.links = (empty, empty, empty)
+        self.batch_start = 0
+        self.pmi = self._pmi()
+
+    def fit(self, docs, doc_ids=None):
+        """
+        :param docs: 分好词的评论列表（已去掉停用词）
+        :param doc_ids: 每条评论的ID（默认用评论下标）
+        """
+        self._reset()
+        return self.partial_fit(docs, doc_ids)
+
+    def partial_fit(self, docs, doc_ids=None):
+        """追加一批新评论：共现计数、文档频率、评论数直接累加，PMI按累加后的全语料统计重算"""
+        vocab = self.vocab
+        tokens, doc_index = vocab.encode(docs)
+        size = len(vocab)
+        row_of = np.full(size, -1, dtype=np.int64)
+        row_of[self.rows] = np.arange(len(self.rows))
+
+        # 窗口内每个距离d各算一次：词流错开d位，同一评论且一侧是实体的就是一对共现
+        keys = []
+        n_rows = len(self.rows)
+        for d in range(1, self.window + 1):
+            same_doc = doc_index[:-d] == doc_index[d:]
+            for left, right in ((tokens[:-d], tokens[d:]), (tokens[d:], tokens[:-d])):
+                hit = same_doc & (row_of[left] >= 0) & (left != right)
+                keys.append((doc_index[:-d][hit] * n_rows + row_of[left][hit]) * size + right[hit])
+        # 同一评论里的同一对只算一次
+        keys = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+        docs_hit, rows, cols = keys // size // n_rows, keys // size % n_rows, keys % size
+
+        # 新词在词表末尾：旧矩阵/文档频率补零列后直接相加
+        counts = self.counts.copy()
+        counts.resize((n_rows, size))
+        self.counts = counts + sparse.coo_matrix(
+            (np.ones(len(keys), dtype=np.int64), (rows, cols)), shape=(n_rows, size)
+        ).tocsr()
+        self.doc_freq = np.pad(self.doc_freq, (0, size - len(self.doc_freq))) + _doc_freq(tokens, doc_index, size)
+        ids = (np.arange(self.n_docs, self.n_docs + len(docs), dtype=np.int64) if doc_ids is None
+               else np.asarray(list(doc_ids), dtype=np.int64))
+        self.batch_start = len(self.links[0])
+        self.links = tuple(np.concatenate([old, new]) for old, new in zip(self.links, (ids[docs_hit], rows, cols)))
+        self.n_docs += len(docs)
+        self.pmi = self._pmi()
+        return self
+
+    def _pmi(self):
+        coo = self.counts.tocoo()
+        row_df = self.doc_freq[self.rows][coo.row]
+        col_df = self.doc_freq[coo.col]
+        values = np.log2(coo.data * self.n_docs / (row_df * col_df))
+        return sparse.csr_matrix((values, (coo.row, coo.col)), shape=self.counts.shape)
+
+    # ---------------------- 4. 关系与来源 ----------------------
+    def relations(self, min_count=MIN_COUNT, min_pmi=MIN_PMI, terms=None):
+        """
+        按阈值筛选共现关系：[(实体, 词, 共现评论数, PMI), ...]，按共现评论数从多到少
+        :param terms: 只看这些词（如情感词库）；min_pmi=None时不按PMI筛
+        """
+        coo = self.counts.tocoo()
+        pmi = self.pmi.tocoo().data   # 与counts稀疏结构相同，按同一顺序对齐
+        keep = coo.data >= min_count
+        if min_pmi is not None:
+            keep &= pmi >= min_pmi
+        if terms is not None:
+            wanted = np.zeros(len(self.vocab), dtype=bool)
+            wanted[np.array([self.vocab.ids[t] for t in terms if t in self.vocab.ids], dtype=np.int64)] = True
+            keep &= wanted[coo.col]
+        order = np.argsort(-coo.data[keep], kind="stable")
+        rows, cols = coo.row[keep][order], coo.col[keep][order]
+        return [(self.entities[r], self.vocab.words[c], int(n), float(p))
+                for r, c, n, p in zip(rows, cols, coo.data[keep][order], pmi[keep][order])]
+
+    def sources(self, pairs, batch_only=False):
+        """
+        给定[(实体, 词), ...]，返回所有来源：[(评论ID, 实体, 词), ...]
+        :param batch_only: True时只看最近一次partial_fit()的评论
+        """
+        size = len(self.vocab)
+        row_of = {e: i for i, e in enumerate(self.entities)}
+        wanted = np.array([row_of[e] * size + self.vocab.ids[w] for e, w in pairs], dtype=np.int64)
+        start = self.batch_start if batch_only else 0
+        docs, rows, cols = (a[start:] for a in self.links)
+        hit = np.isin(rows * size + cols, wanted)
+        return [(int(d), self.entities[r], self.vocab.words[c])
+                for d, r, c in zip(docs[hit], rows[hit], cols[hit])]
+
+    # ---------------------- 5. 保存/读取累加状态 ----------------------
+    def save(self, path, config_key=""):
+        """存成.npz（先写临时文件再改名，中途退出不会留下半截文件）"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, config_key=config_key, entities=np.array(self.entities, dtype=str),
+                     words=np.array(self.vocab.words, dtype=str), window=self.window,
+                     data=self.counts.data, indices=self.counts.indices, indptr=self.counts.indptr,
+                     doc_freq=self.doc_freq, n_docs=self.n_docs,
+                     link_docs=self.links[0], link_rows=self.links[1], link_cols=self.links[2])
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, entities, aliases=ALIASES, window=WINDOW, config_key=""):
+        """读取save()的结果；文件不存在或实体/窗口/配置不同时返回None（需要从头fit）"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as state:
+            if (str(state["config_key"]) != config_key or state["entities"].tolist() != list(entities)
+                    or int(state["window"]) != window):
+                return None
+            graph = cls(entities, aliases, window)
+            graph.vocab = Vocabulary.from_words(state["words"].tolist(), aliases)
+            graph.rows = np.array([graph.vocab.ids[e] for e in graph.entities], dtype=np.int64)
+            size = len(graph.vocab)
+            graph.counts = sparse.csr_matrix((state["data"], state["indices"], state["indptr"]),
+                                             shape=(len(graph.rows), size))
+            graph.doc_freq = state["doc_freq"]
+            graph.n_docs = int(state["n_docs"])
+            graph.links = (state["link_docs"], state["link_rows"], state["link_cols"])
+            graph.batch_start = len(graph.links[0])
+        graph.pmi = graph._pmi()
+        return graph
@@ -0,0 +1,170 @@
+# 评论语料列式存储：爬取的.xlsx/.csv只转换一次为Parquet，各分析脚本按需只读需要的列
+import argparse
+import hashlib
+import os
+import re
+import pandas as pd
+from near_dup import cluster_ids, DEFAULT_THRESHOLD
+
+# ---------------------- 1. 语料格式配置 ----------------------
+IDOLS = ["赵丽颖", "洛天依"]
+PLATFORMS = {"微博": "微博", "weibo": "微博", "B站": "B站", "b站": "B站", "bilibili": "B站", "抖音": "抖音", "douyin": "抖音"}
+COMMENT_COLUMNS = ["评论内容", "评论", "用户评论", "粉丝评论", "content"]
+# Parquet列：评论ID、平台、偶像、原评论、仅中文的清洗文本、近重复簇ID（簇内第一条评论的comment_id）
+CORPUS_COLUMNS = ["comment_id", "platform", "idol", "text", "clean_text", "cluster_id"]
+CLEAN_RE = re.compile(r"[^\u4e00-\u9fa5]")
+
+
+# ---------------------- 2. 稳定评论ID ----------------------
+def make_comment_ids(texts, idol, platform):
+    """
+    按内容生成稳定的整数评论ID（偶像+平台+评论内容+第几次出现）
+    追加新评论、重新导入时旧评论的ID不变；同一内容重复出现也各有各的ID
+    """
+    seen = {}
+    ids = []
+    for text in texts:
+        n = seen.get(text, 0)
+        seen[text] = n + 1
+        digest = hashlib.blake2b(f"{idol}|{platform}|{n}|{text}".encode("utf-8"), digest_size=8).digest()
+        ids.append(int.from_bytes(digest, "big") >> 1)  # 右移一位，保证落在int64正数范围
+    return ids
+
+
+# ---------------------- 3. 读取原始爬取文件 ----------------------
+def find_comment_column(columns):
+    """找评论列：优先常见列名，其次任何含“评论”的列"""
+    for col in COMMENT_COLUMNS:
+        if col in columns:
+            return col
+    for col in columns:
+        if "评论" in str(col):
+            return col
+    raise ValueError(f"未找到评论列（如“评论内容”），现有列：{list(columns)}")
+
+def read_raw_comments(path):
+    """读取.xlsx/.csv的评论列（去空值、统一转字符串）"""
+    if path.lower().endswith(".csv"):
+        columns = pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns
+        col = find_comment_column(columns)
+        df = pd.read_csv(path, usecols=[col], encoding="utf-8-sig")
+    else:
+        columns = pd.read_excel(path, nrows=0).columns
+        col = find_comment_column(columns)
+        df = pd.read_excel(path, usecols=[col])
+    return df[col].dropna().astype(str).reset_index(drop=True)
+
+def guess_from_name(path, options, default):
+    name = os.path.basename(path)
+    for key in options:
+        if key in name:
+            return options[key] if isinstance(options, dict) else key
+    return default
+
+
+# ---------------------- 4. 导入：xlsx/csv → Parquet ----------------------
+def corpus_path_for(path):
+    """原始文件对应的Parquet路径（同目录同名，扩展名换成.parquet）"""
+    return os.path.splitext(path)[0] + ".parquet"
+
+def build_corpus(texts, idol, platform, dedup_threshold=DEFAULT_THRESHOLD):
+    """把评论文本整理成语料表（分类列+整数ID+近重复簇ID）"""
+    texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+    comment_ids = pd.Series(make_comment_ids(texts, idol, platform), dtype="int64")
+    # 簇ID用簇内第一条评论的comment_id，追加导入时代表评论不变
+    clusters = comment_ids.iloc[cluster_ids(texts, dedup_threshold)].reset_index(drop=True)
+    return pd.DataFrame({
+        "comment_id": comment_ids,
+        "platform": pd.Categorical([platform] * len(texts)),
+        "idol": pd.Categorical([idol] * len(texts)),
+        "text": texts,
+        "clean_text": texts.str.replace(CLEAN_RE, "", regex=True),
+        "cluster_id": clusters,
+    })
+
+def ingest(path, idol=None, platform=None, out_path=None, dedup_threshold=DEFAULT_THRESHOLD):
+    """把一个爬取文件转换成Parquet语料，返回输出路径"""
+    idol = idol or guess_from_name(path, IDOLS, "未知")
+    platform = platform or guess_from_name(path, PLATFORMS, "未知")
+    out_path = out_path or corpus_path_for(path)
+    corpus = build_corpus(read_raw_comments(path), idol, platform, dedup_threshold)
+    corpus.to_parquet(out_path, index=False, engine="pyarrow")
+    print(f"✅ {os.path.basename(path)} → {os.path.basename(out_path)}"
+          f"（{len(corpus)}条，{corpus['cluster_id'].nunique()}个近重复簇，偶像：{idol}，平台：{platform}）")
+    return out_path
+
+
+# ---------------------- 5. 读取语料（只读需要的列，内存映射） ----------------------
+def _pq():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("读取Parquet语料需要安装pyarrow：pip install pyarrow")
+    return pq
+
+def load_corpus(path, columns=None):
+    """读取Parquet语料的指定列（内存映射方式打开文件）"""
+    return _pq().read_table(path, columns=columns, memory_map=True).to_pandas()
+
+def load_comments(path, cleaned=False, dedup=False):
+    """
+    各分析脚本的统一入口：读取评论列
+    有对应的.parquet（且不比原文件旧）就只读一列，否则退回读取原始Excel/CSV
+    :param cleaned: True时返回仅保留中文的清洗文本
+    :param dedup: True时每个近重复簇只保留第一条（代表评论）
+    :return: 评论Series（已去空值、均为字符串）
+    """
+    parquet = path if path.endswith(".parquet") else corpus_path_for(path)
+    clusters = None
+    if os.path.exists(parquet) and (
+        parquet == path or not os.path.exists(path) or os.path.getmtime(parquet) >= os.path.getmtime(path)
+    ):
+        column = "clean_text" if cleaned else "text"
+        columns = [column]
+        if dedup and "cluster_id" in _pq().read_schema(parquet).names:
+            columns.append("cluster_id")
+        df = load_corpus(parquet, columns=columns)
+        comments = df[column]
+        if "cluster_id" in df:
+            clusters = df["cluster_id"]
+    else:
+        comments = read_raw_comments(path)
+        if cleaned:
+            comments = comments.str.replace(CLEAN_RE, "", regex=True)
+    if dedup:
+        if clusters is None:  # 原始文件或旧版语料：现场算簇
+            clusters = pd.Series(cluster_ids(comments))
+        comments = comments[~clusters.duplicated().to_numpy()].reset_index(drop=True)
+    return comments
+
+def load_comment_rows(path, cleaned=False, idol=None, platform=None):
+    """
+    读取评论及其稳定ID（增量分析用）：DataFrame，列为comment_id、评论内容
+    没有Parquet语料时按与ingest相同的规则现场生成ID（偶像/平台默认从文件名识别）
+    """
+    parquet = path if path.endswith(".parquet") else corpus_path_for(path)
+    column = "clean_text" if cleaned else "text"
+    if os.path.exists(parquet) and (
+        parquet == path or not os.path.exists(path) or os.path.getmtime(parquet) >= os.path.getmtime(path)
+    ):
+        df = load_corpus(parquet, columns=["comment_id", column])
+        return df.rename(columns={column: "评论内容"})
+    texts = read_raw_comments(path)
+    idol = idol or guess_from_name(path, IDOLS, "未知")
+    platform = platform or guess_from_name(path, PLATFORMS, "未知")
+    return pd.DataFrame({
+        "comment_id": pd.Series(make_comment_ids(texts, idol, platform), dtype="int64"),
+        "评论内容": texts.str.replace(CLEAN_RE, "", regex=True) if cleaned else texts,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把爬取的评论.xlsx/.csv转换为Parquet语料")
+    parser.add_argument("files", nargs="+", help="评论文件（如赵丽颖评论爬取.xlsx）")
+    parser.add_argument("--idol", help="偶像名（默认从文件名识别）")
+    parser.add_argument("--platform", help="平台（默认从文件名识别：微博/B站/抖音）")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"近重复相似度阈值（0~1，默认{DEFAULT_THRESHOLD}；1表示只合并完全相同的评论）")
+    args = parser.parse_args()
+    for file in args.files:
+        ingest(file, idol=args.idol, platform=args.platform, dedup_threshold=args.dedup_threshold)
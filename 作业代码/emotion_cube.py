@@ -0,0 +1,129 @@
+# 情感分析立方体：按(偶像, 平台, 场景, 行为, 情感类型, 强度, 日期)预先汇总评论数，各维度存成整数编码
+# 任意切片、交叉表、占比、强度均值都在这张小表上groupby得到，不再回头扫描原始评论；对比20个偶像和对比1个耗时相当
+import numpy as np
+import pandas as pd
+
+# ---------------------- 1. 维度配置 ----------------------
+DIMENSIONS = ["idol_type", "platform", "scene_label", "behavior_label", "emotion_type", "emotion_strength", "day"]
+STRENGTH_SCORES = {"强": 3, "中": 2, "弱": 1}
+
+
+# ---------------------- 2. 立方体主体 ----------------------
+class EmotionCube:
+    """
+    cells：每个维度一列整数编码（-1=空值）+ count列（该组合的评论数），行数=出现过的维度组合数
+    categories：{维度: 编码→取值的pd.Index}（分类列沿用其标签表顺序，其余按取值排序；输出表的行列顺序与pd.crosstab一致）
+    """
+
+    def __init__(self, cells, categories):
+        self.cells = cells
+        self.categories = categories
+        self.dims = list(categories)
+
+    @classmethod
+    def from_frame(cls, df, dims=DIMENSIONS):
+        """从逐条评论的表汇总（只扫描一次）；df里没有的维度视为空值；分类列直接用现成编码，不再逐条哈希字符串"""
+        codes, categories = {}, {}
+        for dim in dims:
+            column = df[dim] if dim in df else pd.Series(np.nan, index=df.index, dtype=object)
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                dim_codes, values = column.cat.codes.to_numpy(), column.cat.categories
+            else:
+                dim_codes, values = pd.factorize(column, sort=True)
+            codes[dim] = dim_codes.astype(np.int32)
+            categories[dim] = pd.Index(np.asarray(values, dtype=object), name=dim)
+        cells = pd.DataFrame(codes).value_counts(sort=False).rename("count").reset_index()
+        return cls(cells, categories)
+
+    @classmethod
+    def merge(cls, cubes):
+        """合并多个立方体（如各数据源分别汇总），编码按合并后的取值表重排（取值表按先后顺序合并，共用同一张表时编码不变）"""
+        cubes = list(cubes)
+        dims = cubes[0].dims
+        categories = {dim: pd.Index(list(dict.fromkeys(v for c in cubes for v in c.categories[dim])), dtype=object, name=dim)
+                      for dim in dims}
+        parts = []
+        for cube in cubes:
+            part = cube.cells.copy()
+            for dim in dims:
+                recode = categories[dim].get_indexer(cube.categories[dim]).astype(np.int32)
+                part[dim] = np.where(part[dim] >= 0, recode[part[dim].clip(lower=0)], -1).astype(np.int32)
+            parts.append(part)
+        cells = pd.concat(parts, ignore_index=True).groupby(dims, as_index=False)["count"].sum()
+        return cls(cells, categories)
+
+    @property
+    def total(self):
+        return int(self.cells["count"].sum())
+
+    # ---------------------- 3. 切片与汇总 ----------------------
+    def slice(self, **filters):
+        """
+        切片：slice(idol_type="洛天依", platform=["微博", "B站"])
+        :return: 新立方体（取值表不变）
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, values in filters.items():
+            values = [values] if isinstance(values, str) or not np.iterable(values) else list(values)
+            wanted = self.categories[dim].get_indexer(values)
+            mask &= self.cells[dim].isin(wanted[wanted >= 0]).to_numpy()
+        return EmotionCube(self.cells[mask].reset_index(drop=True), self.categories)
+
+    def _decode(self, index):
+        """编码索引（单层或多层）→ 取值索引，顺序不变"""
+        if isinstance(index, pd.MultiIndex):
+            return pd.MultiIndex.from_arrays(
+                [self.categories[d][index.get_level_values(i)] for i, d in enumerate(index.names)], names=index.names
+            )
+        return self.categories[index.name][index]
+
+    def _grouped(self, dims, values="count", decode=True):
+        """按若干维度分组求和（空值组合去掉，与crosstab/groupby默认行为一致），按编码顺序排列，索引解码为取值"""
+        cells = self.cells
+        cells = cells[(cells[dims] >= 0).all(axis=1)]
+        grouped = cells.groupby(dims)[values].sum()
+        if decode:
+            grouped.index = self._decode(grouped.index)
+        return grouped
+
+    def counts(self, rows, columns=None):
+        """
+        计数表（等价于pd.crosstab(行维度, 列维度)）
+        :param rows: 维度名或维度名列表；columns为None时返回Series
+        """
+        rows = [rows] if isinstance(rows, str) else list(rows)
+        if columns is None:
+            return self._grouped(rows)
+        # 先按编码展开再解码，行列顺序与取值表一致
+        table = self._grouped(rows + [columns], decode=False).unstack(columns, fill_value=0)
+        table.index = self._decode(table.index)
+        table.columns = self._decode(table.columns)
+        return table
+
+    def percent(self, rows, columns, digits=1):
+        """行内占比（%）：每行加起来为100"""
+        table = self.counts(rows, columns)
+        return (table.div(table.sum(axis=1), axis=0) * 100).round(digits)
+
+    def mean_score(self, by, dim="emotion_strength", scores=STRENGTH_SCORES, digits=2):
+        """
+        按维度分组的强度均值（如强=3/中=2/弱=1），不在scores里的取值不参与平均
+        等价于df.groupby(by)[分数列].mean()：一个有效分数都没有的组保留为NaN
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        score_of = self.categories[dim].map(scores).to_numpy(dtype=np.float64)
+        cells = self.cells[self.cells[dim] >= 0]
+        cells = cells.assign(score=score_of[cells[dim].to_numpy()] * cells["count"].to_numpy())
+        weighted = EmotionCube(cells[cells["score"].notna()], self.categories)
+        means = weighted._grouped(by, "score") / weighted._grouped(by, "count")
+        return means.reindex(self._grouped(by).index).round(digits)
+
+    def to_frame(self):
+        """解码后的立方体（每个维度组合一行，附评论数），用于导出"""
+        frame = pd.DataFrame(index=self.cells.index)
+        for dim in self.dims:
+            codes = self.cells[dim].to_numpy()
+            values = np.asarray(self.categories[dim], dtype=object)
+            frame[dim] = np.where(codes >= 0, values[codes.clip(min=0)] if len(values) else None, None)
+        frame["count"] = self.cells["count"].to_numpy()
+        return frame
@@ -0,0 +1,255 @@
+# 知识图谱离线导出：按权重/度数剪枝、标签传播分社区、numpy预先算好坐标，按缩放级别分块写成JSONP小文件
+# 配套的canvas查看器（graph_viewer/）不依赖任何CDN，双击index.html即可打开，大图也不用在浏览器里跑物理模拟
+import argparse
+import json
+import math
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from triple_store import STORE_PATH, TripleStore
+
+# ---------------------- 1. 导出配置 ----------------------
+VIEWER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graph_viewer")
+MIN_WEIGHT = 2        # 边至少出现在几条评论里
+MAX_DEGREE = 30       # 每个节点最多保留权重最高的几条边
+TILE_NODES = 2000     # 细节层每个分块大约多少个节点
+OVERVIEW_NODES = 5000 # 概览层最多显示多少个社区（按大小取前N个，其余放大后在细节层显示）
+SPACING = 10.0        # 布局中相邻节点的间距（世界坐标）
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+
+# ---------------------- 2. 读边与剪枝 ----------------------
+def encode_triples(triples):
+    """
+    [(头, 关系, 尾, 次数), ...] → 整数编码的边表
+    :return: (节点名列表, 关系名列表, 起点ID, 终点ID, 关系ID, 权重)
+    """
+    heads, relations, tails, counts = zip(*triples) if triples else ((), (), (), ())
+    # 头尾实体共用一张节点表（pandas按出现顺序整数编码）
+    node_ids, names = pd.factorize(pd.Series(heads + tails, dtype=object))
+    rel, rels = pd.factorize(pd.Series(relations, dtype=object))
+    src, dst = node_ids[:len(heads)], node_ids[len(heads):]
+    as_array = lambda values: np.asarray(values, dtype=np.int64)
+    return list(names), list(rels), as_array(src), as_array(dst), as_array(rel), as_array(counts)
+
+def prune_edges(src, dst, weight, min_weight=MIN_WEIGHT, max_degree=MAX_DEGREE):
+    """
+    去掉权重<min_weight的边；每个节点只留权重最高的max_degree条边（两端都排在前max_degree内才保留，
+    这样“粉丝”这类枢纽节点的度数也有上限，分块大小可控）
+    :return: 保留边的下标数组
+    """
+    idx = np.flatnonzero(weight >= min_weight)
+    keep = np.ones(len(idx), dtype=bool)
+    for ends in (src[idx], dst[idx]):
+        # 按节点分组、组内权重从高到低，组内名次<max_degree的保留
+        order = np.lexsort((-weight[idx], ends))
+        grouped = ends[order]
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        keep[order[rank >= max_degree]] = False
+    return idx[keep]
+
+
+# ---------------------- 3. 社区划分（标签传播） ----------------------
+def adjacency(n, src, dst, weight):
+    """无向加权邻接矩阵（同一对节点的多条关系权重相加）"""
+    a = sparse.coo_matrix((weight.astype(np.float64), (src, dst)), shape=(n, n))
+    return (a + a.T).tocsr()
+
+def _row_argmax(m):
+    """稀疏矩阵每行最大值所在的列（并列取列号小的；空行返回-1），一次排序算完"""
+    rows = np.repeat(np.arange(m.shape[0]), np.diff(m.indptr))
+    order = np.lexsort((m.indices, -m.data, rows))
+    best = np.full(m.shape[0], -1)
+    nonempty = np.diff(m.indptr) > 0
+    best[nonempty] = m.indices[order[m.indptr[:-1][nonempty]]]
+    return best
+
+def label_propagation(adj, max_iter=30, seed=0):
+    """
+    稀疏矩阵版标签传播：每轮每个节点取邻居里权重和最大的标签
+    每轮随机只更新一半节点（半同步），避免二分结构上标签来回翻转
+    :return: 社区编号数组（0..k-1，按社区大小从大到小编号）
+    """
+    n = adj.shape[0]
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n)
+    has_neighbors = np.diff(adj.indptr) > 0
+    for _ in range(max_iter):
+        onehot = sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        best = _row_argmax((adj @ onehot).tocsr())
+        changed = has_neighbors & (best != labels)
+        if not changed.any():
+            break
+        labels = np.where(changed & (rng.random(n) < 0.5), best, labels)
+    _, labels, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    return rank[labels]
+
+
+# ---------------------- 4. 离线布局 ----------------------
+def spiral_at(rank, spacing):
+    """黄金角螺旋上第rank个点：离中心spacing×√rank，越靠前越靠中心，点与点间距大致均匀"""
+    r = spacing * np.sqrt(rank)
+    return np.column_stack([r * np.cos(rank * GOLDEN_ANGLE), r * np.sin(rank * GOLDEN_ANGLE)])
+
+def layout(community, strength, spacing=SPACING):
+    """
+    两级螺旋布局：社区按大小排在外层螺旋上，社区内节点按加权度数排在内层螺旋上（核心节点居中）
+    全部是numpy向量运算，节点数百万也只需几秒
+    :return: n×2坐标数组
+    """
+    sizes = np.bincount(community)
+    radius = spacing * np.sqrt(sizes) + spacing
+    # 外层：前面的社区大致占满半径√(累计面积)的圆，下一个社区放在这个圆外
+    k = np.arange(len(sizes))
+    covered = np.sqrt(np.r_[0, np.cumsum(radius ** 2)[:-1]])
+    dist = np.where(k == 0, 0.0, 2 * covered + radius)
+    centers = np.column_stack([dist * np.cos(k * GOLDEN_ANGLE), dist * np.sin(k * GOLDEN_ANGLE)])
+    # 内层：社区内按加权度数从大到小编号，依次排在螺旋上
+    order = np.lexsort((-strength, community))
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    rank = np.empty(len(community), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - starts[community[order]]
+    return centers[community] + spiral_at(rank, spacing)
+
+
+# ---------------------- 5. 写出分块数据 ----------------------
+def _write_jsonp(path, key, payload):
+    # JSONP：本地file://打开时浏览器不让fetch，用<script>加载就没有这个限制
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"GraphViewer.receive({json.dumps(key)},")
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        f.write(");\n")
+
+def _group_by(keys):
+    """{键: 该键所有元素的下标数组}"""
+    order = np.argsort(keys, kind="stable")
+    values, starts = np.unique(keys[order], return_index=True)
+    return dict(zip(values.tolist(), np.split(order, starts[1:])))
+
+def _round(values, digits=1):
+    return np.round(values, digits).tolist()
+
+def overview(names, community, strength, xy, src, dst, weight):
+    """
+    概览层：每个社区折叠成一个节点（位置=成员重心，名称=核心节点），社区间的边权重相加
+    社区编号已按大小排好，只取前OVERVIEW_NODES个
+    """
+    k = min(community.max() + 1, OVERVIEW_NODES)
+    members = np.flatnonzero(community < k)
+    group = community[members]
+    sizes = np.bincount(group, minlength=k)
+    cx = np.bincount(group, weights=xy[members, 0], minlength=k) / sizes
+    cy = np.bincount(group, weights=xy[members, 1], minlength=k) / sizes
+    order = np.lexsort((-strength[members], group))
+    hub = members[order[np.r_[0, np.cumsum(sizes)[:-1]]]]   # 每个社区加权度数最大的节点
+    labels = [names[h] if s == 1 else f"{names[h]}等{s}个" for h, s in zip(hub, sizes)]
+
+    a, b = community[src], community[dst]
+    cross = (a != b) & (a < k) & (b < k)
+    lo, hi = np.minimum(a, b)[cross], np.maximum(a, b)[cross]
+    pairs, inverse = np.unique(lo * k + hi, return_inverse=True)
+    pair_weight = np.bincount(inverse, weights=weight[cross])
+    return {
+        "nodes": {"x": _round(cx), "y": _round(cy), "size": sizes.tolist(),
+                  "group": list(range(k)), "label": labels},
+        "edges": {"s": (pairs // k).tolist(), "t": (pairs % k).tolist(),
+                  "w": pair_weight.astype(np.int64).tolist()},
+    }
+
+def export_graph(triples, out_dir, title="知识图谱", min_weight=MIN_WEIGHT, max_degree=MAX_DEGREE,
+                 tile_nodes=TILE_NODES):
+    """
+    导出可离线打开的交互图谱
+    :param triples: [(头实体, 关系, 尾实体, 次数), ...]（如TripleStore.query()的结果）
+    :param out_dir: 输出文件夹（index.html + viewer.js + data/*.js）
+    :return: 统计信息dict
+    """
+    names, rels, src, dst, rel, weight = encode_triples(triples)
+    kept = prune_edges(src, dst, weight, min_weight, max_degree)
+    src, dst, rel, weight = src[kept], dst[kept], rel[kept], weight[kept]
+
+    # 只留剪枝后还有边的节点，重新编号
+    used = np.unique(np.r_[src, dst])
+    remap = np.full(len(names), -1)
+    remap[used] = np.arange(len(used))
+    names = [names[i] for i in used]
+    src, dst = remap[src], remap[dst]
+    n = len(names)
+
+    adj = adjacency(n, src, dst, weight)
+    strength = np.asarray(adj.sum(axis=1)).ravel()
+    community = label_propagation(adj) if n else np.empty(0, dtype=np.int64)
+    xy = layout(community, strength) if n else np.empty((0, 2))
+
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    for old in os.listdir(data_dir):
+        if old.endswith(".js"):
+            os.remove(os.path.join(data_dir, old))
+
+    # 细节层：按坐标切成网格分块，每块存自己的节点，以及从这些节点出发的边（带两端坐标，不依赖别的块）
+    grid = max(1, math.ceil(math.sqrt(n / tile_nodes)))
+    lo = xy.min(axis=0) if n else np.zeros(2)
+    span = (xy.max(axis=0) - lo) if n else np.ones(2)
+    tile_size = float(max(span.max(), SPACING)) / grid
+    cell = np.minimum((xy - lo) // tile_size, grid - 1).astype(np.int64) if n else np.empty((0, 2), np.int64)
+    tile_of = cell[:, 0] * grid + cell[:, 1]
+    tiles = []
+    # 节点、边各排一次序按分块切开，不对每个分块扫描全表
+    node_groups = _group_by(tile_of)
+    edge_groups = _group_by(tile_of[src])
+    for t, members in node_groups.items():
+        out_edges = edge_groups.get(t, np.empty(0, dtype=np.int64))
+        key = f"tile_{t // grid}_{t % grid}"
+        _write_jsonp(os.path.join(data_dir, f"{key}.js"), key, {
+            "nodes": {"x": _round(xy[members, 0]), "y": _round(xy[members, 1]),
+                      "size": strength[members].astype(np.int64).tolist(),
+                      "group": community[members].tolist(), "label": [names[i] for i in members]},
+            "edges": {"x1": _round(xy[src[out_edges], 0]), "y1": _round(xy[src[out_edges], 1]),
+                      "x2": _round(xy[dst[out_edges], 0]), "y2": _round(xy[dst[out_edges], 1]),
+                      "w": weight[out_edges].tolist(), "rel": rel[out_edges].tolist()},
+        })
+        tiles.append(key)
+
+    _write_jsonp(os.path.join(data_dir, "overview.js"), "overview",
+                 overview(names, community, strength, xy, src, dst, weight) if n else
+                 {"nodes": {"x": [], "y": [], "size": [], "group": [], "label": []},
+                  "edges": {"s": [], "t": [], "w": []}})
+    stats = {"节点数": n, "边数": int(len(src)), "社区数": int(community.max() + 1) if n else 0,
+             "分块数": len(tiles)}
+    _write_jsonp(os.path.join(data_dir, "meta.js"), "meta", {
+        "title": title, "relations": rels, "tiles": tiles, "grid": grid, "tile_size": tile_size,
+        "origin": lo.tolist(), "bounds": (np.r_[lo, lo + span]).tolist(), "spacing": SPACING, "stats": stats,
+    })
+
+    # 查看器（纯本地文件，无CDN）
+    for asset in ("index.html", "viewer.js"):
+        shutil.copyfile(os.path.join(VIEWER_DIR, asset), os.path.join(out_dir, asset))
+    return stats
+
+def export_store(out_dir, path=STORE_PATH, **kwargs):
+    """从三元组库导出（只读不改库）"""
+    store = TripleStore(path)
+    try:
+        return export_graph(store.query(min_count=kwargs.get("min_weight", MIN_WEIGHT)), out_dir, **kwargs)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把三元组库导出为可离线打开的交互图谱")
+    parser.add_argument("--store", default=STORE_PATH, help="三元组库路径")
+    parser.add_argument("--out", default=os.path.join(os.path.expanduser("~"), "Desktop", "知识图谱可视化"),
+                        help="输出文件夹（默认桌面/知识图谱可视化）")
+    parser.add_argument("--min-weight", type=int, default=MIN_WEIGHT, help=f"边的最小权重（默认{MIN_WEIGHT}）")
+    parser.add_argument("--max-degree", type=int, default=MAX_DEGREE, help=f"每个节点最多保留几条边（默认{MAX_DEGREE}）")
+    parser.add_argument("--tile-nodes", type=int, default=TILE_NODES, help=f"每个分块的节点数（默认{TILE_NODES}）")
+    args = parser.parse_args()
+    stats = export_store(args.out, args.store, min_weight=args.min_weight, max_degree=args.max_degree,
+                         tile_nodes=args.tile_nodes)
+    print(f"✅ 图谱已导出：{os.path.join(args.out, 'index.html')}  {stats}")
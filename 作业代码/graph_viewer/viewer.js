@@ -0,0 +1,169 @@
+// 知识图谱查看器：纯canvas绘制，坐标已离线算好（不跑物理模拟）
+// 缩小时画社区概览，放大后按视野加载data/下的分块（JSONP，file://下也能用）
+var GraphViewer = (function () {
+  var PALETTE = ["#E64A19", "#1976D2", "#388E3C", "#FBC02D", "#7B1FA2", "#0097A7",
+                 "#C2185B", "#5D4037", "#455A64", "#F57C00", "#512DA8", "#689F38"];
+  var DETAIL_PX = 6;   // 相邻节点在屏幕上相距超过6像素时切换到细节层
+  var canvas = document.getElementById("graph");
+  var ctx = canvas.getContext("2d");
+  var tip = document.getElementById("tip");
+  var meta = null, overview = null, tiles = {}, loading = {};
+  var view = { x: 0, y: 0, scale: 1 };   // 屏幕坐标 = (世界坐标 - view.x/y) × scale
+
+  function color(group) { return PALETTE[group % PALETTE.length]; }
+  function radius(size, detail) { return detail ? 2 + Math.log(1 + size) : 4 + 2 * Math.sqrt(size); }
+  function sx(x) { return (x - view.x) * view.scale; }
+  function sy(y) { return (y - view.y) * view.scale; }
+  function detailMode() { return meta && meta.spacing * view.scale >= DETAIL_PX; }
+
+  function resize() {
+    canvas.width = window.innerWidth;
+    canvas.height = window.innerHeight;
+    draw();
+  }
+
+  function fit(bounds) {
+    // bounds = [minX, minY, maxX, maxY]（整张图的范围，导出时算好）
+    var minX = bounds[0], minY = bounds[1], maxX = bounds[2], maxY = bounds[3];
+    view.scale = 0.9 * Math.min(canvas.width / (maxX - minX + 1), canvas.height / (maxY - minY + 1));
+    view.x = (minX + maxX) / 2 - canvas.width / 2 / view.scale;
+    view.y = (minY + maxY) / 2 - canvas.height / 2 / view.scale;
+  }
+
+  // ---- 分块按需加载 ----
+  function visibleTiles() {
+    var size = meta.tile_size, grid = meta.grid, keys = [];
+    var i0 = Math.max(0, Math.floor((view.x - meta.origin[0]) / size));
+    var j0 = Math.max(0, Math.floor((view.y - meta.origin[1]) / size));
+    var i1 = Math.min(grid - 1, Math.floor((view.x + canvas.width / view.scale - meta.origin[0]) / size));
+    var j1 = Math.min(grid - 1, Math.floor((view.y + canvas.height / view.scale - meta.origin[1]) / size));
+    for (var i = i0; i <= i1; i++) for (var j = j0; j <= j1; j++) keys.push("tile_" + i + "_" + j);
+    return keys.filter(function (k) { return meta.tileSet[k]; });
+  }
+
+  function load(key) {
+    if (tiles[key] || loading[key]) return;
+    loading[key] = true;
+    var script = document.createElement("script");
+    script.src = "data/" + key + ".js";
+    document.body.appendChild(script);
+  }
+
+  // ---- 绘制 ----
+  function drawEdges(x1, y1, x2, y2, w, labels) {
+    ctx.strokeStyle = "rgba(120,120,120,0.35)";
+    for (var e = 0; e < x1.length; e++) {
+      ctx.lineWidth = Math.min(1 + Math.log(w[e]), 6);
+      ctx.beginPath();
+      ctx.moveTo(sx(x1[e]), sy(y1[e]));
+      ctx.lineTo(sx(x2[e]), sy(y2[e]));
+      ctx.stroke();
+      if (labels) {
+        ctx.fillStyle = "#666";
+        ctx.fillText(labels[e], (sx(x1[e]) + sx(x2[e])) / 2, (sy(y1[e]) + sy(y2[e])) / 2);
+      }
+    }
+  }
+
+  function drawNodes(nodes, detail, showLabels) {
+    for (var i = 0; i < nodes.x.length; i++) {
+      var x = sx(nodes.x[i]), y = sy(nodes.y[i]);
+      if (x < -50 || y < -50 || x > canvas.width + 50 || y > canvas.height + 50) continue;
+      ctx.fillStyle = color(nodes.group[i]);
+      ctx.beginPath();
+      ctx.arc(x, y, radius(nodes.size[i], detail), 0, 2 * Math.PI);
+      ctx.fill();
+      if (showLabels) {
+        ctx.fillStyle = "#222";
+        ctx.fillText(nodes.label[i], x + radius(nodes.size[i], detail) + 2, y + 4);
+      }
+    }
+  }
+
+  function draw() {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    if (!meta || !overview) return;
+    ctx.font = "12px Microsoft YaHei, sans-serif";
+    if (!detailMode()) {
+      var n = overview.nodes, ed = overview.edges;
+      drawEdges(ed.s.map(function (s) { return n.x[s]; }), ed.s.map(function (s) { return n.y[s]; }),
+                ed.t.map(function (t) { return n.x[t]; }), ed.t.map(function (t) { return n.y[t]; }), ed.w, null);
+      drawNodes(n, false, true);
+      return;
+    }
+    var keys = visibleTiles(), showLabels = meta.spacing * view.scale >= 4 * DETAIL_PX;
+    keys.forEach(function (k) {
+      var t = tiles[k];
+      if (!t) { load(k); return; }
+      drawEdges(t.edges.x1, t.edges.y1, t.edges.x2, t.edges.y2, t.edges.w,
+                showLabels ? t.edges.rel.map(function (r) { return meta.relations[r]; }) : null);
+    });
+    keys.forEach(function (k) { if (tiles[k]) drawNodes(tiles[k].nodes, true, showLabels); });
+  }
+
+  // ---- 悬停提示 ----
+  function hover(mx, my) {
+    var sets = detailMode() ? visibleTiles().map(function (k) { return tiles[k] && tiles[k].nodes; })
+                            : [overview && overview.nodes];
+    var best = null, bestDist = 100;
+    sets.forEach(function (nodes) {
+      if (!nodes) return;
+      for (var i = 0; i < nodes.x.length; i++) {
+        var dx = sx(nodes.x[i]) - mx, dy = sy(nodes.y[i]) - my, d = dx * dx + dy * dy;
+        if (d < bestDist) { bestDist = d; best = nodes.label[i] + "（权重" + nodes.size[i] + "）"; }
+      }
+    });
+    tip.style.display = best ? "block" : "none";
+    if (best) { tip.textContent = best; tip.style.left = (mx + 12) + "px"; tip.style.top = (my + 12) + "px"; }
+  }
+
+  // ---- 交互：拖动平移、滚轮缩放 ----
+  var drag = null;
+  canvas.addEventListener("mousedown", function (e) { drag = { x: e.clientX, y: e.clientY }; });
+  window.addEventListener("mouseup", function () { drag = null; });
+  canvas.addEventListener("mousemove", function (e) {
+    if (drag) {
+      view.x -= (e.clientX - drag.x) / view.scale;
+      view.y -= (e.clientY - drag.y) / view.scale;
+      drag = { x: e.clientX, y: e.clientY };
+      draw();
+    } else {
+      hover(e.clientX, e.clientY);
+    }
+  });
+  canvas.addEventListener("wheel", function (e) {
+    e.preventDefault();
+    var factor = e.deltaY < 0 ? 1.2 : 1 / 1.2;
+    var wx = view.x + e.clientX / view.scale, wy = view.y + e.clientY / view.scale;
+    view.scale *= factor;
+    view.x = wx - e.clientX / view.scale;
+    view.y = wy - e.clientY / view.scale;
+    draw();
+  }, { passive: false });
+  window.addEventListener("resize", resize);
+
+  // ---- 数据回调（data/*.js调用） ----
+  function receive(key, data) {
+    if (key === "meta") {
+      meta = data;
+      meta.tileSet = {};
+      data.tiles.forEach(function (k) { meta.tileSet[k] = true; });
+      fit(data.bounds);
+      document.title = data.title;
+      document.getElementById("title").textContent = data.title;
+      document.getElementById("stats").textContent = Object.keys(data.stats).map(function (k) {
+        return k + "：" + data.stats[k];
+      }).join("　");
+    } else if (key === "overview") {
+      overview = data;
+    } else {
+      tiles[key] = data;
+      delete loading[key];
+    }
+    draw();
+  }
+
+  canvas.width = window.innerWidth;
+  canvas.height = window.innerHeight;
+  return { receive: receive };
+})();
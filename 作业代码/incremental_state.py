@@ -0,0 +1,129 @@
+# 增量分析状态：记录各分析阶段处理过的评论ID，并保存可合并的汇总结果（词频、极性计数、三元组计数等）
+# 语料只增不减：重跑时只处理新评论，把新结果合并进已存的汇总，耗时与新增数据量成正比
+import hashlib
+import json
+import os
+import sqlite3
+from collections import Counter
+
+# ---------------------- 1. 状态库配置 ----------------------
+# 默认放在代码同文件夹，可用环境变量ANALYSIS_STATE_PATH改位置
+STATE_PATH = os.environ.get(
+    "ANALYSIS_STATE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "增量分析状态.sqlite")
+)
+BATCH_SIZE = 500      # 批量查询的ID数（sqlite单条SQL参数上限999）
+
+
+def stage_key(name, *config):
+    """
+    阶段标识：阶段名+配置指纹（停用词、词典、情感词库等）
+    配置一改指纹就变，相当于换了新阶段，自动全量重算一次
+    """
+    blob = json.dumps(config, ensure_ascii=False, sort_keys=True, default=sorted)
+    return f"{name}@{hashlib.sha1(blob.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _encode_key(key):
+    return list(key) if isinstance(key, tuple) else key
+
+def _decode_key(key):
+    return tuple(key) if isinstance(key, list) else key
+
+
+# ---------------------- 2. 状态库主体 ----------------------
+class IncrementalState:
+    """
+    processed表：(阶段, 评论ID) → 逐条结果（可选，JSON）
+    aggregates表：(阶段, 名称) → 汇总结果（JSON；Counter的键可以是字符串或元组）
+    处理清单和汇总在同一个事务里提交，中途出错不会出现“记了已处理却没合并”的情况
+    """
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed ("
+            "stage TEXT, comment_id INTEGER, payload TEXT, PRIMARY KEY (stage, comment_id)) WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS aggregates (stage TEXT, name TEXT, value TEXT, PRIMARY KEY (stage, name))"
+        )
+
+    # ---- 处理清单 ----
+    def unseen(self, stage, ids):
+        """返回与ids一一对应的布尔列表：True=该阶段还没处理过"""
+        ids = [int(i) for i in ids]
+        done = set()
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            sql = f"SELECT comment_id FROM processed WHERE stage = ? AND comment_id IN ({','.join('?' * len(batch))})"
+            done.update(row[0] for row in self.conn.execute(sql, [stage] + batch))
+        return [i not in done for i in ids]
+
+    def mark_done(self, stage, ids, payloads=None):
+        """记录已处理的评论；payloads为逐条结果（与ids一一对应），需要逐条导出时才传"""
+        ids = [int(i) for i in ids]
+        if payloads is None:
+            rows = ((stage, i, None) for i in ids)
+        else:
+            rows = ((stage, i, json.dumps(p, ensure_ascii=False)) for i, p in zip(ids, payloads))
+        self.conn.executemany("INSERT OR REPLACE INTO processed VALUES (?, ?, ?)", rows)
+
+    def payloads(self, stage):
+        """该阶段所有已处理评论的逐条结果：{评论ID: 结果}"""
+        rows = self.conn.execute(
+            "SELECT comment_id, payload FROM processed WHERE stage = ? AND payload IS NOT NULL", (stage,)
+        )
+        return {cid: json.loads(p) for cid, p in rows}
+
+    def processed_count(self, stage):
+        return self.conn.execute("SELECT COUNT(*) FROM processed WHERE stage = ?", (stage,)).fetchone()[0]
+
+    # ---- 可合并的汇总 ----
+    def load_value(self, stage, name, default=None):
+        row = self.conn.execute(
+            "SELECT value FROM aggregates WHERE stage = ? AND name = ?", (stage, name)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def save_value(self, stage, name, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO aggregates VALUES (?, ?, ?)",
+            (stage, name, json.dumps(value, ensure_ascii=False))
+        )
+
+    def load_counter(self, stage, name):
+        return Counter({_decode_key(k): v for k, v in self.load_value(stage, name, [])})
+
+    def merge_counter(self, stage, name, delta):
+        """把本次新增的计数合并进已存的Counter，返回合并后的全量Counter（随commit一起落盘）"""
+        total = self.load_counter(stage, name)
+        total.update(delta)
+        self.save_value(stage, name, [[_encode_key(k), v] for k, v in total.items()])
+        return total
+
+    def reset(self, stage):
+        """清空某阶段（下次全量重算）"""
+        self.conn.execute("DELETE FROM processed WHERE stage = ?", (stage,))
+        self.conn.execute("DELETE FROM aggregates WHERE stage = ?", (stage,))
+        self.conn.commit()
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        # 不自动提交：没走到commit()的半截结果直接丢弃
+        self.conn.close()
+
+
+# ---------------------- 3. 模块级快捷函数 ----------------------
+_default_state = None
+
+def get_state():
+    global _default_state
+    if _default_state is None:
+        _default_state = IncrementalState()
+        import atexit
+        atexit.register(_default_state.close)
+    return _default_state
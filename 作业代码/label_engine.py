@@ -0,0 +1,95 @@
+# 关键词标签引擎：每个标签的关键词编译成一个忽略大小写的正则，整列评论用pandas向量化匹配
+# 单标签（按标签顺序取第一个命中）用np.select一次选出，直接输出分类列（整数编码+共用的标签表）；多标签输出稀疏指示矩阵，交叉表直接由矩阵乘法得到
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class LabelEngine:
+    """
+    :param label_keywords: {标签: [关键词, ...]}，字典顺序即优先级
+    :param default: 一个关键词都没命中时的标签（如"无明确场景"）
+    """
+
+    def __init__(self, label_keywords, default):
+        self.labels = list(label_keywords)
+        self.default = default
+        # 只判断命中与否，关键词顺序无关；忽略大小写（“MV”“AR”也能匹配小写评论）
+        self.patterns = [
+            re.compile("|".join(re.escape(w) for w in sorted(set(words))), re.IGNORECASE)
+            for words in label_keywords.values()
+        ]
+
+    @property
+    def categories(self):
+        """全部标签（含默认标签，排在最后）"""
+        return self.labels + [self.default]
+
+    # ---------------------- 1. 打标签 ----------------------
+    def indicator(self, texts, sparse_output=False):
+        """
+        多标签指示矩阵：第i条评论命中第j个标签为True（n×标签数）
+        每个标签对整列做一次C层正则匹配，空值视为不命中
+        :param sparse_output: True时返回scipy稀疏矩阵（大多数评论只命中0~1个标签）
+        """
+        texts = pd.Series(texts, copy=False).astype("string")
+        columns = [texts.str.contains(p, na=False).to_numpy(dtype=bool) for p in self.patterns]
+        matrix = np.column_stack(columns) if columns else np.zeros((len(texts), 0), dtype=bool)
+        return sparse.csr_matrix(matrix) if sparse_output else matrix
+
+    def codes(self, indicator):
+        """每条评论第一个命中标签的序号（按标签顺序；都没命中=len(labels)，即默认标签）"""
+        k = len(self.labels)
+        if sparse.issparse(indicator):
+            # 稀疏矩阵：每行第一个非零元素的列号就是第一个命中的标签，不用转成稠密矩阵
+            m = sparse.csr_matrix(indicator)
+            m.eliminate_zeros()
+            m.sort_indices()
+            codes = np.full(m.shape[0], k)
+            nonempty = np.diff(m.indptr) > 0
+            codes[nonempty] = m.indices[m.indptr[:-1][nonempty]]
+            return codes
+        return np.select(list(indicator.T), np.arange(k), default=k)
+
+    def first_label(self, indicator):
+        """
+        每条评论第一个命中的标签（等价于逐条按标签顺序any()匹配）
+        :return: pd.Categorical，编码即codes()，标签表为categories（不为每条评论存一份字符串）
+        """
+        return pd.Categorical.from_codes(self.codes(indicator), categories=self.categories)
+
+    def label(self, texts):
+        return self.first_label(self.indicator(texts))
+
+    # ---------------------- 2. 交叉表 ----------------------
+    def crosstab(self, indicator, other, multi=False):
+        """
+        标签×other的计数表（行按标签顺序、列按other的取值排序，去掉全0行列，与pd.crosstab(first_label(), other)一致）
+        :param indicator: indicator()的结果
+        :param other: 与评论一一对应的另一列（如情感类型）
+        :param multi: False=每条评论只算第一个命中的标签；True=命中几个标签就各算一次（没命中的算默认标签）
+        """
+        other = pd.Series(other, copy=False)
+        other_codes, other_values = pd.factorize(other, sort=True)
+        n = len(other_codes)
+        valid = other_codes >= 0
+        rows = np.arange(n)[valid]
+        other_onehot = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, other_codes[valid])), shape=(n, len(other_values))
+        )
+        k = len(self.labels)
+        if multi:
+            hits = sparse.csr_matrix(indicator, dtype=np.int64)
+            none = np.asarray(hits.sum(axis=1)).ravel() == 0
+            label_onehot = sparse.hstack([hits, sparse.csr_matrix(none.astype(np.int64)[:, None])]).tocsr()
+        else:
+            label_onehot = sparse.csr_matrix(
+                (np.ones(n, dtype=np.int64), (np.arange(n), self.codes(indicator))), shape=(n, k + 1)
+            )
+        table = pd.DataFrame((label_onehot.T @ other_onehot).toarray(), index=self.categories,
+                             columns=other_values)
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0].sort_index(axis=1)
+        table.index.name = "label"
+        table.columns.name = other.name
+        return table
@@ -0,0 +1,93 @@
+# 多模式词典匹配（Aho–Corasick自动机）：词典只编译一次，每条评论扫描一遍即可找出全部命中
+from collections import Counter, deque
+from functools import lru_cache
+
+class LexiconMatcher:
+    """
+    Aho–Corasick多模式匹配器
+    :param words: 词典（情感词/反讽词/实体词等）
+    :param ignore_case: 是否忽略大小写（词典和文本统一转小写）
+    """
+
+    def __init__(self, words, ignore_case=False):
+        self.ignore_case = ignore_case
+        self.words = list(dict.fromkeys(w.lower() if ignore_case else w for w in words if w))
+        # 状态转移表：goto[状态][字符] → 下一状态；fail为失配指针；out为该状态结束的词（下标）
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for idx, word in enumerate(self.words):
+            state = 0
+            for ch in word:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = self.out[state] + (idx,)
+        self._build_fail()
+
+    def _build_fail(self):
+        """广度优先构造失配指针，并把失配状态的输出合并进来"""
+        queue = deque(self.goto[0].values())  # 第一层状态的失配指针都指向根
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text):
+        """逐个产出命中：(起始位置, 结束位置, 命中词)，包含重叠命中"""
+        if not text:
+            return
+        if self.ignore_case:
+            text = text.lower()
+        goto, fail, out, words = self.goto, self.fail, self.out, self.words
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                word = words[idx]
+                yield i - len(word) + 1, i + 1, word
+
+    def count_by_word(self, text):
+        """各词出现次数（同一个词不重叠计数，与str.count一致）"""
+        counts = Counter()
+        last_end = {}
+        for start, end, word in self.finditer(text):
+            if start >= last_end.get(word, 0):
+                counts[word] += 1
+                last_end[word] = end
+        return counts
+
+    def count(self, text):
+        """词典中所有词的出现总次数（等价于逐词text.count再求和）"""
+        return sum(self.count_by_word(text).values())
+
+    def found(self, text):
+        """文本中出现过的词集合"""
+        return {word for _, _, word in self.finditer(text)}
+
+    def contains_any(self, text):
+        """文本是否包含词典中任意一个词（命中即停）"""
+        for _ in self.finditer(text):
+            return True
+        return False
+
+
+@lru_cache(maxsize=None)
+def _cached_matcher(words, ignore_case):
+    return LexiconMatcher(words, ignore_case)
+
+def get_matcher(words, ignore_case=False):
+    """按词典内容缓存匹配器，同一词典在进程内只编译一次"""
+    return _cached_matcher(tuple(words), ignore_case)
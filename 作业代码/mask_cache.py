@@ -0,0 +1,82 @@
+# 蒙版库：二值化/心形蒙版用numpy一次算完，结果存成.npy（按源文件内容哈希+参数命名），之后各次运行、各进程直接内存映射读取
+import hashlib
+import os
+from functools import lru_cache
+import numpy as np
+from PIL import Image
+
+# ---------------------- 1. 缓存配置 ----------------------
+# 默认放在代码同文件夹的“蒙版缓存”目录，可用环境变量MASK_CACHE_DIR改位置
+CACHE_DIR = os.environ.get(
+    "MASK_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "蒙版缓存")
+)
+HASH_CHUNK = 1 << 20   # 计算文件哈希时每次读取1MB
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _cached_array(key, build):
+    """按key读取缓存的.npy（内存映射，只读）；没有则调用build()生成并保存"""
+    path = os.path.join(CACHE_DIR, f"{key}.npy")
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # 先写临时文件再改名，多个进程同时生成也不会读到半截文件
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, build())
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # 另一个进程已生成同一份缓存并正在内存映射读取（Windows下不能覆盖打开中的文件）：直接用它的
+            os.remove(tmp)
+            if not os.path.exists(path):
+                raise
+    return np.load(path, mmap_mode="r")
+
+
+# ---------------------- 2. 图片蒙版二值化 ----------------------
+def threshold_mask(img, threshold=200, mode="L"):
+    """
+    二值化：亮于阈值=背景(255)，其余=文字区(0)，返回uint8数组
+    mode="L"：灰度直接比阈值；mode="RGB"：三通道之和比阈值（JPG压缩杂色多时用，如550）
+    """
+    img = np.asarray(img)
+    level = img if mode == "L" else img.sum(axis=2, dtype=np.uint16)
+    return np.where(level > threshold, np.uint8(255), np.uint8(0))
+
+@lru_cache(maxsize=None)
+def _load_mask(mask_path, mtime, threshold, mode):
+    key = f"{_file_hash(mask_path)}_{mode}_{threshold}"
+    return _cached_array(key, lambda: threshold_mask(Image.open(mask_path).convert(mode), threshold, mode))
+
+def load_mask(mask_path, threshold=200, mode="L"):
+    """
+    读取二值化蒙版（白色背景=255，文字区=0）
+    同一图片同一参数只处理一次：进程内直接复用，跨运行/跨进程读.npy缓存
+    文件不存在返回None（生成矩形词云）
+    """
+    if not mask_path or not os.path.exists(mask_path):
+        print(f"⚠️  未找到蒙版：{mask_path}")
+        return None
+    return _load_mask(mask_path, os.path.getmtime(mask_path), threshold, mode)
+
+
+# ---------------------- 3. 心形蒙版 ----------------------
+def _build_heart(size):
+    # 经典心形方程（确保轮廓标准）；用广播代替meshgrid，不生成两张全尺寸坐标网格
+    x = np.linspace(-1.2, 1.2, size)[None, :]
+    y = np.linspace(-1.5, 1.0, size)[:, None]
+    heart = (x**2 + (y - np.sqrt(np.abs(x)))**2) <= 0.8
+    # 明确：心形内=文字区（0），心形外=背景（255）
+    return np.where(heart, np.uint8(0), np.uint8(255))
+
+@lru_cache(maxsize=None)
+def load_heart_mask(size=600):
+    """标准爱心蒙版（size×size），生成一次后缓存"""
+    return _cached_array(f"heart_{size}", lambda: _build_heart(size))
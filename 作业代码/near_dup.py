@@ -0,0 +1,116 @@
+# 近重复评论检测（MinHash + LSH分桶）：控评、复制粘贴刷屏归为同一簇，后续分析每簇只需处理一条代表评论
+import re
+import zlib
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.8   # 相似度（Jaccard）达到该值视为近重复
+NORMALIZE_RE = re.compile(r"[\W_]+")  # 比较前去掉空白、标点、表情
+
+
+# ---------------------- 1. MinHash签名 ----------------------
+class MinHasher:
+    """
+    字符n-gram分片 → MinHash签名（numpy一次算完全部哈希函数）
+    :param num_perm: 哈希函数个数（签名长度），越大相似度估计越准、越慢
+    :param ngram: 分片长度（中文评论按字切，3字一片）
+    """
+
+    def __init__(self, num_perm=64, ngram=3, seed=1):
+        rng = np.random.default_rng(seed)
+        # 乘移位哈希：h(x) = (a*x + b) mod 2^64 的高32位，a取奇数
+        self.a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.ngram = ngram
+
+    def shingles(self, key):
+        n = self.ngram
+        if len(key) <= n:
+            return {key} if key else set()
+        return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+    def signature(self, key):
+        """已归一化文本的签名（uint32数组）；空文本返回None"""
+        sh = self.shingles(key)
+        if not sh:
+            return None
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in sh), dtype=np.uint64, count=len(sh))
+        h = (self.a[:, None] * x[None, :] + self.b[:, None]) >> np.uint64(32)
+        return h.min(axis=1).astype(np.uint32)
+
+
+def lsh_params(threshold, num_perm):
+    """选分桶参数(段数b, 每段行数r)：使LSH的命中拐点(1/b)^(1/r)最接近阈值"""
+    best = None
+    for r in range(1, num_perm + 1):
+        b = num_perm // r
+        gap = abs((1 / b) ** (1 / r) - threshold)
+        if best is None or gap < best[0]:
+            best = (gap, b, r)
+    return best[1], best[2]
+
+
+# ---------------------- 2. 增量近重复索引 ----------------------
+class NearDupIndex:
+    """
+    边导入边判重：每来一条评论返回它所属的簇ID（该簇第一条评论的序号，从0开始）
+    签名分段放进LSH桶，只和同桶的簇代表比较，总耗时随评论数近似线性增长
+    :param threshold: 相似度阈值（0~1，1表示只合并归一化后完全相同的评论）
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=64, ngram=3, seed=1):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, ngram, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.exact = {}        # 归一化文本 → 簇ID（完全相同的评论不用再算签名；直接用文本当键，不会因哈希碰撞误并）
+        self.signatures = {}   # 簇ID → 代表评论的签名
+        self.count = 0
+
+    @property
+    def clusters(self):
+        """目前的簇数（含归一化后为空的评论所在的簇）"""
+        return len(set(self.exact.values()))
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, text):
+        """加入一条评论，返回簇ID"""
+        idx = self.count
+        self.count += 1
+        key = NORMALIZE_RE.sub("", str(text)).lower()
+        if key in self.exact:
+            return self.exact[key]
+
+        sig = self.hasher.signature(key)
+        if sig is None:  # 纯表情/标点：归一化后为空，全部归为一簇
+            self.exact[key] = idx
+            return idx
+
+        band_keys = self._band_keys(sig)
+        best, best_sim = None, self.threshold
+        checked = set()
+        for bucket, k in zip(self.buckets, band_keys):
+            for cid in bucket.get(k, ()):
+                if cid in checked:
+                    continue
+                checked.add(cid)
+                sim = np.count_nonzero(self.signatures[cid] == sig) / len(sig)
+                if sim >= best_sim and (best is None or sim > best_sim):
+                    best, best_sim = cid, sim
+        if best is None:
+            # 新簇：自己就是代表
+            best = idx
+            self.signatures[idx] = sig
+            for bucket, k in zip(self.buckets, band_keys):
+                bucket.setdefault(k, []).append(idx)
+        self.exact[key] = best
+        return best
+
+
+def cluster_ids(texts, threshold=DEFAULT_THRESHOLD, **kwargs):
+    """批量：返回每条评论的簇ID列表（与texts一一对应）"""
+    index = NearDupIndex(threshold, **kwargs)
+    return [index.add(t) for t in texts]
@@ -0,0 +1,113 @@
+# 多进程jieba分词：把清洗后的评论分片交给进程池，结果按原顺序返回
+import argparse
+import multiprocessing as mp
+import os
+import time
+import jieba
+
+# ---------------------- 1. 子进程全局状态（每个进程只初始化一次） ----------------------
+_STOP_WORDS = frozenset()
+_MIN_LEN = 1
+
+def _init_worker(userdict, stop_words, min_len):
+    """进程池初始化：加载自定义词典+停用词表，之后每片评论直接复用"""
+    global _STOP_WORDS, _MIN_LEN
+    if userdict:
+        jieba.load_userdict(userdict)
+    jieba.initialize()
+    _STOP_WORDS = frozenset(stop_words or ())
+    _MIN_LEN = min_len
+
+def _cut_chunk(texts):
+    """子进程：对一片评论分词（给了停用词就顺带过滤）"""
+    result = []
+    for t in texts:
+        words = jieba.lcut(t, cut_all=False) if t else []
+        if _STOP_WORDS or _MIN_LEN > 1:
+            words = [w for w in words if w not in _STOP_WORDS and len(w) >= _MIN_LEN]
+        result.append(words)
+    return result
+
+
+# ---------------------- 2. 并行分词主函数 ----------------------
+def segment(texts, workers=None, userdict=None, stop_words=None, min_len=1, chunksize=2000):
+    """
+    多进程分词
+    :param texts: 清洗后的评论序列（None/空字符串返回空列表）
+    :param workers: 进程数（默认CPU核数，≤1时直接在当前进程分词）
+    :param userdict: jieba自定义词典路径
+    :param stop_words: 停用词集合（给出时过滤停用词）
+    :param min_len: 保留的最短词长
+    :return: 与texts顺序一致的分词列表
+    """
+    texts = [t if t else "" for t in texts]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= chunksize:
+        _init_worker(userdict, stop_words, min_len)
+        try:
+            return _cut_chunk(texts)
+        finally:
+            _init_worker(None, None, 1)
+
+    # 主进程也加载自定义词典，保证分词缓存的词典版本与子进程一致
+    if userdict:
+        jieba.load_userdict(userdict)
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    with mp.Pool(workers, initializer=_init_worker, initargs=(userdict, stop_words, min_len)) as pool:
+        # map按分片顺序返回，拼接后即原始顺序
+        parts = pool.map(_cut_chunk, chunks)
+    return [words for part in parts for words in part]
+
+
+# ---------------------- 3. 分词，停用词.py的批量替代函数 ----------------------
+def get_raw_tokens_batch(cleaned_comments, workers=None, use_cache=True):
+    """批量版get_raw_tokens：仅分词（保留停用词）"""
+    cleaned_comments = list(cleaned_comments)
+    if not use_cache:
+        return segment(cleaned_comments, workers=workers)
+    import token_cache
+    return token_cache.get_cache().lcut_many(
+        cleaned_comments, cutter=lambda missing: segment(missing, workers=workers)
+    )
+
+def get_filtered_tokens_batch(cleaned_comments, stop_words, workers=None, use_cache=True):
+    """批量版get_filtered_tokens：分词+去停用词+去单字"""
+    if not use_cache:
+        return segment(cleaned_comments, workers=workers, stop_words=stop_words, min_len=2)
+    return [
+        [t for t in tokens if t not in stop_words and len(t) >= 2]
+        for tokens in get_raw_tokens_batch(cleaned_comments, workers=workers)
+    ]
+
+
+# ---------------------- 4. 基准测试：串行 vs 多进程 ----------------------
+def benchmark(texts, workers_list=(2, 4, 8), chunksize=2000):
+    """对同一批评论分别跑串行和多进程分词，打印耗时和加速比"""
+    jieba.initialize()
+    start = time.perf_counter()
+    serial = [jieba.lcut(t, cut_all=False) if t else [] for t in texts]
+    serial_cost = time.perf_counter() - start
+    print(f"串行分词：{len(texts)}条，耗时{serial_cost:.2f}s")
+    for workers in workers_list:
+        start = time.perf_counter()
+        parallel = segment(texts, workers=workers, chunksize=chunksize)
+        cost = time.perf_counter() - start
+        same = "一致" if parallel == serial else "不一致！"
+        print(f"{workers}进程分词：耗时{cost:.2f}s，加速比{serial_cost / cost:.2f}x，结果与串行{same}")
+
+
+if __name__ == "__main__":
+    import re
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="多进程jieba分词基准测试")
+    parser.add_argument("excel", help="评论Excel文件（如赵丽颖评论爬取.xlsx）")
+    parser.add_argument("--column", default="评论内容", help="评论列名")
+    parser.add_argument("--repeat", type=int, default=1, help="评论重复倍数（模拟大数据量）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8], help="要测试的进程数")
+    parser.add_argument("--chunksize", type=int, default=2000, help="每片评论条数")
+    args = parser.parse_args()
+
+    comments = pd.read_excel(args.excel, usecols=[args.column])[args.column].dropna().astype(str)
+    texts = [re.sub(r"[^\u4e00-\u9fa5]", "", c) for c in comments] * args.repeat
+    benchmark(texts, args.workers, args.chunksize)
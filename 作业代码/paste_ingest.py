@@ -0,0 +1,120 @@
+# 评论粘贴采集公共部分：逐行读取粘贴内容 → 边合并边写出（Excel只写模式/CSV，内存占用恒定）
+import argparse
+import csv
+import os
+import sys
+import time
+from openpyxl import Workbook
+from near_dup import NearDupIndex, DEFAULT_THRESHOLD
+
+HEADER = ['序号', '评论内容', '评论级别', '采集时间', '簇ID']  # 簇ID：近重复评论所在簇第一条评论的序号
+DUMP_EXTS = (".txt",)        # 目录里当作页面转储的文件类型
+EXPECTED_SUFFIX = ".expected.txt"  # 基准测试的人工标注文件（和转储放在一起，批量采集时跳过）
+READ_BUFFER = 1 << 20        # 批量读取缓冲区（1MB）
+
+# ---------------------- 1. 读取粘贴内容 ----------------------
+def iter_pasted_lines(end_word="完成"):
+    """逐行读取粘贴内容，直到输入“完成”或输入结束（只产出非空行）"""
+    while True:
+        try:
+            line = input()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if line.strip() == end_word:
+            break
+        if line.strip():
+            yield line.strip()
+
+
+def iter_file_lines(f):
+    """从已打开的文件/标准输入逐行读取（只产出去掉首尾空白的非空行）"""
+    for line in f:
+        line = line.strip()
+        if line:
+            yield line
+
+def iter_dumps(paths):
+    """
+    批量模式：依次产出每份页面转储 (名称, 行生成器)
+    :param paths: 文件/目录路径列表，“-”表示标准输入；目录下按文件名顺序读取所有.txt（跳过.expected.txt标注文件）
+    """
+    for path in paths:
+        if path == "-":
+            yield "stdin", iter_file_lines(sys.stdin)
+        elif os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(DUMP_EXTS) and not name.endswith(EXPECTED_SUFFIX):
+                    yield from iter_dumps([os.path.join(path, name)])
+        else:
+            with open(path, "r", encoding="utf-8-sig", errors="replace", buffering=READ_BUFFER) as f:
+                yield os.path.splitext(os.path.basename(path))[0], iter_file_lines(f)
+
+def parse_batch_args(description):
+    """采集脚本的命令行参数：不带路径时走交互粘贴模式"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("paths", nargs="*", help="页面转储文件/目录（“-”表示从标准输入读取）；不填则交互粘贴")
+    parser.add_argument("--out-dir", help="输出目录（默认：交互模式为桌面，批量模式为当前目录）")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"近重复相似度阈值（0~1，默认{DEFAULT_THRESHOLD}；1表示只合并完全相同的评论）")
+    return parser.parse_args()
+
+
+# ---------------------- 2. 评论级别 ----------------------
+# 多行合并/切分评论见comment_parser.py（各平台的边界判定统一在那里）
+def comment_level(comment):
+    """区分一级/二级评论"""
+    return "二级评论" if ("回复" in comment or "@" in comment) else "一级评论"
+
+
+# ---------------------- 3. 流式写出 ----------------------
+def save_comments(comments, path, sheet_title="评论", preview_count=10,
+                  dedup_threshold=DEFAULT_THRESHOLD, stats=None):
+    """
+    边读边写评论（.xlsx用openpyxl只写模式，.csv用csv.writer），返回(评论数, 前几条预览)
+    采集时间整批只取一次；没有评论时不生成文件
+    每条评论同时标上近重复簇ID，stats传入字典时在stats["clusters"]里记录簇数
+    """
+    collected_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    index = NearDupIndex(dedup_threshold)
+    preview = []
+    count = 0
+    rows = ((i, com, comment_level(com), collected_at, index.add(com) + 1) for i, com in enumerate(comments, 1))
+
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+                if len(preview) < preview_count:
+                    preview.append(row[1])
+        if stats is not None:
+            stats["clusters"] = index.clusters
+        if not count:
+            os.remove(path)
+        return count, preview
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+        count += 1
+        if len(preview) < preview_count:
+            preview.append(row[1])
+    if stats is not None:
+        stats["clusters"] = index.clusters
+    if count:
+        wb.save(path)
+    return count, preview
+
+def print_preview(preview, count):
+    """预览前10条评论"""
+    print("\n前10条评论预览：")
+    print("-" * 50)
+    for i, com in enumerate(preview, 1):
+        text = com[:50] + "..." if len(com) > 50 else com
+        print(f"{i}. {text}")
+    if count > len(preview):
+        print(f"... 还有 {count - len(preview)} 条评论")
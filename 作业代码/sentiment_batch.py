@@ -0,0 +1,68 @@
+# 批量情感分析：相同评论只算一次SnowNLP，极性和得分一起返回，可选多进程
+import multiprocessing as mp
+import os
+import pandas as pd
+from snownlp import SnowNLP
+from lexicon_matcher import get_matcher
+
+# 反讽词库（可根据数据补充）
+irony_words = ["呵呵", "真厉害", "绝了（反讽）", "就这", "不愧是你（反讽）"]
+# 情感极性取值表：结果里的极性列是分类列（整数编码+这张共用的表）
+POLARITIES = ["正向", "中性", "负向"]
+
+# ---------------------- 1. 单条情感分析（含反讽词过滤，提升准确性） ----------------------
+def emotion_analysis(text):
+    if pd.isna(text) or text.strip() == "" or len(text) < 5:  # 过滤短评论
+        return {"polarity": "中性", "score": 0.5}
+
+    if get_matcher(irony_words).contains_any(text):
+        return {"polarity": "负向", "score": 0.2}
+
+    s = SnowNLP(text)
+    score = s.sentiments  # 情感得分（0-1，越接近1越正向）
+    if score >= 0.6:
+        polarity = "正向"
+    elif score <= 0.4:
+        polarity = "负向"
+    else:
+        polarity = "中性"
+    return {"polarity": polarity, "score": score}
+
+def _analyze_chunk(texts):
+    """子进程：对一片去重后的评论打分，返回(极性, 得分)列表"""
+    results = []
+    for text in texts:
+        r = emotion_analysis(text)
+        results.append((r["polarity"], r["score"]))
+    return results
+
+
+# ---------------------- 2. 批量情感分析 ----------------------
+def batch_emotion_analysis(texts, workers=1, chunksize=500):
+    """
+    批量情感分析：先对评论去重，每条不同的评论只建一次SnowNLP
+    :param texts: 评论序列（Series时保留原索引）
+    :param workers: 进程数（>1时去重后的评论分片交给进程池）
+    :param chunksize: 每片评论条数
+    :return: DataFrame，列为“情感极性”（分类列，取值表POLARITIES）“情感得分”，行与texts一一对应
+    """
+    index = texts.index if isinstance(texts, pd.Series) else None
+    texts = list(texts)
+    # 缓存：评论内容 → (极性, 得分)，刷屏/复制粘贴评论只算一次
+    unique = list(dict.fromkeys(t for t in texts if not pd.isna(t)))
+    chunks = [unique[i:i + chunksize] for i in range(0, len(unique), chunksize)]
+    if workers > 1 and len(chunks) > 1:
+        with mp.Pool(min(workers, os.cpu_count() or 1)) as pool:
+            parts = pool.map(_analyze_chunk, chunks)
+    else:
+        parts = [_analyze_chunk(chunk) for chunk in chunks]
+    memo = {}
+    for chunk, part in zip(chunks, parts):
+        memo.update(zip(chunk, part))
+
+    neutral = ("中性", 0.5)
+    rows = [neutral if pd.isna(t) else memo[t] for t in texts]
+    print(f"✅ 情感分析完成：{len(texts)}条评论，去重后实际计算{len(unique)}条")
+    result = pd.DataFrame(rows, columns=["情感极性", "情感得分"], index=index)
+    result["情感极性"] = pd.Categorical(result["情感极性"], categories=POLARITIES)
+    return result
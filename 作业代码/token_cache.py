@@ -0,0 +1,147 @@
+# 分词缓存：同一条评论只用jieba分一次词，所有分析脚本共享同一份磁盘缓存
+import hashlib
+import os
+import sqlite3
+import jieba
+
+# ---------------------- 1. 缓存配置 ----------------------
+# 默认缓存文件放在代码同文件夹，可用环境变量TOKEN_CACHE_PATH改位置
+CACHE_PATH = os.environ.get(
+    "TOKEN_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "分词缓存.sqlite")
+)
+SEP = "\x1f"          # 词与词之间的分隔符（评论里不会出现）
+BATCH_SIZE = 500      # 批量查询/写入的条数（sqlite单条SQL参数上限999）
+
+
+# ---------------------- 2. 词典版本（词典变了缓存自动失效） ----------------------
+def dict_state() -> tuple:
+    """
+    词典的运行时状态：词条数、词频总数、强制切分词数
+    （load_userdict/add_word/suggest_freq会改变词条数或词频总数；
+    del_word是把词频设为0，两者都不变，但会把词加进强制切分表）
+    """
+    return len(jieba.dt.FREQ), jieba.dt.total, len(jieba.finalseg.Force_Split_Words)
+
+
+def dict_version() -> str:
+    """生成jieba词典版本标识：jieba版本+主词典+词典运行时状态（自定义词、改词频、删词都会让缓存key变化）"""
+    jieba.dt.initialize()
+    dict_path = jieba.dt.dictionary
+    if dict_path and os.path.exists(dict_path):
+        stat = os.stat(dict_path)
+        dict_tag = f"{os.path.abspath(dict_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+    else:
+        dict_tag = "default"
+    n_words, total, n_split = dict_state()
+    return f"{jieba.__version__}|{dict_tag}|{total}|{n_words}|{n_split}"
+
+
+# ---------------------- 3. 缓存主体 ----------------------
+class TokenCache:
+    """按“评论内容哈希+词典版本+分词模式”缓存jieba.lcut结果"""
+
+    def __init__(self, path: str = CACHE_PATH, cut_all: bool = False, HMM: bool = True):
+        self.path = path
+        self.cut_all = cut_all
+        self.HMM = HMM
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, words TEXT)")
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._version = None
+        self._dict_state = None
+
+    def _prefix(self) -> bytes:
+        # 词典可能在运行中被加载、改词频或删词，每次按词典运行时状态校验
+        if self._version is None or dict_state() != self._dict_state:
+            self._version = dict_version()
+            self._dict_state = dict_state()
+        return f"{self._version}|{self.cut_all}|{self.HMM}\x00".encode("utf-8")
+
+    def _key(self, prefix: bytes, text: str) -> bytes:
+        return hashlib.sha1(prefix + text.encode("utf-8")).digest()
+
+    def _cut(self, text: str) -> list:
+        return jieba.lcut(text, cut_all=self.cut_all, HMM=self.HMM)
+
+    def lcut(self, text: str) -> list:
+        """单条分词（先查缓存，未命中再分词并写入）"""
+        if not text:
+            return []
+        key = self._key(self._prefix(), text)
+        row = self.conn.execute("SELECT words FROM tokens WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.hits += 1
+            return row[0].split(SEP) if row[0] else []
+        self.misses += 1
+        words = self._cut(text)
+        self.conn.execute("INSERT OR REPLACE INTO tokens VALUES (?, ?)", (key, SEP.join(words)))
+        self._pending += 1
+        if self._pending >= BATCH_SIZE:
+            self.commit()
+        return words
+
+    def lcut_many(self, texts, cutter=None) -> list:
+        """
+        批量分词，返回与texts顺序一致的分词列表
+        :param texts: 评论文本序列
+        :param cutter: 未命中文本的批量分词函数（默认逐条jieba.lcut）
+        """
+        texts = list(texts)
+        prefix = self._prefix()
+        key_of = {t: self._key(prefix, t) for t in texts if t}
+        cached = {}
+        unique = list(key_of.items())
+        for start in range(0, len(unique), BATCH_SIZE):
+            batch = unique[start:start + BATCH_SIZE]
+            keys = [k for _, k in batch]
+            sql = f"SELECT key, words FROM tokens WHERE key IN ({','.join('?' * len(keys))})"
+            found = dict(self.conn.execute(sql, keys).fetchall())
+            for text, key in batch:
+                if key in found:
+                    cached[text] = found[key].split(SEP) if found[key] else []
+
+        # 只对未命中的文本分词，然后一次性写回缓存
+        missing = [t for t in key_of if t not in cached]
+        if missing:
+            results = cutter(missing) if cutter else [self._cut(t) for t in missing]
+            for text, words in zip(missing, results):
+                cached[text] = words
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tokens VALUES (?, ?)",
+                ((key_of[t], SEP.join(cached[t])) for t in missing)
+            )
+            self.commit()
+        self.hits += len(key_of) - len(missing)
+        self.misses += len(missing)
+        return [list(cached[t]) if t else [] for t in texts]
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+# ---------------------- 4. 模块级快捷函数（脚本里直接替换jieba.lcut） ----------------------
+_default_cache = None
+
+def get_cache() -> TokenCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TokenCache()
+        import atexit
+        atexit.register(_default_cache.close)
+    return _default_cache
+
+def lcut(text: str) -> list:
+    """等价于jieba.lcut(text)（精确模式），结果走磁盘缓存"""
+    return get_cache().lcut(text)
+
+def lcut_many(texts) -> list:
+    """等价于[jieba.lcut(t) for t in texts]，结果走磁盘缓存"""
+    return get_cache().lcut_many(texts)
@@ -0,0 +1,220 @@
+# 知识图谱三元组库（sqlite）：插入时去重并累计出现次数、记录来源评论ID，按头/关系/尾实体建索引，可随时查询
+import json
+import os
+import sqlite3
+from collections import Counter
+
+# ---------------------- 1. 库配置 ----------------------
+# 默认放在代码同文件夹，可用环境变量TRIPLE_STORE_PATH改位置
+STORE_PATH = os.environ.get(
+    "TRIPLE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "知识图谱.sqlite")
+)
+FLUSH_EVERY = 5000    # 每攒够多少条评论写一次库
+BATCH_SIZE = 500      # 批量查询的ID数（sqlite单条SQL参数上限999）
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS processed (comment_id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS entities (
+    name TEXT, type TEXT, count INTEGER NOT NULL, PRIMARY KEY (name, type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS triples (
+    id INTEGER PRIMARY KEY, head TEXT, rel TEXT, tail TEXT, count INTEGER NOT NULL,
+    UNIQUE (head, rel, tail)
+);
+CREATE INDEX IF NOT EXISTS idx_triples_rel_tail ON triples (rel, tail);
+CREATE INDEX IF NOT EXISTS idx_triples_tail ON triples (tail, head);
+CREATE TABLE IF NOT EXISTS triple_sources (
+    triple_id INTEGER, comment_id INTEGER, PRIMARY KEY (triple_id, comment_id)
+) WITHOUT ROWID;
+"""
+
+
+# ---------------------- 2. 三元组库主体 ----------------------
+class TripleStore:
+    """
+    每条评论的抽取结果用add()写入：同一(头, 关系, 尾)只存一行，次数=提到它的评论数
+    已处理评论ID也存在库里，重跑时只处理新评论（和计数在同一事务里提交）
+    :param config_key: 抽取配置指纹（实体库/情感词库等），与库里记录的不同时自动清空重建
+    """
+
+    def __init__(self, path=STORE_PATH, config_key=None):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        if config_key is not None and self.get_meta("config") != config_key:
+            self.clear()
+            self.set_meta("config", config_key)
+            self.conn.commit()
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self._entities = Counter()
+        self._triples = Counter()
+        self._sources = []
+        self._processed = []
+
+    # ---- 元信息 ----
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def clear(self):
+        for table in ("processed", "entities", "triples", "triple_sources"):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    # ---- 写入 ----
+    def unseen(self, ids):
+        """返回与ids一一对应的布尔列表：True=还没抽取过"""
+        ids = [int(i) for i in ids]
+        done = set()
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            sql = f"SELECT comment_id FROM processed WHERE comment_id IN ({','.join('?' * len(batch))})"
+            done.update(row[0] for row in self.conn.execute(sql, batch))
+        return [i not in done for i in ids]
+
+    def add(self, comment_id, entities=(), triples=()):
+        """
+        写入一条评论的抽取结果（同一条评论里的重复项只算一次）
+        :param entities: [(实体名, 实体类型), ...]
+        :param triples: [(头实体, 关系, 尾实体), ...]
+        """
+        comment_id = int(comment_id)
+        self._entities.update(set(entities))
+        for triple in set(triples):
+            self._triples[triple] += 1
+            self._sources.append((comment_id,) + tuple(triple))
+        self._processed.append((comment_id,))
+        if len(self._processed) >= FLUSH_EVERY:
+            self.flush()
+
+    def add_many(self, sources, entities=(), comment_ids=()):
+        """
+        批量写入语料级抽取结果（如共现关系，只在全部评论上算完才知道保留哪些）
+        :param sources: [(评论ID, 头实体, 关系, 尾实体), ...]，同一评论的同一三元组只算一次
+        :param entities: [(实体名, 实体类型, 次数), ...]
+        :param comment_ids: 本次处理过的全部评论ID（含没抽出三元组的）
+        """
+        for cid, head, rel, tail in set(sources):
+            self._triples[(head, rel, tail)] += 1
+            self._sources.append((int(cid), head, rel, tail))
+        for name, etype, n in entities:
+            self._entities[(name, etype)] += n
+        self._processed.extend((int(cid),) for cid in comment_ids)
+        self.flush()
+
+    def remove_triples(self, triples):
+        """删除三元组及其来源（如共现关系跌出PMI阈值），不提交"""
+        triples = [tuple(t) for t in triples]
+        self.conn.executemany(
+            "DELETE FROM triple_sources WHERE triple_id IN "
+            "(SELECT id FROM triples WHERE head = ? AND rel = ? AND tail = ?)", triples
+        )
+        self.conn.executemany("DELETE FROM triples WHERE head = ? AND rel = ? AND tail = ?", triples)
+
+    def set_entities(self, entities):
+        """用语料级重新统计的实体次数整体替换实体表：[(实体名, 实体类型, 次数), ...]，不提交"""
+        self.flush()
+        self.conn.execute("DELETE FROM entities")
+        self.conn.executemany("INSERT INTO entities VALUES (?, ?, ?)", entities)
+
+    def flush(self):
+        """把缓冲区合并进库（UPSERT累加次数），不提交"""
+        if not self._processed and not self._triples:
+            return
+        self.conn.executemany(
+            "INSERT INTO entities VALUES (?, ?, ?) "
+            "ON CONFLICT (name, type) DO UPDATE SET count = count + excluded.count",
+            ((name, etype, n) for (name, etype), n in self._entities.items())
+        )
+        self.conn.executemany(
+            "INSERT INTO triples (head, rel, tail, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (head, rel, tail) DO UPDATE SET count = count + excluded.count",
+            ((h, r, t, n) for (h, r, t), n in self._triples.items())
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO triple_sources "
+            "SELECT id, ? FROM triples WHERE head = ? AND rel = ? AND tail = ?",
+            self._sources
+        )
+        self.conn.executemany("INSERT OR IGNORE INTO processed VALUES (?)", self._processed)
+        self._reset_buffer()
+
+    def commit(self):
+        self.flush()
+        self.conn.commit()
+
+    def close(self):
+        # 不自动提交：没走到commit()的半截结果直接丢弃
+        self.conn.close()
+
+    # ---- 查询 ----
+    def query(self, head=None, rel=None, tail=None, min_count=1, limit=None):
+        """
+        按头/关系/尾实体任意组合查询（走索引），按次数从多到少
+        例：query(head="粉丝", tail="洛天依") → 粉丝对洛天依的全部情感
+        :return: [(头实体, 关系, 尾实体, 次数), ...]
+        """
+        conds, params = ["count >= ?"], [min_count]
+        for col, value in (("head", head), ("rel", rel), ("tail", tail)):
+            if value is not None:
+                conds.append(f"{col} = ?")
+                params.append(value)
+        sql = f"SELECT head, rel, tail, count FROM triples WHERE {' AND '.join(conds)} ORDER BY count DESC, id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql, params).fetchall()
+
+    def sources(self, head, rel, tail, limit=None):
+        """提到某个三元组的评论ID"""
+        sql = ("SELECT s.comment_id FROM triple_sources s JOIN triples t ON s.triple_id = t.id "
+               "WHERE t.head = ? AND t.rel = ? AND t.tail = ?")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [row[0] for row in self.conn.execute(sql, (head, rel, tail))]
+
+    def entities(self, etype=None):
+        """[(实体名, 实体类型, 次数), ...]，按次数从多到少"""
+        if etype is None:
+            rows = self.conn.execute("SELECT name, type, count FROM entities ORDER BY count DESC")
+        else:
+            rows = self.conn.execute(
+                "SELECT name, type, count FROM entities WHERE type = ? ORDER BY count DESC", (etype,)
+            )
+        return rows.fetchall()
+
+    def stats(self):
+        one = lambda sql: self.conn.execute(sql).fetchone()[0]
+        return {
+            "评论数": one("SELECT COUNT(*) FROM processed"),
+            "实体数": one("SELECT COUNT(*) FROM entities"),
+            "三元组数": one("SELECT COUNT(*) FROM triples"),
+        }
+
+    # ---- 导出 ----
+    def export_json(self, entity_path, triple_path):
+        """导出去重后的实体/三元组JSON（格式与原来一致：[[实体名, 类型], ...]、[[头, 关系, 尾], ...]）"""
+        entities = [[name, etype] for name, etype, _ in self.entities()]
+        triples = [[h, r, t] for h, r, t, _ in self.query()]
+        with open(entity_path, "w", encoding="utf-8") as f:
+            json.dump(entities, f, ensure_ascii=False, indent=2)
+        with open(triple_path, "w", encoding="utf-8") as f:
+            json.dump(triples, f, ensure_ascii=False, indent=2)
+        return entities, triples
+
+
+# ---------------------- 3. 模块级快捷函数 ----------------------
+_default_store = None
+
+def get_store(config_key=None):
+    global _default_store
+    if _default_store is None:
+        _default_store = TripleStore(config_key=config_key)
+        import atexit
+        atexit.register(_default_store.close)
+    return _default_store
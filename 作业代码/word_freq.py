@@ -0,0 +1,108 @@
+# 词频表：词统一编码成整数ID（词串只存一份），计数可按分片统计后合并，TOP-K用堆取，不排序整个词表
+import heapq
+import sys
+from array import array
+from collections import Counter
+import numpy as np
+
+
+class FreqTable:
+    """
+    紧凑词频表
+    vocab：词 → 整数ID（词串经sys.intern只存一份）；counts：按ID存放的计数（int64数组）
+    """
+
+    def __init__(self):
+        self.vocab = {}
+        self.words = []
+        self.counts = array("q")
+
+    def _id(self, word):
+        wid = self.vocab.get(word)
+        if wid is None:
+            wid = len(self.words)
+            word = sys.intern(word)
+            self.vocab[word] = wid
+            self.words.append(word)
+            self.counts.append(0)
+        return wid
+
+    # ---------------------- 1. 计数与合并 ----------------------
+    def add(self, word, n=1):
+        self.counts[self._id(word)] += n
+        return self
+
+    def update(self, words):
+        """累加一批词（先用Counter在C层计数，再按ID落到数组里）"""
+        return self.merge(Counter(words))
+
+    def merge(self, other):
+        """合并另一个分片的计数（FreqTable/Counter/dict均可），返回自身"""
+        for word, n in other.items():
+            self.counts[self._id(word)] += n
+        return self
+
+    __iadd__ = merge
+
+    @classmethod
+    def from_counts(cls, counts):
+        return cls().merge(counts)
+
+    @classmethod
+    def from_shards(cls, shards):
+        """逐个分片计数再合并（每个分片是一组词或一个Counter），内存只多占一个分片"""
+        table = cls()
+        for shard in shards:
+            table.merge(shard if isinstance(shard, (FreqTable, Counter, dict)) else Counter(shard))
+        return table
+
+    # ---------------------- 2. 查询 ----------------------
+    def __getitem__(self, word):
+        wid = self.vocab.get(word)
+        return self.counts[wid] if wid is not None else 0
+
+    def __contains__(self, word):
+        return self[word] > 0
+
+    def __len__(self):
+        return sum(1 for n in self.counts if n > 0)
+
+    def total(self):
+        return sum(self.counts)
+
+    def items(self):
+        """(词, 次数)，按词第一次出现的顺序"""
+        return ((w, n) for w, n in zip(self.words, self.counts) if n > 0)
+
+    def to_dict(self, min_count=1):
+        """{词: 次数}，可选只保留次数≥min_count的词（如词云只要出现≥2次的词）"""
+        return {w: n for w, n in zip(self.words, self.counts) if n >= min_count}
+
+    def top_k(self, k=None, min_count=1):
+        """
+        出现次数最多的k个词：[(词, 次数), ...]，次数相同按第一次出现的顺序
+        堆取前k个，耗时O(词表大小×log k)；k为None时返回全部（整体排序）
+        """
+        counts = self.counts
+        ids = (i for i, n in enumerate(counts) if n >= min_count)
+        if k is None:
+            top = sorted(ids, key=counts.__getitem__, reverse=True)
+        else:
+            top = heapq.nlargest(k, ids, key=counts.__getitem__)
+        return [(self.words[i], counts[i]) for i in top]
+
+    # ---------------------- 3. 保存/读取 ----------------------
+    def save(self, path):
+        """存为.npz：词表用换行拼成一个字符串，计数为int64数组"""
+        np.savez_compressed(path, words=np.array("\n".join(self.words)),
+                            counts=np.frombuffer(self.counts, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        table = cls()
+        words = str(data["words"])
+        table.words = [sys.intern(w) for w in words.split("\n")] if words else []
+        table.vocab = {w: i for i, w in enumerate(table.words)}
+        table.counts = array("q", data["counts"].tolist())
+        return table
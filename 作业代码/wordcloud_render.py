@@ -0,0 +1,143 @@
+# 词云渲染层：直接用算好的词频表出图（不再拼字符串让WordCloud重新分词计数），蒙版处理结果缓存，批量模式不弹预览窗口
+import multiprocessing as mp
+import os
+import random
+from functools import lru_cache
+import matplotlib
+from wordcloud import WordCloud
+from word_freq import FreqTable
+from mask_cache import load_mask
+
+# ---------------------- 1. 无界面（批量）模式 ----------------------
+# 环境变量HEADLESS=1，或Linux下没有图形界面时：用Agg后端，只保存图片不弹窗
+HEADLESS = os.environ.get("HEADLESS") == "1" or (os.name == "posix" and not os.environ.get("DISPLAY"))
+if HEADLESS:
+    matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+
+def show():
+    """预览图表（无界面模式下跳过，关掉图表释放内存）"""
+    if HEADLESS:
+        plt.close("all")
+    else:
+        plt.show()
+
+
+# ---------------------- 2. 字体缓存 ----------------------
+class _FontFile:
+    """
+    已读进内存的字体文件，当作font_path传给WordCloud（PIL的truetype接受带read()的对象）
+    WordCloud排版时每换一个字号就加载一次字体，中文字体动辄十几MB：这样每个进程只从磁盘读一次
+    注：to_svg(embed_font=True)需要真实路径，要导出SVG时直接new WordCloud
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+@lru_cache(maxsize=8)
+def _font_file(path):
+    with open(path, "rb") as f:
+        return _FontFile(f.read())
+
+def _cached_font_options(wc_kwargs):
+    """font_path是本地字体文件时换成内存里的缓存（只影响本模块出的图，不改wordcloud库）"""
+    font_path = wc_kwargs.get("font_path")
+    if isinstance(font_path, (str, os.PathLike)) and os.path.isfile(font_path):
+        return dict(wc_kwargs, font_path=_font_file(os.path.abspath(font_path)))
+    return wc_kwargs
+
+
+# ---------------------- 3. 按词频出图 ----------------------
+def top_frequencies(freqs, max_words=200):
+    """取前max_words个词的词频字典（FreqTable用堆取，不排序整个词表）"""
+    if isinstance(freqs, FreqTable):
+        return dict(freqs.top_k(max_words))
+    if len(freqs) > max_words:
+        return dict(FreqTable.from_counts(freqs).top_k(max_words))
+    return dict(freqs)
+
+def render(freqs, output, preview_title=None, title_color=None, figsize=(10, 8), **wc_kwargs):
+    """
+    用词频生成词云并保存
+    :param freqs: 词频（FreqTable/Counter/dict）
+    :param output: 输出图片路径
+    :param preview_title: 传入时弹出预览窗口（无界面模式下跳过）
+    :param wc_kwargs: WordCloud参数（font_path/mask/max_words/配色等）
+    """
+    wc = WordCloud(**_cached_font_options(wc_kwargs))
+    wc.generate_from_frequencies(top_frequencies(freqs, wc.max_words))
+    wc.to_file(output)
+    if preview_title and not HEADLESS:
+        plt.figure(figsize=figsize)
+        plt.imshow(wc, interpolation="bilinear")
+        plt.axis("off")
+        plt.title(preview_title, fontsize=14, fontweight="bold", color=title_color)
+        show()
+    return wc
+
+
+# ---------------------- 4. 批量渲染（多进程） ----------------------
+def palette_color_func(palette, seed=None):
+    """配色：单个颜色=全部同色；颜色列表=每个词随机取一个（固定种子，结果可复现）"""
+    if palette is None:
+        return None
+    if isinstance(palette, str):
+        return lambda *args, **kwargs: palette
+    rng = random.Random(seed)
+    return lambda *args, **kwargs: rng.choice(palette)
+
+def make_job(freqs, output, mask=None, palette=None, mask_threshold=200, mask_mode="L", **wc_kwargs):
+    """
+    生成一个渲染任务
+    :param freqs: 词频（先在主进程里截成前max_words个词，传给子进程的数据很小）
+    :param mask: 蒙版文件路径（子进程加载并缓存）、现成的蒙版数组或None
+    :param palette: 颜色或颜色列表
+    """
+    return {
+        "freqs": top_frequencies(freqs, wc_kwargs.get("max_words", 200)),
+        "output": output,
+        "mask": mask,
+        "mask_threshold": mask_threshold,
+        "mask_mode": mask_mode,
+        "palette": palette,
+        "options": wc_kwargs,
+    }
+
+def _init_worker():
+    # 子进程：不用图形界面后端（字体文件每个进程读一次，蒙版由mask_cache从.npy内存映射读取）
+    matplotlib.use("Agg")
+
+def _render_job(job):
+    mask = job["mask"]
+    if isinstance(mask, str):
+        mask = load_mask(mask, job["mask_threshold"], job["mask_mode"])
+    options = dict(job["options"])
+    color_func = palette_color_func(job["palette"], options.get("random_state"))
+    if color_func is not None:
+        options["color_func"] = color_func
+    render(job["freqs"], job["output"], mask=mask, **options)
+    return job["output"]
+
+def render_batch(jobs, workers=None):
+    """
+    批量渲染词云：任务分给进程池，每个子进程内蒙版、字体只加载一次，只写PNG不弹窗
+    :param workers: 进程数（默认CPU核数；1=当前进程逐个渲染）
+    :return: 输出文件路径列表（按完成顺序）
+    注：Windows下多进程需在 if __name__ == "__main__": 中调用
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    done = []
+    if workers <= 1:
+        for job in jobs:
+            done.append(_render_job(job))
+            print(f"✅ 词云已保存：{done[-1]}")
+        return done
+    with mp.Pool(workers, initializer=_init_worker) as pool:
+        for output in pool.imap_unordered(_render_job, jobs):
+            done.append(output)
+            print(f"✅ 词云已保存：{output}")
+    return done
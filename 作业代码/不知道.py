@@ -2,20 +2,27 @@ import pandas as pd
 import re
 import matplotlib.pyplot as plt
 import numpy as np
+from label_engine import LabelEngine
+from emotion_cube import EmotionCube, STRENGTH_SCORES
+from corpus_store import PLATFORMS, guess_from_name, make_comment_ids
+from sentiment_batch import POLARITIES
 
-# -------------------------- 1. 读取洛天依真实爬取数据（Windows路径） --------------------------
-# 读取Excel文件（路径与你的赵丽颖数据同目录，确保文件名称一致）
-df = pd.read_excel("D:/用户数据采集与分析/洛天依数据爬取11.xlsx", sheet_name=0)
-
-# 查看数据结构（首次运行可了解字段，后续可注释）
-print("洛天依数据字段列表：", df.columns.tolist())
-print("洛天依数据总行数：", len(df))
-print("\n前5条数据预览：")
-print(df.head())
+# -------------------------- 1. 读取各偶像/各平台真实爬取数据（Windows路径） --------------------------
+DATA_DIR = "D:/用户数据采集与分析"
+# 每个数据源一项：偶像、Excel路径；platform不填时从文件名识别（微博/B站/抖音）
+SOURCES = [
+    {"idol": "洛天依", "path": f"{DATA_DIR}/洛天依数据爬取11.xlsx"},
+    # {"idol": "赵丽颖", "path": f"{DATA_DIR}/赵丽颖数据爬取.xlsx", "platform": "微博"},
+]
+MAIN_IDOL = "洛天依"  # 图表和单偶像统计表针对的偶像（多个偶像时另外输出对比表）
+# 标签列都存成分类列（每条评论只存整数编码，取值表共用一份）；下面是取值表的顺序，数据里其他取值接在后面
+# 情感类型与情感分析.py共用sentiment_batch.POLARITIES（正向/中性/负向），源数据里的其他写法读入时统一
+EMOTION_ALIASES = {"积极": "正向", "消极": "负向"}
+STRENGTH_LEVELS = ["强", "中", "弱"]
 
 # 数据清洗：适配洛天依数据字段（按Excel实际字段名调整，示例覆盖常见情况）
 # 若你的字段名是“评论ID”“评论内容”“情感标签”等，直接替换引号内文字
-def get_core_fields(df):
+def get_core_fields(df, idol="洛天依", platform="未知"):
     field_mapping = {}
     # 匹配评论内容字段（常见名称：评论内容、content、留言内容）
     content_fields = [col for col in df.columns if any(keyword in str(col) for keyword in ["评论", "content", "留言"])]
@@ -28,35 +35,71 @@ def get_core_fields(df):
     emotion_fields = [col for col in df.columns if any(keyword in str(col) for keyword in ["情感", "emotion", "积极", "中性", "消极"])]
     if emotion_fields:
         field_mapping["emotion_type"] = emotion_fields[0]
+        df[emotion_fields[0]] = df[emotion_fields[0]].replace(EMOTION_ALIASES)
     else:
-        # 无情感字段时自动生成（符合洛天依粉丝情感分布：正向68%、中性25%、消极7%）
-        df["emotion_type"] = np.random.choice(["正向", "中性", "消极"], size=len(df), p=[0.68, 0.25, 0.07])
+        # 无情感字段时自动生成（符合洛天依粉丝情感分布：正向68%、中性25%、负向7%）
+        df["emotion_type"] = pd.Categorical.from_codes(
+            np.random.choice(len(POLARITIES), size=len(df), p=[0.68, 0.25, 0.07]), categories=POLARITIES)
         field_mapping["emotion_type"] = "emotion_type"
     
     # 补充必要字段（无则自动生成）
     if "comment_id" not in df.columns:
-        df["comment_id"] = [f"luo_{i+1}" for i in range(len(df))]  # 洛天依评论唯一ID
+        # 评论唯一ID：整数，与corpus_store的规则一致（偶像+平台+内容），各数据源合并后也不重复
+        df["comment_id"] = pd.Series(make_comment_ids(df[field_mapping["content"]], idol, platform),
+                                     index=df.index, dtype="int64")
     field_mapping["comment_id"] = "comment_id"
     
     if "emotion_strength" not in df.columns:
-        df["emotion_strength"] = np.random.choice(["强", "中", "弱"], size=len(df), p=[0.25, 0.6, 0.15])  # 洛天依粉丝情绪强度分布
+        df["emotion_strength"] = pd.Categorical.from_codes(
+            np.random.choice(len(STRENGTH_LEVELS), size=len(df), p=[0.25, 0.6, 0.15]), categories=STRENGTH_LEVELS)  # 洛天依粉丝情绪强度分布
     field_mapping["emotion_strength"] = "emotion_strength"
     
     return field_mapping
 
-# 获取核心字段并筛选数据
-field_mapping = get_core_fields(df)
-df_clean = df[[field_mapping["comment_id"], field_mapping["content"], field_mapping["emotion_type"], field_mapping["emotion_strength"]]].copy()
-# 统一字段名
-df_clean.rename(columns={v: k for k, v in field_mapping.items()}, inplace=True)
-df_clean["idol_type"] = "洛天依"  # 标记偶像类型
+def load_source(source):
+    """读取一个数据源，统一字段名，并标记偶像、平台、日期"""
+    idol = source["idol"]
+    df = pd.read_excel(source["path"], sheet_name=0)
+
+    # 查看数据结构（首次运行可了解字段，后续可注释）
+    print(f"{idol}数据字段列表：", df.columns.tolist())
+    print(f"{idol}数据总行数：", len(df))
+    print("\n前5条数据预览：")
+    print(df.head())
+
+    # 获取核心字段并筛选数据
+    platform = source.get("platform") or guess_from_name(source["path"], PLATFORMS, "未知")
+    field_mapping = get_core_fields(df, idol, platform)
+    df_clean = df[[field_mapping["comment_id"], field_mapping["content"], field_mapping["emotion_type"], field_mapping["emotion_strength"]]].copy()
+    # 统一字段名
+    df_clean.rename(columns={v: k for k, v in field_mapping.items()}, inplace=True)
+    df_clean["idol_type"] = idol  # 标记偶像类型
+    df_clean["platform"] = platform
+    # 按天汇总用的日期（有时间字段时取日期部分，没有则留空）
+    time_fields = [col for col in df.columns if any(keyword in str(col) for keyword in ["时间", "日期", "time", "date"])]
+    df_clean["day"] = (pd.to_datetime(df[time_fields[0]], errors="coerce").dt.strftime("%Y-%m-%d")
+                       if time_fields else None)
+
+    print(f"\n清洗后{idol}数据量：{len(df_clean)}条")
+    print(f"情感类型分布（符合{idol}粉丝特征）：")
+    print(df_clean["emotion_type"].value_counts(normalize=True).round(3) * 100)
+    return df_clean
 
-print(f"\n清洗后洛天依数据量：{len(df_clean)}条")
-print("情感类型分布（符合洛天依粉丝特征）：")
-print(df_clean["emotion_type"].value_counts(normalize=True).round(3) * 100)
+def as_category(column, order=()):
+    """转成分类列：order里的取值排在前面，数据里其他取值按名称排序接在后面"""
+    extra = sorted(set(column.dropna().unique()) - set(order))
+    return column.astype(pd.CategoricalDtype(list(order) + extra))
 
+df_clean = pd.concat([load_source(source) for source in SOURCES], ignore_index=True)
+# 合并后统一编码（各数据源的分类列取值表不同时concat会退回字符串列）
+for col, order in {"emotion_type": POLARITIES, "emotion_strength": STRENGTH_LEVELS,
+                   "idol_type": list(dict.fromkeys(source["idol"] for source in SOURCES)), "platform": (), "day": ()}.items():
+    df_clean[col] = as_category(df_clean[col], order)
 
-# -------------------------- 2. 标注洛天依专属场景、行为标签 --------------------------
+
+# -------------------------- 2. 标注场景、行为标签（各偶像共用一套标签，便于对比） --------------------------
+# 每个标签的关键词编译成一个忽略大小写的正则，整列一次匹配；同时命中多个标签时按字典顺序取第一个
+MULTI_LABEL = False  # True：命中几个标签就各算一次（交叉表由多标签指示矩阵直接算）
 # 2.1 场景标签（适配洛天依核心场景：声库、建模、虚拟演唱会等）
 luo_scene_keywords = {
     "作品发布场景": ["新歌", "MV", "声库", "专辑", "歌曲", "音乐", "调教", "旋律"],  # 洛天依核心内容场景
@@ -64,16 +107,9 @@ luo_scene_keywords = {
     "线下/虚拟活动场景": ["虚拟演唱会", "全息", "直播", "AR", "VR", "线下活动"],  # 洛天依特色活动
     "争议/反馈场景": ["建模", "运营", "割韭菜", "优化", "建议", "bug", "崩溃"]  # 洛天依粉丝争议焦点
 }
-def label_luo_scene(comment):
-    if pd.isna(comment):
-        return "无明确场景"
-    comment = str(comment).lower()  # 忽略大小写匹配
-    # 优先匹配洛天依专属关键词（如“声库”“建模”）
-    for scene, keywords in luo_scene_keywords.items():
-        if any(keyword in comment for keyword in keywords):
-            return scene
-    return "无明确场景"
-df_clean["scene_label"] = df_clean["content"].apply(label_luo_scene)
+luo_scene_engine = LabelEngine(luo_scene_keywords, "无明确场景")
+scene_indicator = luo_scene_engine.indicator(df_clean["content"], sparse_output=True)
+df_clean["scene_label"] = luo_scene_engine.first_label(scene_indicator)
 
 # 2.2 行为标签（适配洛天依粉丝行为：声库调教、同人创作等）
 luo_behavior_keywords = {
@@ -82,56 +118,85 @@ luo_behavior_keywords = {
     "互动参与行为": ["@", "合唱", "弹幕", "打卡", "留言", "转发", "应援"],  # 线上互动行为
     "维护反馈行为": ["建议", "优化", "反馈", "澄清", "反黑", "控评"]  # 针对运营/技术的反馈
 }
-def label_luo_behavior(comment):
-    if pd.isna(comment):
-        return "无明确行为"
-    comment = str(comment).lower()
-    for behavior, keywords in luo_behavior_keywords.items():
-        if any(keyword in comment for keyword in keywords):
-            return behavior
-    return "无明确行为"
-df_clean["behavior_label"] = df_clean["content"].apply(label_luo_behavior)
-
-# 查看标签分布（验证洛天依粉丝特征）
-print("\n洛天依粉丝场景标签分布：")
-print(df_clean["scene_label"].value_counts())
-print("\n洛天依粉丝行为标签分布：")
-print(df_clean["behavior_label"].value_counts())
-
-
-# -------------------------- 3. 洛天依粉丝情感核心统计分析 --------------------------
+luo_behavior_engine = LabelEngine(luo_behavior_keywords, "无明确行为")
+behavior_indicator = luo_behavior_engine.indicator(df_clean["content"], sparse_output=True)
+df_clean["behavior_label"] = luo_behavior_engine.first_label(behavior_indicator)
+
+df_clean["strength_score"] = df_clean["emotion_strength"].map(STRENGTH_SCORES).astype("float32")
+
+# 2.3 汇总立方体：(偶像, 平台, 场景, 行为, 情感类型, 强度, 日期) → 评论数，之后的统计表都从它得到
+cube = EmotionCube.from_frame(df_clean)
+main_cube = cube.slice(idol_type=MAIN_IDOL)
+print(f"\n汇总立方体：{cube.total}条评论 → {len(cube.cells)}个维度组合")
+
+# 查看标签分布（验证粉丝特征）
+print(f"\n{MAIN_IDOL}粉丝场景标签分布：")
+print(main_cube.counts("scene_label").sort_values(ascending=False, kind="stable"))
+print(f"\n{MAIN_IDOL}粉丝行为标签分布：")
+print(main_cube.counts("behavior_label").sort_values(ascending=False, kind="stable"))
+
+
+# -------------------------- 3. 粉丝情感核心统计分析（全部从汇总立方体计算） --------------------------
+def idol_rows(idol):
+    return (df_clean["idol_type"] == idol).to_numpy()
+
 # 3.1 各场景情感占比（重点关注“作品发布场景”“争议/反馈场景”）
-def calc_scene_emotion(df):
-    # 统计场景-情感交叉数量
-    scene_emotion_cnt = pd.crosstab(df["scene_label"], df["emotion_type"])
+def calc_scene_emotion(cube, idol=MAIN_IDOL):
+    # 统计场景-情感交叉数量（多标签时由指示矩阵直接算）
+    if MULTI_LABEL:
+        rows = idol_rows(idol)
+        scene_emotion_cnt = luo_scene_engine.crosstab(scene_indicator[rows], df_clean.loc[rows, "emotion_type"], multi=True)
+        scene_emotion_cnt.index.name = "scene_label"
+    else:
+        scene_emotion_cnt = cube.slice(idol_type=idol).counts("scene_label", "emotion_type")
     # 计算各场景情感占比（百分比）
     scene_emotion_pct = scene_emotion_cnt.div(scene_emotion_cnt.sum(axis=1), axis=0) * 100
     return scene_emotion_cnt.round(0), scene_emotion_pct.round(1)
 
-luo_scene_cnt, luo_scene_pct = calc_scene_emotion(df_clean)
-print("\n洛天依各场景情感数量分布：")
+luo_scene_cnt, luo_scene_pct = calc_scene_emotion(cube)
+print(f"\n{MAIN_IDOL}各场景情感数量分布：")
 print(luo_scene_cnt)
-print("\n洛天依各场景情感占比分布（核心：作品发布场景正向占比应≥70%）：")
+print(f"\n{MAIN_IDOL}各场景情感占比分布（核心：作品发布场景正向占比应≥70%）：")
 print(luo_scene_pct)
 
 # 3.2 各情感类型行为占比（重点关注“正向情感-内容创作行为”关联）
-def calc_emotion_behavior(df):
-    emotion_behavior_cnt = pd.crosstab(df["emotion_type"], df["behavior_label"])
+def calc_emotion_behavior(cube, idol=MAIN_IDOL):
+    if MULTI_LABEL:
+        rows = idol_rows(idol)
+        emotion_behavior_cnt = luo_behavior_engine.crosstab(behavior_indicator[rows], df_clean.loc[rows, "emotion_type"], multi=True).T
+        emotion_behavior_cnt.columns.name = "behavior_label"
+    else:
+        emotion_behavior_cnt = cube.slice(idol_type=idol).counts("emotion_type", "behavior_label")
     emotion_behavior_pct = emotion_behavior_cnt.div(emotion_behavior_cnt.sum(axis=1), axis=0) * 100
     return emotion_behavior_cnt.round(0), emotion_behavior_pct.round(1)
 
-luo_emotion_behavior_cnt, luo_emotion_behavior_pct = calc_emotion_behavior(df_clean)
-print("\n洛天依各情感类型行为数量分布：")
+luo_emotion_behavior_cnt, luo_emotion_behavior_pct = calc_emotion_behavior(cube)
+print(f"\n{MAIN_IDOL}各情感类型行为数量分布：")
 print(luo_emotion_behavior_cnt)
-print("\n洛天依各情感类型行为占比分布（核心：正向情感-内容创作占比应最高）：")
+print(f"\n{MAIN_IDOL}各情感类型行为占比分布（核心：正向情感-内容创作占比应最高）：")
 print(luo_emotion_behavior_pct)
 
 # 3.3 场景情感强度（洛天依粉丝在“虚拟演唱会场景”强度应最高）
-df_clean["strength_score"] = df_clean["emotion_strength"].map({"强": 3, "中": 2, "弱": 1})
-luo_strength_by_scene = df_clean.groupby("scene_label")["strength_score"].mean().round(2)
-print("\n洛天依各场景情感强度均值（3分=强，2分=中，1分=弱）：")
+luo_strength_by_scene = main_cube.mean_score("scene_label").rename("strength_score")
+print(f"\n{MAIN_IDOL}各场景情感强度均值（3分=强，2分=中，1分=弱）：")
 print(luo_strength_by_scene)
 
+# 3.4 多偶像/多平台对比（只有一个偶像时跳过）
+idol_tables = {}
+if len(cube.categories["idol_type"]) > 1:
+    idol_tables = {
+        "偶像情感数量": cube.counts("idol_type", "emotion_type"),
+        "偶像情感占比": cube.percent("idol_type", "emotion_type"),
+        "偶像场景占比": cube.percent("idol_type", "scene_label"),
+        "偶像行为占比": cube.percent("idol_type", "behavior_label"),
+        "偶像平台情感占比": cube.percent(["idol_type", "platform"], "emotion_type"),
+        "偶像场景情感强度": cube.mean_score(["idol_type", "scene_label"]).unstack("scene_label"),
+    }
+    print("\n各偶像情感占比对比：")
+    print(idol_tables["偶像情感占比"])
+    print("\n各偶像、各平台情感占比对比：")
+    print(idol_tables["偶像平台情感占比"])
+
 
 # -------------------------- 4. 可视化输出（洛天依专属风格+Windows路径） --------------------------
 # 配置中文字体+洛天依专属配色
@@ -140,7 +205,7 @@ plt.rcParams['axes.unicode_minus'] = False
 luo_colors = {
     "正向": "#6495ED",  # 天蓝色（洛天依形象色）
     "中性": "#F0E68C",  # 卡其色（理性讨论色）
-    "消极": "#CD5C5C",  # 印度红（温和消极色）
+    "负向": "#CD5C5C",  # 印度红（温和负向色）
     "创作": "#9370DB",  #  MediumPurple（创作行为色）
     "消费": "#32CD32",  #  LimeGreen（消费行为色）
     "互动": "#FF6347",  #  Tomato（互动行为色）
@@ -158,10 +223,10 @@ scene_pct_valid.plot(kind="barh", stacked=True, ax=ax,
                      alpha=0.8, edgecolor="white", linewidth=1.2)
 
 # 图表美化（突出洛天依特色）
-ax.set_title("洛天依粉丝各场景情感分布（基于真实爬取数据）", 
+ax.set_title(f"{MAIN_IDOL}粉丝各场景情感分布（基于真实爬取数据）", 
              fontsize=16, fontweight="bold", pad=20, color="#6495ED")
 ax.set_xlabel("评论占比（%）", fontsize=14, labelpad=10)
-ax.set_ylabel("场景类型（洛天依专属）", fontsize=14, labelpad=10)
+ax.set_ylabel(f"场景类型（{MAIN_IDOL}专属）", fontsize=14, labelpad=10)
 ax.tick_params(axis="both", labelsize=12)
 # 添加数值标签（仅显示占比>5%的标签，避免拥挤）
 for i, scene in enumerate(valid_scenes):
@@ -175,10 +240,10 @@ for i, scene in enumerate(valid_scenes):
 
 # 保存到Windows目录
 plt.tight_layout()
-plt.savefig("D:/用户数据采集与分析/洛天依_场景情感分布图.png", 
+plt.savefig(f"{DATA_DIR}/{MAIN_IDOL}_场景情感分布图.png", 
             dpi=300, bbox_inches="tight", facecolor="white")
 plt.close()
-print("\n已生成：D:/用户数据采集与分析/洛天依_场景情感分布图.png")
+print(f"\n已生成：{DATA_DIR}/{MAIN_IDOL}_场景情感分布图.png")
 
 # 4.2 洛天依粉丝情感-行为雷达图（核心图表2）
 valid_behaviors = luo_emotion_behavior_pct.columns[luo_emotion_behavior_pct.columns != "无明确行为"].tolist()
@@ -201,7 +266,7 @@ ax.plot(angles, behavior_data, "o-", linewidth=3, color=luo_colors["正向"],
 ax.fill(angles, behavior_data, alpha=0.25, color=luo_colors["正向"])
 
 # 图表美化
-ax.set_title("洛天依粉丝正向情感下行为偏好（基于真实爬取数据）", 
+ax.set_title(f"{MAIN_IDOL}粉丝正向情感下行为偏好（基于真实爬取数据）", 
              fontsize=16, fontweight="bold", pad=30, color="#6495ED")
 ax.set_xticks(angles[:-1])
 ax.set_xticklabels(valid_behaviors[:-1], fontsize=13)
@@ -211,14 +276,14 @@ ax.grid(True, alpha=0.3, linestyle="--", color="#6495ED")
 
 # 保存图表
 plt.tight_layout()
-plt.savefig("D:/用户数据采集与分析/洛天依_情感行为雷达图.png", 
+plt.savefig(f"{DATA_DIR}/{MAIN_IDOL}_情感行为雷达图.png", 
             dpi=300, bbox_inches="tight", facecolor="white")
 plt.close()
-print("已生成：D:/用户数据采集与分析/洛天依_情感行为雷达图.png")
+print(f"已生成：{DATA_DIR}/{MAIN_IDOL}_情感行为雷达图.png")
 
 
 # -------------------------- 5. 导出分析结果（与赵丽颖数据格式一致，便于对比） --------------------------
-with pd.ExcelWriter("D:/用户数据采集与分析/洛天依粉丝情感分析结果.xlsx", engine="openpyxl") as writer:
+with pd.ExcelWriter(f"{DATA_DIR}/{MAIN_IDOL}粉丝情感分析结果.xlsx", engine="openpyxl") as writer:
     # 1. 清洗后的数据（含标签，可直接用于对比）
     df_clean.to_excel(writer, sheet_name="清洗后数据", index=False)
     # 2. 场景-情感统计（数量+占比）
@@ -229,10 +294,15 @@ with pd.ExcelWriter("D:/用户数据采集与分析/洛天依粉丝情感分析
     luo_emotion_behavior_pct.to_excel(writer, sheet_name="情感行为占比")
     # 4. 场景情感强度（辅助对比指标）
     luo_strength_by_scene.to_excel(writer, sheet_name="场景情感强度")
+    # 5. 多偶像对比（有多个偶像时）
+    for sheet_name, table in idol_tables.items():
+        table.to_excel(writer, sheet_name=sheet_name)
+    # 6. 汇总立方体（各维度组合的评论数，可在Excel里继续透视）
+    cube.to_frame().to_excel(writer, sheet_name="汇总立方体", index=False)
 
-print("已生成：D:/用户数据采集与分析/洛天依粉丝情感分析结果.xlsx")
-print("\n=== 洛天依粉丝情感分析完成 ===")
-print(f"核心结论（基于{len(df_clean)}条真实数据）：")
+print(f"已生成：{DATA_DIR}/{MAIN_IDOL}粉丝情感分析结果.xlsx")
+print(f"\n=== {MAIN_IDOL}粉丝情感分析完成 ===")
+print(f"核心结论（基于{main_cube.total}条真实数据）：")
 print(f"1. 评论最集中场景：{luo_scene_cnt.sum(axis=1).idxmax()}（{luo_scene_cnt.sum(axis=1).max()}条，符合洛天依作品导向特征）")
 if "正向" in luo_scene_pct.columns:
     print(f"2. 正向情感最高场景：{luo_scene_pct['正向'].idxmax()}（{luo_scene_pct['正向'].max()}%，体现粉丝对作品的高认可）")
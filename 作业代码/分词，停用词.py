@@ -1,7 +1,13 @@
 import pandas as pd
-import jieba
 import re
 import os
+import token_cache
+from parallel_seg import get_raw_tokens_batch
+
+# 分词进程数（1=单进程逐条分词；评论量大时设为CPU核数）
+WORKERS = 1
+BATCH_SIZE = 20000          # 多进程时每批分词的评论数（控制内存）
+WRITE_BUFFER = 1 << 20      # TXT写缓冲区大小（1MB）
 
 # -------------------------- 1. 自动定位Excel文件（洛天依/赵丽颖） --------------------------
 def find_idol_excel():
@@ -22,6 +28,19 @@ def find_idol_excel():
     return excel_map
 
 # -------------------------- 2. 文本清洗+分词核心函数 --------------------------
+# 中文停用词库（核心无意义词，模块加载时只建一次）
+STOP_WORDS = set([
+    "的", "了", "是", "我", "你", "他", "她", "它", "我们", "你们", "他们",
+    "这", "那", "此", "彼", "和", "与", "及", "或", "但", "而", "却", "若",
+    "因为", "所以", "虽然", "但是", "如果", "只要", "只有", "由于", "因此",
+    "在", "于", "到", "从", "向", "对", "对于", "关于", "把", "被", "让",
+    "能", "会", "可以", "可能", "应该", "必须", "需要", "要", "不要", "没",
+    "不", "没", "无", "非", "否", "别", "很", "非常", "太", "更", "最", "比较",
+    "还", "也", "又", "再", "才", "就", "都", "全", "总", "共", "所有",
+    "一个", "一些", "一点", "一样", "一起", "一直", "一定", "一般",
+    "啊", "呀", "呢", "吗", "吧", "啦", "哦", "哇", "唉"
+])
+
 def clean_comment(comment):
     """清洗单条中文评论：去空值、特殊字符、多余空格"""
     if pd.isna(comment) or str(comment).strip() == "":
@@ -35,28 +54,33 @@ def get_raw_tokens(cleaned_comment):
     """仅分词（保留停用词）→ 返回单词列表"""
     if not cleaned_comment:
         return []
-    return jieba.lcut(cleaned_comment, cut_all=False)  # 精确分词
+    return token_cache.lcut(cleaned_comment)  # 精确分词（走分词缓存）
 
 def get_filtered_tokens(cleaned_comment):
     """分词+去停用词 → 返回单词列表"""
     if not cleaned_comment:
         return []
-    # 1. 先分词
-    tokens = jieba.lcut(cleaned_comment, cut_all=False)
-    # 2. 中文停用词库（核心无意义词）
-    stop_words = set([
-        "的", "了", "是", "我", "你", "他", "她", "它", "我们", "你们", "他们",
-        "这", "那", "此", "彼", "和", "与", "及", "或", "但", "而", "却", "若",
-        "因为", "所以", "虽然", "但是", "如果", "只要", "只有", "由于", "因此",
-        "在", "于", "到", "从", "向", "对", "对于", "关于", "把", "被", "让",
-        "能", "会", "可以", "可能", "应该", "必须", "需要", "要", "不要", "没",
-        "不", "没", "无", "非", "否", "别", "很", "非常", "太", "更", "最", "比较",
-        "还", "也", "又", "再", "才", "就", "都", "全", "总", "共", "所有",
-        "一个", "一些", "一点", "一样", "一起", "一直", "一定", "一般",
-        "啊", "呀", "呢", "吗", "吧", "啦", "哦", "哇", "唉"
-    ])
-    # 3. 过滤停用词+单字
-    return [t for t in tokens if t not in stop_words and len(t)>=2]
+    return filter_tokens(token_cache.lcut(cleaned_comment))
+
+def filter_tokens(tokens):
+    """过滤停用词+单字（输入已分好的词）"""
+    return [t for t in tokens if t not in STOP_WORDS and len(t)>=2]
+
+def tokenize_both(cleaned_comment):
+    """只分一次词，同时返回（仅分词结果, 去停用词结果）"""
+    raw = get_raw_tokens(cleaned_comment)
+    return raw, filter_tokens(raw)
+
+def iter_tokenized(comments):
+    """逐条产出（仅分词结果, 去停用词结果），多进程时按批分词"""
+    if WORKERS > 1:
+        comments = list(comments)
+        for start in range(0, len(comments), BATCH_SIZE):
+            for raw in get_raw_tokens_batch(comments[start:start + BATCH_SIZE], workers=WORKERS):
+                yield raw, filter_tokens(raw)
+    else:
+        for comment in comments:
+            yield tokenize_both(comment)
 
 # -------------------------- 3. 生成示例格式的TXT（每行一个词） --------------------------
 def generate_txt_by_idol(idol_name, excel_path):
@@ -78,29 +102,26 @@ def generate_txt_by_idol(idol_name, excel_path):
     df_valid = df.dropna(subset=["清洗后"]).reset_index(drop=True)
     print(f"2. 有效评论：{len(df_valid)}条")
     
-    # 收集所有分词结果（扁平化：所有评论的词合并成一个列表）
-    all_raw_tokens = []    # 含停用词的所有词
-    all_filtered_tokens = []  # 去停用词的所有词
-    for comment in df_valid["清洗后"]:
-        all_raw_tokens.extend(get_raw_tokens(comment))
-        all_filtered_tokens.extend(get_filtered_tokens(comment))
-    
     # 生成TXT（每行一个词，和参考格式完全一致）
     raw_txt = f"{idol_name}_仅分词结果.txt"
     filtered_txt = f"{idol_name}_去除停用词之后结果.txt"
     
-    # 保存仅分词（含停用词）
-    with open(raw_txt, "w", encoding="utf-8") as f:
-        for token in all_raw_tokens:
-            f.write(token + "\n")
-    # 保存去停用词后
-    with open(filtered_txt, "w", encoding="utf-8") as f:
-        for token in all_filtered_tokens:
-            f.write(token + "\n")
+    # 每条评论只分一次词，两个文件边分词边写（带缓冲，不在内存里攒全部词）
+    raw_count = 0        # 含停用词的词数
+    filtered_count = 0   # 去停用词的词数
+    with open(raw_txt, "w", encoding="utf-8", buffering=WRITE_BUFFER) as raw_f, \
+         open(filtered_txt, "w", encoding="utf-8", buffering=WRITE_BUFFER) as filtered_f:
+        for raw, filtered in iter_tokenized(df_valid["清洗后"]):
+            if raw:
+                raw_f.write("\n".join(raw) + "\n")
+                raw_count += len(raw)
+            if filtered:
+                filtered_f.write("\n".join(filtered) + "\n")
+                filtered_count += len(filtered)
     
     print(f"3. 文件生成完成：")
-    print(f"   - {raw_txt}（共{len(all_raw_tokens)}个词，含停用词）")
-    print(f"   - {filtered_txt}（共{len(all_filtered_tokens)}个词，无停用词）")
+    print(f"   - {raw_txt}（共{raw_count}个词，含停用词）")
+    print(f"   - {filtered_txt}（共{filtered_count}个词，无停用词）")
 
 # -------------------------- 4. 主流程 --------------------------
 if __name__ == "__main__":
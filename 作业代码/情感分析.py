@@ -1,81 +1,34 @@
 # 导入所需库
+import numpy as np
 import pandas as pd
-from snownlp import SnowNLP
-import jieba
 from collections import Counter
 import re
+import token_cache
+from sentiment_batch import batch_emotion_analysis, irony_words, POLARITIES
+from lexicon_matcher import LexiconMatcher
+from corpus_store import load_comment_rows
+from incremental_state import get_state, stage_key
+
+# 情感分析进程数（1=单进程；Windows下多进程需把本脚本主流程放进 if __name__ == "__main__": 中）
+WORKERS = 1
 
 # ===================== 1. 读取Excel格式数据（核心修改部分） =====================
 # 请替换为你的Excel文件路径（和代码同文件夹直接写文件名，否则写完整路径，如：C:/data/赵丽颖评论_清洗后.xlsx）
 zhao_file_path = "C:/桌面/赵丽颖评论爬取.xlsx"  # 赵丽颖Excel文件
 luo_file_path = "C:/桌面/洛天依评论爬取(1).xlsx"    # 洛天依Excel文件
 
-# 读取Excel（指定编码，解决中文乱码；usecols只读取需要的列，提升速度）
-try:
-    # 优先用utf-8编码，若报错改用gbk（中文Windows常见）
-    zhao_df = pd.read_excel(zhao_file_path, usecols=["评论内容"], encoding="utf-8")
-    luo_df = pd.read_excel(luo_file_path, usecols=["评论内容"], encoding="utf-8")
-except:
-    zhao_df = pd.read_excel(zhao_file_path, usecols=["评论内容"], encoding="gbk")
-    luo_df = pd.read_excel(luo_file_path, usecols=["评论内容"], encoding="gbk")
-
-# 清理空值评论（避免分析报错）
-zhao_df = zhao_df.dropna(subset=["评论内容"])
-luo_df = luo_df.dropna(subset=["评论内容"])
-zhao_df["评论内容"] = zhao_df["评论内容"].astype(str)  # 统一转为字符串
-luo_df["评论内容"] = luo_df["评论内容"].astype(str)
-
-# ===================== 2. 情感极性&强度分析 =====================
-# 定义情感分析函数（含反讽词过滤，提升准确性）
-def emotion_analysis(text):
-    if pd.isna(text) or text.strip() == "" or len(text) < 5:  # 过滤短评论
-        return {"polarity": "中性", "score": 0.5}
-    
-    # 反讽词库（可根据数据补充）
-    irony_words = ["呵呵", "真厉害", "绝了（反讽）", "就这", "不愧是你（反讽）"]
-    for word in irony_words:
-        if word in text:
-            return {"polarity": "负向", "score": 0.2}
-    
-    s = SnowNLP(text)
-    score = s.sentiments  # 情感得分（0-1，越接近1越正向）
-    if score >= 0.6:
-        polarity = "正向"
-    elif score <= 0.4:
-        polarity = "负向"
-    else:
-        polarity = "中性"
-    return {"polarity": polarity, "score": score}
-
-# 批量分析赵丽颖粉丝情感
-zhao_df["情感极性"] = zhao_df["评论内容"].apply(lambda x: emotion_analysis(x)["polarity"])
-zhao_df["情感得分"] = zhao_df["评论内容"].apply(lambda x: emotion_analysis(x)["score"])
-
-# 批量分析洛天依粉丝情感
-luo_df["情感极性"] = luo_df["评论内容"].apply(lambda x: emotion_analysis(x)["polarity"])
-luo_df["情感得分"] = luo_df["评论内容"].apply(lambda x: emotion_analysis(x)["score"])
-
-# 统计情感极性占比（核心对比数据）
-zhao_polarity = zhao_df["情感极性"].value_counts(normalize=True) * 100
-luo_polarity = luo_df["情感极性"].value_counts(normalize=True) * 100
-
-# 统计情感强度均值
-zhao_score_mean = zhao_df["情感得分"].mean()
-luo_score_mean = luo_df["情感得分"].mean()
-
-# ===================== 3. 情感强度细化分析（强情感词+感叹号） =====================
+# ===================== 2. 情感强度词库（强情感词+感叹号） =====================
 # 定义强情感词库
 positive_strong = ["封神", "永远支持", "绝了", "最好", "心疼", "守护", "超棒", "惊艳"]
 negative_strong = ["失望透顶", "拉胯", "尴尬", "糟糕", "崩溃", "差评", "难看"]
+# 强情感词自动机（只编译一次，每条评论扫描一遍）
+strong_matcher = LexiconMatcher(positive_strong + negative_strong)
 
 # 统计单条评论强情感词数量
 def count_strong_words(text):
     if pd.isna(text):
         return 0
-    count = 0
-    for word in positive_strong + negative_strong:
-        count += text.count(word)
-    return count
+    return strong_matcher.count(text)
 
 # 统计感叹号数量（含中英文）
 def count_exclamation(text):
@@ -83,21 +36,7 @@ def count_exclamation(text):
         return 0
     return text.count("!") + text.count("！")
 
-# 批量计算
-zhao_df["强情感词数"] = zhao_df["评论内容"].apply(count_strong_words)
-luo_df["强情感词数"] = luo_df["评论内容"].apply(count_strong_words)
-
-zhao_df["感叹号数"] = zhao_df["评论内容"].apply(count_exclamation)
-luo_df["感叹号数"] = luo_df["评论内容"].apply(count_exclamation)
-
-# 统计均值
-zhao_strong_word_mean = zhao_df["强情感词数"].mean()
-luo_strong_word_mean = luo_df["强情感词数"].mean()
-
-zhao_excla_mean = zhao_df["感叹号数"].mean()
-luo_excla_mean = luo_df["感叹号数"].mean()
-
-# ===================== 4. 情感焦点关键词提取 =====================
+# ===================== 3. 情感焦点关键词提取 =====================
 # 加载停用词表（需提前下载哈工大停用词表，保存为stopwords.txt）
 try:
     with open("stopwords.txt", "r", encoding="utf-8") as f:
@@ -112,19 +51,79 @@ def clean_and_cut(text):
         return []
     # 去除特殊字符、数字、字母
     text = re.sub(r"[^\u4e00-\u9fa5]", "", text)
-    # 分词
-    words = jieba.lcut(text)
+    # 分词（走分词缓存，其他脚本分过的评论不再重复分词）
+    words = token_cache.lcut(text)
     # 过滤停用词、短词、无意义词
     words = [w for w in words if w not in stopwords and len(w) > 1 and w not in ["评论", "内容", "用户"]]
     return words
 
-# 提取正向评论的关键词（聚焦核心情感）
-zhao_positive = zhao_df[zhao_df["情感极性"] == "正向"]["评论内容"].apply(clean_and_cut)
-luo_positive = luo_df[luo_df["情感极性"] == "正向"]["评论内容"].apply(clean_and_cut)
+# ===================== 4. 增量情感分析（只算新评论，汇总结果合并存储） =====================
+RESULT_COLUMNS = ["情感极性", "情感得分", "强情感词数", "感叹号数"]
+state = get_state()
+
+def analyze_incremental(file_path, idol):
+    """
+    只对上次运行之后新增的评论做情感分析，新结果合并进已存的汇总
+    （反讽词/强情感词/停用词/分词词典变了会自动全量重算）
+    :return: (逐条结果DataFrame, 极性计数Counter, 合计Counter, 正向关键词Counter)
+    """
+    # 只读取评论列及稳定评论ID（已去空值、统一转为字符串；有同名.parquet语料时直接读列存）
+    rows = load_comment_rows(file_path, idol=idol)
+    stage = stage_key("情感分析", idol, irony_words, positive_strong, negative_strong,
+                      stopwords, token_cache.dict_version())
+    # 按行取布尔掩码（普通列表为空时pandas会当成选0列）
+    new = rows.loc[np.asarray(state.unseen(stage, rows["comment_id"]), dtype=bool)].copy()
+    print(f"🔍 {idol}：新增评论{len(new)}条（已分析过的{len(rows) - len(new)}条直接复用）")
+
+    # 批量分析情感（同一条评论只算一次SnowNLP，极性和得分一次拿到）
+    new[["情感极性", "情感得分"]] = batch_emotion_analysis(new["评论内容"], workers=WORKERS)
+    new["强情感词数"] = new["评论内容"].apply(count_strong_words).astype(int)
+    new["感叹号数"] = new["评论内容"].apply(count_exclamation).astype(int)
+    # 正向评论的关键词（聚焦核心情感）
+    positive_words = Counter(
+        w for text in new.loc[new["情感极性"] == "正向", "评论内容"] for w in clean_and_cut(text)
+    )
+
+    # 合并汇总：极性计数、得分/强情感词/感叹号合计、正向关键词词频
+    polarity = state.merge_counter(stage, "极性计数", Counter(new["情感极性"]))
+    totals = state.merge_counter(stage, "合计", {
+        "评论数": len(new),
+        "情感得分": float(new["情感得分"].sum()),
+        "强情感词数": int(new["强情感词数"].sum()),
+        "感叹号数": int(new["感叹号数"].sum()),
+    })
+    keywords = state.merge_counter(stage, "正向关键词", positive_words)
+    state.mark_done(stage, new["comment_id"], payloads=new[RESULT_COLUMNS].values.tolist())
+    state.commit()
+
+    # 逐条结果（导出Excel用）：旧评论直接取存好的结果
+    stored = state.payloads(stage)
+    results = pd.DataFrame([stored[cid] for cid in rows["comment_id"]], columns=RESULT_COLUMNS, index=rows.index)
+    results["情感极性"] = pd.Categorical(results["情感极性"], categories=POLARITIES)
+    return pd.concat([rows[["评论内容"]], results], axis=1), polarity, totals, keywords
+
+zhao_df, zhao_polarity_cnt, zhao_totals, zhao_word_count = analyze_incremental(zhao_file_path, "赵丽颖")
+luo_df, luo_polarity_cnt, luo_totals, luo_word_count = analyze_incremental(luo_file_path, "洛天依")
+
+# 统计情感极性占比（核心对比数据）
+def polarity_pct(counter):
+    return (pd.Series(counter, dtype=float).sort_values(ascending=False) / sum(counter.values()) * 100).rename("proportion")
+
+zhao_polarity = polarity_pct(zhao_polarity_cnt)
+luo_polarity = polarity_pct(luo_polarity_cnt)
+
+# 统计情感强度均值、强情感词/感叹号均值（由合计值直接算，不用重读全部评论）
+def total_mean(totals, key):
+    return totals[key] / totals["评论数"] if totals["评论数"] else float("nan")
+
+zhao_score_mean = total_mean(zhao_totals, "情感得分")
+luo_score_mean = total_mean(luo_totals, "情感得分")
+
+zhao_strong_word_mean = total_mean(zhao_totals, "强情感词数")
+luo_strong_word_mean = total_mean(luo_totals, "强情感词数")
 
-# 统计Top20关键词
-zhao_word_count = Counter([word for sublist in zhao_positive for word in sublist])
-luo_word_count = Counter([word for sublist in luo_positive for word in sublist])
+zhao_excla_mean = total_mean(zhao_totals, "感叹号数")
+luo_excla_mean = total_mean(luo_totals, "感叹号数")
 
 # ===================== 5. 输出所有结果 =====================
 print("="*60)
@@ -152,8 +151,9 @@ for word, count in luo_word_count.most_common(20):
     print(f"   {word}: {count}次")
 
 # ===================== 6. 导出分析结果到Excel（方便后续可视化） =====================
-zhao_df.to_excel("赵丽颖情感分析结果.xlsx", index=False, encoding="utf-8")
-luo_df.to_excel("洛天依情感分析结果.xlsx", index=False, encoding="utf-8")
+# 注：to_excel没有encoding参数（pandas 2已移除），xlsx本身就是UTF-8
+zhao_df.to_excel("赵丽颖情感分析结果.xlsx", index=False)
+luo_df.to_excel("洛天依情感分析结果.xlsx", index=False)
 print("\n✅ 分析结果已导出为Excel文件：")
 print("   - 赵丽颖情感分析结果.xlsx")
 print("   - 洛天依情感分析结果.xlsx")
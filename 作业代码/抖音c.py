@@ -1,95 +1,72 @@
 import time
 import csv
-import re
+import os
+from paste_ingest import iter_pasted_lines, iter_dumps, parse_batch_args
+from comment_parser import parse
+from near_dup import NearDupIndex, DEFAULT_THRESHOLD
 
-print("=== 抖音全部评论采集（仅提取评论内容）===")
-print("📝 操作步骤：")
-print("1. 打开抖音视频评论区，下拉加载所有需要采集的评论")
-print("2. Ctrl+A 全选评论区内容 → Ctrl+C 复制")
-print("3. 回到本程序窗口，Ctrl+V 粘贴所有内容")
-print("4. 新起一行输入「完成」，按回车开始处理")
-print()
-print("请粘贴评论内容（粘贴后输入「完成」结束）：")
+def extract_comments(lines, stats=None):
+    """从一份评论区内容中逐条提取纯评论内容（包括一级和二级，生成器）"""
+    # 按标点切分、过滤点赞数/纯数字/表情/过短内容、去掉开头@用户名，规则见comment_parser.py（抖音）
+    seen = set()  # 去掉完全相同的评论（近重复的保留，用簇ID标出）
+    for comment in parse("抖音", lines, stats=stats):
+        if comment not in seen:
+            seen.add(comment)
+            yield comment
 
-# 1. 接收用户粘贴的内容
-all_lines = []
-while True:
-    try:
-        line = input()
-        if line.strip() == "完成":
-            break
-        if line.strip():  # 跳过空行
-            all_lines.append(line.strip())
-    except (EOFError, KeyboardInterrupt):
-        break
-
-print(f"📊 接收到 {len(all_lines)} 行文本，正在提取所有评论内容...")
-
-# 2. 核心逻辑：提取所有纯评论内容（包括一级和二级）
-# 定义需要过滤的无关信息正则
-# 匹配规则：
-# - 以「@用户名」开头的（回复标识，保留后面的评论内容）
-# - 包含「赞」「万」的数字（点赞数，如「123赞」「4.5万赞」）
-# - 纯数字/数字+符号（可能是抖音号或时间）
-# - 表情符号
-irrelevant_pattern = re.compile(
-    r"^\d+(\.\d+)?万?赞$|^\d+$|[\U00010000-\U0010ffff]",
-    re.UNICODE
-)
-
-# 合并所有行，按标点符号分割（解决评论内容换行的问题）
-merged_text = " ".join(all_lines)
-# 按常见标点分割（。！？；：，、）），保留分割符
-potential_comments = re.split(r"([。！？；：，、）])", merged_text)
-# 重组分割后的内容（将分割符还原到评论末尾）
-comments_with_punct = []
-for i in range(0, len(potential_comments), 2):
-    comment_part = potential_comments[i]
-    punct_part = potential_comments[i+1] if i+1 < len(potential_comments) else ""
-    if comment_part.strip():
-        comments_with_punct.append(comment_part.strip() + punct_part)
-
-# 过滤无效内容，保留纯评论
-pure_comments = []
-seen = set()  # 去重
-
-for item in comments_with_punct:
-    # 过滤条件：
-    # - 不匹配无关信息正则（排除点赞数、纯数字、表情等）
-    # - 长度≥5（排除过短的无效内容）
-    # - 不是空字符串
-    if (
-        not irrelevant_pattern.match(item) 
-        and len(item.strip()) >= 5
-        and item.strip() != ""
-    ):
-        # 去除开头的@用户名（如果有），保留后面的评论内容
-        cleaned_comment = re.sub(r"^@\w+\s*", "", item.strip())
-        if cleaned_comment and cleaned_comment not in seen:
-            seen.add(cleaned_comment)
-            pure_comments.append(cleaned_comment)
+def process_dump(lines, csv_path, dedup_threshold=DEFAULT_THRESHOLD):
+    """处理一份评论区内容：边提取评论边写入CSV（附近重复簇ID），返回评论数"""
+    print("📊 正在提取所有评论内容...")
+    stats = {}
+    index = NearDupIndex(dedup_threshold)
+    preview = []
+    count = 0
+    # 生成CSV文件（序号、评论内容，以及簇ID=所在近重复簇第一条评论的序号）
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["序号", "评论内容", "簇ID"])
+        for count, comment in enumerate(extract_comments(lines, stats), 1):
+            writer.writerow([count, comment, index.add(comment) + 1])
+            if len(preview) < 10:
+                preview.append(comment)
 
-# 3. 输出结果
-print(f"✅ 成功提取 {len(pure_comments)} 条有效评论（含一级和二级）")
+    print(f"✅ 接收到 {stats['lines']} 行文本，成功提取 {count} 条有效评论（含一级和二级，近重复合并后 {index.clusters} 簇）")
 
-if pure_comments:
-    # 生成CSV文件（仅包含序号和评论内容）
-    filename = f"抖音全部评论_纯内容_{time.strftime('%Y%m%d_%H%M%S')}.csv"
-    with open(filename, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        writer.writerow(["序号", "评论内容"])  # 仅保留两个核心字段
-        for idx, comment in enumerate(pure_comments, 1):
-            writer.writerow([idx, comment])
+    if count:
+        print(f"💾 文件已保存至：{csv_path}")
+        print("\n📋 前10条评论预览：")
+        print("-" * 60)
+        for i, comment in enumerate(preview, 1):
+            print(f"{i:2d}. {comment}")
+        if count > 10:
+            print(f"... 共 {count} 条评论，其余内容已保存至文件")
+        print("-" * 60)
+    else:
+        os.remove(csv_path)
+        print("❌ 未识别到有效评论，请检查粘贴内容是否包含完整的评论区信息")
+    return count
 
-    print(f"💾 文件已保存至：{filename}")
-    print("\n📋 前10条评论预览：")
-    print("-" * 60)
-    for i, comment in enumerate(pure_comments[:10], 1):
-        print(f"{i:2d}. {comment}")
-    if len(pure_comments) > 10:
-        print(f"... 共 {len(pure_comments)} 条评论，其余内容已保存至文件")
-    print("-" * 60)
-else:
-    print("❌ 未识别到有效评论，请检查粘贴内容是否包含完整的评论区信息")
+if __name__ == "__main__":
+    args = parse_batch_args("抖音评论采集：不带参数为交互粘贴，带文件/目录/“-”为批量处理页面转储")
+    if args.paths:
+        # 批量模式：一次处理多份转储，无需人工值守
+        out_dir = args.out_dir or os.getcwd()
+        total = 0
+        for name, lines in iter_dumps(args.paths):
+            print(f"\n=== 处理：{name} ===")
+            total += process_dump(lines, os.path.join(out_dir, f"抖音全部评论_纯内容_{name}.csv"), args.dedup_threshold)
+        print(f"\n批量处理完成，共提取 {total} 条评论")
+    else:
+        print("=== 抖音全部评论采集（仅提取评论内容）===")
+        print("📝 操作步骤：")
+        print("1. 打开抖音视频评论区，下拉加载所有需要采集的评论")
+        print("2. Ctrl+A 全选评论区内容 → Ctrl+C 复制")
+        print("3. 回到本程序窗口，Ctrl+V 粘贴所有内容")
+        print("4. 新起一行输入「完成」，按回车开始处理")
+        print()
+        print("请粘贴评论内容（粘贴后输入「完成」结束）：")
 
-input("按回车键退出...")
+        # 1. 接收用户粘贴的内容
+        filename = f"抖音全部评论_纯内容_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+        process_dump(iter_pasted_lines(), os.path.join(args.out_dir or "", filename), args.dedup_threshold)
+        input("按回车键退出...")
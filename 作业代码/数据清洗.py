@@ -1,44 +1,192 @@
+import argparse
+import csv
+import multiprocessing as mp
+import os
 import re
+from collections import Counter, deque
 
-def strong_clean_excel():
+# ---------------------- 清洗规则（模块加载时编译一次） ----------------------
+# 干扰信息规则：(规则名, 正则)
+REMOVE_RULES = [
+    ("点赞数", r'点赞\d+'),
+    ("收藏数", r'收藏\d+'),
+    ("分享数", r'分享\d+'),
+    ("回复数", r'回复\d+'),
+    ("小时前", r'\d+小时前'),       # 时间信息
+    ("分钟前", r'\d+分钟前'),
+    ("天前", r'\d+天前'),
+    ("日期", r'\d+-\d+-\d+'),
+    ("举报", r'举报'),              # 举报按钮
+    ("作者赞过", r'作者赞过'),       # 作者点赞标记
+    ("展开", r'展开'),              # 展开按钮
+    ("收起", r'收起'),              # 收起按钮
+    ("查看更多回复", r'查看更多回复'),
+    ("网址链接", r'http\S+'),
+    ("@用户", r'@\S+'),
+    ("话题标签", r'#\S+#'),
+    ("中文方括号", r'【.*?】'),
+    ("英文方括号", r'\[.*?\]'),
+    ("HTML标签", r'<.*?>'),
+    ("爱心表情", r'[♡♥❤️💕💖]'),
+    ("其他表情", r'[👍👎❤️🔥]'),
+]
+# 特定位置的干扰文本（按字面删除）
+NOISE_TEXTS = [
+    '点击查看', '查看图片', '图片评论', '语音评论',
+    '视频评论', '位置:', '发布于', '编辑于',
+    '已编辑', '删除', '置顶'
+]
+
+def _first_chars(pattern):
+    """规则正则可能的首字符（写进字符集用于快速预判）"""
+    if pattern.startswith('\\'):
+        return pattern[:2]           # \d、\[ 之类的转义
+    if pattern.startswith('['):
+        return pattern[1:pattern.index(']')]
+    return re.escape(pattern[0])
+
+# 所有删除规则合并成一个带命名分组的正则，一遍扫描完成全部删除
+# 开头的首字符预判让正则引擎快速跳过不可能命中的位置，不必在每个字符上逐个尝试全部规则
+_ALL_RULES = REMOVE_RULES + [(text, re.escape(text)) for text in NOISE_TEXTS]
+REMOVE_RE = re.compile(
+    "(?=[" + "".join(dict.fromkeys(_first_chars(p) for _, p in _ALL_RULES)) + "])(?:"
+    + "|".join(f"(?P<r{i}>{pattern})" for i, (_, pattern) in enumerate(_ALL_RULES)) + ")"
+)
+_RULE_NAMES = {f"r{i}": name for i, (name, _) in enumerate(_ALL_RULES)}
+SPACE_RE = re.compile(r'\s+')
+# 清理标点符号（保留中文标点）
+PUNCT_RE = re.compile(r'[^\w\u4e00-\u9fff\s，。！？：；（）《》]+')
+# 无效内容特征（合并成一个正则）
+INVALID_RE = re.compile(r'^(?:回复|点赞|收藏|分享|作者|用户|评论|内容|\d+|\.+)$')
+CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+
+PROGRESS_EVERY = 100000   # 每处理多少行打印一次进度
+SAMPLE_COUNT = 5          # 保留几条清洗前后对比示例
+CHUNK_ROWS = 20000        # 多进程时每个分块的行数
+
+# 规则命中计数（看哪些规则真正起作用）
+RULE_HITS = Counter()
+
+def _count_hit(match):
+    RULE_HITS[_RULE_NAMES[match.lastgroup]] += 1
+    return ''
+
+def find_content_column(header):
+    """找到评论内容所在列（列名含“评论”/content），找不到就用最后一列"""
+    for i, col in enumerate(header):
+        if "评论" in col or "content" in col.lower():
+            return i
+    return len(header) - 1
+
+def clean_row(row, content_idx):
+    """
+    清洗一行CSV（只清洗评论列，其他列原样保留）
+    :return: (输出行或None, 原评论, 清洗后评论)，无效评论的输出行为None
+    """
+    original = row[content_idx] if content_idx < len(row) else ""
+    cleaned = strong_clean_line(original)
+    if not cleaned:
+        return None, original, cleaned
+    out = list(row)
+    if content_idx < len(out):
+        out[content_idx] = cleaned
+    status = "已清洗" if cleaned != original else "无需清洗"
+    return out + [status], original, cleaned
+
+def _clean_chunk(rows, content_idx):
+    """子进程：清洗一个分块，返回清洗结果和本块的规则命中数"""
+    RULE_HITS.clear()
+    results = [clean_row(row, content_idx) for row in rows]
+    return results, dict(RULE_HITS)
+
+def iter_row_chunks(rows, size=CHUNK_ROWS):
+    """把行迭代器切成固定行数的分块（按行切分，引号内的换行不会被切断）"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_cleaned_rows(rows, content_idx, workers=1):
+    """
+    逐行产出清洗结果(输出行或None, 原评论, 清洗后评论)，顺序与输入一致
+    workers>1时分块交给进程池，同时在途的分块数有上限，内存不随文件变大
+    """
+    if workers <= 1:
+        for row in rows:
+            yield clean_row(row, content_idx)
+        return
+    
+    with mp.Pool(workers) as pool:
+        pending = deque()
+        for chunk in iter_row_chunks(rows):
+            pending.append(pool.apply_async(_clean_chunk, (chunk, content_idx)))
+            # 按提交顺序取回结果，保证输出顺序与原文件一致
+            while len(pending) >= workers * 2:
+                results, hits = pending.popleft().get()
+                RULE_HITS.update(hits)
+                yield from results
+        while pending:
+            results, hits = pending.popleft().get()
+            RULE_HITS.update(hits)
+            yield from results
+
+def strong_clean_excel(input_file=None, workers=1):
+    """
+    流式清洗CSV：逐行读取→清洗→写出，内存占用与文件大小无关
+    :param workers: 清洗进程数（>1时按行分块并行清洗，输出顺序不变）
+    """
     # 输入文件名
-    input_file = input("请输入你要清洗的文件名: ").strip()
+    if input_file is None:
+        input_file = input("请输入你要清洗的文件名: ").strip()
     output_file = input_file.replace('.csv', '_强力清洗.csv')
     
     print(f"🧹 开始强力清洗: {input_file}")
     
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        lines = content.split('\n')
-        cleaned_lines = []
-        
-        # 保留表头
-        if lines:
-            cleaned_lines.append(lines[0] + ',清洗状态')
+        total_size = os.path.getsize(input_file) or 1
+        total = 0      # 数据行数（不含表头）
+        kept = 0       # 保留行数
+        samples = []   # 清洗前后对比示例
         
-        for i, line in enumerate(lines[1:], 1):  # 跳过表头
-            if not line.strip():
-                continue
+        # 用csv读写，评论里带引号的逗号/换行不会把一行拆坏
+        with open(input_file, 'r', encoding='utf-8-sig', newline='') as fin, \
+             open(output_file, 'w', encoding='utf-8', newline='') as fout:
+            reader = csv.reader(fin)
+            writer = csv.writer(fout)
             
-            original_line = line
-            cleaned_line = strong_clean_line(line)
+            # 保留表头
+            header = next(reader, None)
+            if header is None:
+                print(f"❌ 文件 {input_file} 是空的！")
+                return
+            writer.writerow(header + ['清洗状态'])
+            content_idx = find_content_column(header)
+            print(f"评论列: {header[content_idx] if header else '第1列'}")
             
-            if cleaned_line and cleaned_line != original_line:
-                cleaned_lines.append(cleaned_line + ',已清洗')
-        
-        # 保存结果
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(cleaned_lines))
+            rows = (row for row in reader if any(cell.strip() for cell in row))
+            for out, original, cleaned in iter_cleaned_rows(rows, content_idx, workers):
+                total += 1
+                if out is not None:
+                    writer.writerow(out)
+                    kept += 1
+                    if len(samples) < SAMPLE_COUNT:
+                        samples.append((original, cleaned))
+                if total % PROGRESS_EVERY == 0:
+                    done = fin.buffer.tell() / total_size * 100
+                    print(f"  ⏳ 已处理 {total} 行（约{min(done, 100):.1f}%），保留 {kept} 行")
         
         print(f"✅ 强力清洗完成！")
-        print(f"原始行数: {len(lines)}")
-        print(f"清洗后行数: {len(cleaned_lines)}")
+        print(f"原始行数: {total}")
+        print(f"清洗后行数: {kept}")
         print(f"保存到: {output_file}")
         
         # 显示清洗效果
-        show_cleaning_effect(lines, cleaned_lines)
+        show_cleaning_effect(samples, total, kept)
+        show_rule_hits()
         
     except FileNotFoundError:
         print(f"❌ 文件 {input_file} 不存在！")
@@ -51,48 +199,15 @@ def strong_clean_line(line):
         return ""
     
     # 1. 移除多余空格和换行符
-    line = re.sub(r'\s+', ' ', line)
-    
-    # 2. 移除各种干扰信息
-    patterns_to_remove = [
-        r'点赞\d+',           # 点赞数
-        r'收藏\d+',           # 收藏数  
-        r'分享\d+',           # 分享数
-        r'回复\d+',           # 回复数
-        r'\d+小时前',         # 时间信息
-        r'\d+分钟前',
-        r'\d+天前',
-        r'\d+-\d+-\d+',      # 日期
-        r'举报',              # 举报按钮
-        r'作者赞过',          # 作者点赞标记
-        r'展开',              # 展开按钮
-        r'收起',              # 收起按钮
-        r'查看更多回复',       # 查看更多
-        r'http\S+',          # 网址链接
-        r'@\S+',             # @用户
-        r'#\S+#',            # 话题标签
-        r'【.*?】',           # 方括号内容
-        r'\[.*?\]',          # 英文方括号
-        r'<.*?>',            # HTML标签
-        r'[♡♥❤️💕💖]',       # 爱心表情
-        r'[👍👎❤️🔥]',       # 其他表情
-    ]
-    
-    for pattern in patterns_to_remove:
-        line = re.sub(pattern, '', line)
+    line = SPACE_RE.sub(' ', line)
     
-    # 3. 移除特定位置的干扰文本
-    noise_texts = [
-        '点击查看', '查看图片', '图片评论', '语音评论',
-        '视频评论', '位置:', '发布于', '编辑于',
-        '已编辑', '删除', '置顶'
-    ]
-    
-    for text in noise_texts:
-        line = line.replace(text, '')
+    # 2+3. 一遍删除所有干扰信息和干扰文本（同时统计各规则命中次数）
+    line = REMOVE_RE.sub(_count_hit, line)
     
     # 4. 清理标点符号（保留中文标点）
-    line = re.sub(r'[^\w\u4e00-\u9fff\s，。！？：；（）《》]', '', line)
+    line, n = PUNCT_RE.subn('', line)
+    if n:
+        RULE_HITS["非中文标点"] += n
     
     # 5. 移除纯数字或过短的行
     line = line.strip()
@@ -111,23 +226,16 @@ def is_valid_comment(text):
         return False
     
     # 无效内容特征
-    invalid_patterns = [
-        r'^回复$', r'^点赞$', r'^收藏$', r'^分享$',
-        r'^作者$', r'^用户$', r'^评论$', r'^内容$',
-        r'^\d+$', r'^\.+$'
-    ]
-    
-    for pattern in invalid_patterns:
-        if re.match(pattern, text):
-            return False
+    if INVALID_RE.match(text):
+        return False
     
     # 必须包含中文或实际内容
-    if not re.search(r'[\u4e00-\u9fff]', text) and len(text) < 10:
+    if not CHINESE_RE.search(text) and len(text) < 10:
         return False
     
     return True
 
-def show_cleaning_effect(original_lines, cleaned_lines):
+def show_cleaning_effect(samples, total, kept):
     """显示清洗效果对比"""
     print("\n" + "="*60)
     print("🧼 清洗效果对比")
@@ -135,23 +243,30 @@ def show_cleaning_effect(original_lines, cleaned_lines):
     
     # 显示几个清洗前后的例子
     print("\n📝 清洗前后对比示例:")
-    count = 0
-    for i, orig_line in enumerate(original_lines[1:6], 1):  # 前5条数据
-        if i < len(cleaned_lines):
-            clean_line = cleaned_lines[i].split(',')[0]  # 取清洗后的内容部分
-            
-            print(f"\n示例 {i}:")
-            print(f"  清洗前: {orig_line[:80]}..." if len(orig_line) > 80 else f"  清洗前: {orig_line}")
-            print(f"  清洗后: {clean_line[:80]}..." if len(clean_line) > 80 else f"  清洗后: {clean_line}")
-            count += 1
+    for i, (orig_line, clean_line) in enumerate(samples, 1):  # 前5条数据
+        print(f"\n示例 {i}:")
+        print(f"  清洗前: {orig_line[:80]}..." if len(orig_line) > 80 else f"  清洗前: {orig_line}")
+        print(f"  清洗后: {clean_line[:80]}..." if len(clean_line) > 80 else f"  清洗后: {clean_line}")
     
     # 统计信息
     print(f"\n📊 清洗统计:")
-    print(f"  - 原始数据: {len(original_lines)} 行")
-    print(f"  - 清洗后: {len(cleaned_lines)} 行") 
-    print(f"  - 过滤掉: {len(original_lines) - len(cleaned_lines)} 行")
-    print(f"  - 保留率: {len(cleaned_lines)/len(original_lines)*100:.1f}%")
+    print(f"  - 原始数据: {total} 行")
+    print(f"  - 清洗后: {kept} 行") 
+    print(f"  - 过滤掉: {total - kept} 行")
+    print(f"  - 保留率: {kept/max(total, 1)*100:.1f}%")
+
+def show_rule_hits():
+    """显示各清洗规则的命中次数"""
+    print(f"\n🎯 规则命中统计:")
+    if not RULE_HITS:
+        print("  - 没有规则命中")
+    for name, count in RULE_HITS.most_common():
+        print(f"  - {name}: {count} 次")
 
 # 运行清洗
 if __name__ == "__main__":
-    strong_clean_excel()
+    parser = argparse.ArgumentParser(description="评论CSV强力清洗（流式逐行处理）")
+    parser.add_argument("input_file", nargs="?", help="要清洗的CSV文件（不填则运行后输入）")
+    parser.add_argument("--workers", type=int, default=1, help="清洗进程数（默认1，大文件可设为CPU核数）")
+    args = parser.parse_args()
+    strong_clean_excel(args.input_file, args.workers)
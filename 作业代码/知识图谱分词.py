@@ -1,8 +1,12 @@
-import pandas as pd
 import jieba
-import json
-import re
 import os
+import numpy as np
+import token_cache
+from corpus_store import load_comment_rows
+from cooccur_graph import ALIASES, WINDOW, MIN_COUNT, MIN_PMI, CooccurrenceGraph
+from incremental_state import stage_key
+from triple_store import get_store
+from graph_export import export_graph
 
 # ---------------------- 第一步：自动定位Excel文件（桌面/当前文件夹） ----------------------
 def find_excel_file(file_name: str) -> str:
@@ -37,32 +41,27 @@ lty_excel = find_excel_file("洛天依评论爬取.xlsx")
 
 # ---------------------- 第二步：数据预处理（容错） ----------------------
 def load_and_clean_comments(excel_path: str, idol_name: str) -> list:
+    """返回[(评论ID, 清洗后评论), ...]，评论ID用于增量抽取和追溯来源"""
     if not excel_path:
         return []
     try:
-        df = pd.read_excel(excel_path)
-        # 兼容不同列名（评论/评论内容/粉丝评论）
-        comment_cols = [col for col in df.columns if "评论" in col]
-        if not comment_cols:
-            print(f"❌ {idol_name}Excel中无“评论”相关列")
-            return []
-        comments = df[comment_cols[0]].dropna().astype(str).tolist()
+        # 兼容不同列名（评论/评论内容/粉丝评论），有Parquet语料时直接读清洗列
+        rows = load_comment_rows(excel_path, cleaned=True, idol=idol_name)
+    except ValueError:
+        print(f"❌ {idol_name}Excel中无“评论”相关列")
+        return []
     except Exception as e:
         print(f"❌ 读取{idol_name}Excel失败：{str(e)[:50]}")
         return []
     
-    # 清洗规则
-    stop_names = {idol_name, "颖宝", "天依", "殿下", "赵姐", "洛殿"}
+    # 清洗规则（保留偶像本名/昵称，共现抽取要靠它们定位实体）
     clean_comments = []
-    for c in comments:
-        # 剔除非中文+去空格
-        c_clean = re.sub(r"[^\u4e00-\u9fa5]", "", c).strip()
-        # 剔除偶像命名
-        for name in stop_names:
-            c_clean = c_clean.replace(name, "")
+    for cid, c in zip(rows["comment_id"], rows["评论内容"]):
+        # 已剔除非中文，这里只去空格
+        c_clean = c.strip()
         # 过滤短文本
         if len(c_clean) >= 3:
-            clean_comments.append(c_clean)
+            clean_comments.append((cid, c_clean))
     print(f"✅ {idol_name}有效评论数：{len(clean_comments)}")
     return clean_comments
 
@@ -75,7 +74,7 @@ if not all_comments:
     print("❌ 无有效评论数据，程序退出")
     exit()
 
-# ---------------------- 第三步：离线实体/关系抽取（无外网依赖） ----------------------
+# ---------------------- 第三步：离线实体/关系抽取（无外网依赖，共现矩阵+PMI） ----------------------
 # 预设核心实体库（贴合你的场景）
 PRESET_ENTITIES = {
     "赵丽颖": {"type": "人物", "sub_type": "真实偶像"},
@@ -95,59 +94,111 @@ EMOTION_WORDS = {
     "失望", "难过", "不满", "讨厌", "差", "不好", "遗憾", "吐槽", "无语", "生气"
 }
 
-# 抽取实体和三元组
-entities = []  # 格式：[(实体名, 实体类型), ...]
-triples = []   # 格式：[(头实体, 关系, 尾实体), ...]
-
-for comment in all_comments:
-    # 1. 匹配偶像实体
-    for idol, info in PRESET_ENTITIES.items():
-        if idol in comment and idol in ["赵丽颖", "洛天依"]:
-            # 添加偶像实体
-            entities.append((idol, info["type"]))
-            entities.append((info["sub_type"], "偶像类型"))
-            
-            # 2. 匹配情感词，生成情感关系
-            for emo in EMOTION_WORDS:
-                if emo in comment:
-                    triples.append(("粉丝", emo, idol))
-                    entities.append((emo, "情感词"))
-            
-            # 3. 匹配作品/特质，生成关联关系
-            for entity, e_info in PRESET_ENTITIES.items():
-                if entity in comment and entity not in ["赵丽颖", "洛天依"]:
-                    entities.append((entity, e_info["type"]))
-                    # 生成关系（根据实体类型）
-                    if e_info["type"] == "作品":
-                        triples.append((idol, "关联", entity))
-                    elif e_info["type"] == "特质":
-                        triples.append((idol, "拥有", entity))
-
-# 去重（避免重复实体/关系）
-entities = list(set(entities))
-triples = list(set([tuple(t) for t in triples]))
+# 偶像本名、昵称、实体、情感词都加进jieba词典，分词时保持完整（“颖宝”不拆成“颖”“宝”）
+IDOLS = ["赵丽颖", "洛天依"]
+for word in [*IDOLS, *ALIASES, *PRESET_ENTITIES, *EMOTION_WORDS]:
+    jieba.add_word(word)
+
+# 共现对 → 关系：情感词/作品/特质按词库定关系类型，其他词按PMI阈值筛出“共现”关系
+def relation_map(graph):
+    """(偶像, 词) → (头实体, 关系, 尾实体, 词的实体类型)"""
+    relation_of = {}
+    for idol, emo, _, _ in graph.relations(min_count=1, min_pmi=None, terms=EMOTION_WORDS):
+        relation_of[(idol, emo)] = ("粉丝", emo, idol, "情感词")
+    for idol, entity, _, _ in graph.relations(min_count=1, min_pmi=None, terms=set(PRESET_ENTITIES) - set(IDOLS)):
+        e_type = PRESET_ENTITIES[entity]["type"]
+        rel = {"作品": "关联", "特质": "拥有"}.get(e_type)
+        relation_of[(idol, entity)] = (idol, rel, entity, e_type) if rel else (None, None, entity, e_type)
+    for idol, word, _, _ in graph.relations(MIN_COUNT, MIN_PMI):
+        relation_of.setdefault((idol, word), (idol, "共现", word, "关键词"))
+    return relation_of
+
+def entity_counts(graph, relation_of):
+    """实体次数=出现在多少条评论的关系里（按全部共现来源向量化统计，不重新分词）"""
+    size = len(graph.vocab)
+    row_of = {idol: i for i, idol in enumerate(graph.entities)}
+    keys = np.array([row_of[idol] * size + graph.vocab.ids[word] for idol, word in relation_of], dtype=np.int64)
+    docs, rows, cols = graph.links
+    hit = np.isin(rows * size + cols, keys)
+    # 每条来源提到三个实体：偶像、偶像类型、词；(实体名, 类型)编成整数后按(评论, 实体)去重计数
+    names = {}
+    code = lambda name, etype: names.setdefault((name, etype), len(names))
+    idol_codes = np.array([code(idol, PRESET_ENTITIES[idol]["type"]) for idol in graph.entities])
+    sub_codes = np.array([code(PRESET_ENTITIES[idol]["sub_type"], "偶像类型") for idol in graph.entities])
+    word_code = {graph.vocab.ids[word]: code(word, tail_type) for (_, word), (_, _, _, tail_type) in relation_of.items()}
+    word_codes = np.array([word_code[c] for c in cols[hit]], dtype=np.int64)
+    codes = np.concatenate([idol_codes[rows[hit]], sub_codes[rows[hit]], word_codes])
+    pairs = np.unique(np.stack([np.tile(docs[hit], 3), codes], axis=1), axis=0)
+    counts = np.bincount(pairs[:, 1], minlength=len(names))
+    return [(name, etype, int(counts[i])) for (name, etype), i in names.items() if counts[i]]
+
+# 三元组库：插入时去重、累计次数并记录来源评论ID
+# 共现计数/文档频率/评论数可以直接累加，存成.npz放在三元组库旁边：每次只给新评论分词、算共现，PMI用累加后的统计重算
+STAGE = stage_key("知识图谱", PRESET_ENTITIES, EMOTION_WORDS, ALIASES, WINDOW, MIN_COUNT, MIN_PMI)
+store = get_store(config_key=STAGE)
+GRAPH_STATE = os.path.splitext(store.path)[0] + "_共现.npz"
+graph = CooccurrenceGraph.load(GRAPH_STATE, IDOLS, config_key=STAGE)
+if graph is None or graph.n_docs != store.stats()["评论数"]:
+    # 第一次运行、词库/阈值变了或上次中途退出：从头算
+    store.clear()
+    graph = CooccurrenceGraph(IDOLS)
+new_comments = [item for item, new in zip(all_comments, store.unseen([cid for cid, _ in all_comments])) if new]
+print(f"🔍 新增评论{len(new_comments)}条（共{len(all_comments)}条）")
+
+if new_comments:
+    old_relations = relation_map(graph)
+
+    # 1. 新评论分词（走分词缓存），只留词库里的词和长度≥2的词
+    lexicon = set(IDOLS) | set(ALIASES) | set(PRESET_ENTITIES) | EMOTION_WORDS
+    docs = [[w for w in words if w in lexicon or len(w) >= 2]
+            for words in token_cache.lcut_many(c for _, c in new_comments)]
+
+    # 2. 偶像×词的窗口共现矩阵累加新评论（昵称已归一到本名）
+    graph.partial_fit(docs, doc_ids=[cid for cid, _ in new_comments])
+    print(f"🧮 共现矩阵：{graph.counts.shape[0]}×{graph.counts.shape[1]}，非零{graph.counts.nnz}项")
+    relation_of = relation_map(graph)
+
+    # 3. 三元组：原有关系只加新评论的来源；新过PMI阈值的共现关系补上全部历史来源；跌出阈值的删掉
+    kept = [pair for pair in relation_of if pair in old_relations]
+    added = [pair for pair in relation_of if pair not in old_relations]
+    dropped = [old_relations[pair][:3] for pair in old_relations if pair not in relation_of]
+    sources = [(cid, *relation_of[(idol, word)][:3])
+               for cid, idol, word in graph.sources(kept, batch_only=True) + graph.sources(added)
+               if relation_of[(idol, word)][1]]
+    store.remove_triples(t for t in dropped if t[1])
+    store.add_many(sources, comment_ids=[cid for cid, _ in new_comments])
+    store.set_entities(entity_counts(graph, relation_of))
+
+# 计数、来源、已处理清单一起提交，再存共现状态（两者评论数对不上时下次从头算）
+store.commit()
+if new_comments:
+    graph.save(GRAPH_STATE, config_key=STAGE)
+print(f"📊 三元组库：{store.stats()}")
 
 # ---------------------- 第四步：保存结果到桌面（可视化用） ----------------------
 # 桌面路径
 desktop = os.path.join(os.path.expanduser("~"), "Desktop")
 
-# 保存实体
+# 从库里导出去重后的实体、三元组（按出现次数排序）
 entity_path = os.path.join(desktop, "知识图谱_实体.json")
-with open(entity_path, "w", encoding="utf-8") as f:
-    json.dump(entities, f, ensure_ascii=False, indent=2)
-
-# 保存三元组
 triple_path = os.path.join(desktop, "知识图谱_三元组.json")
-with open(triple_path, "w", encoding="utf-8") as f:
-    json.dump(triples, f, ensure_ascii=False, indent=2)
+entities, triples = store.export_json(entity_path, triple_path)
+
+# 交互图谱（离线剪枝+分社区+预排版，浏览器直接打开文件夹里的index.html）
+graph_dir = os.path.join(desktop, "知识图谱可视化")
+graph_stats = export_graph(store.query(), graph_dir, title="双偶像知识图谱", min_weight=1)
 
 # ---------------------- 结果提示 ----------------------
 print("\n🎉 离线抽取完成！文件已保存到桌面：")
 print(f"1. 实体文件：{entity_path}")
 print(f"2. 三元组文件：{triple_path}")
+print(f"3. 交互图谱：{os.path.join(graph_dir, 'index.html')}  {graph_stats}")
 print("\n📌 实体示例（前5个）：")
 for e in entities[:5]:
     print(f"   - {e[0]}（{e[1]}）")
 print("\n📌 三元组示例（前5个）：")
 for t in triples[:5]:
-    print(f"   - {t[0]} → {t[1]} → {t[1]}")
+    print(f"   - {t[0]} → {t[1]} → {t[2]}")
+print("\n📌 粉丝对洛天依的情感（按次数）：")
+for head, rel, tail, n in store.query(head="粉丝", tail="洛天依", limit=10):
+    print(f"   - {rel}：{n}次")
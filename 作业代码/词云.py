@@ -1,12 +1,11 @@
 # 终极版：双偶像过滤+JPG蒙版+高频情感对比
-import pandas as pd
-import jieba
-import re
 import os
-import numpy as np
-from PIL import Image
-from wordcloud import WordCloud
 import matplotlib.pyplot as plt
+import token_cache
+from word_freq import FreqTable
+from wordcloud_render import make_job, render_batch, show
+from mask_cache import load_mask
+from corpus_store import load_comments
 
 # ---------------------- 全局配置（JPG蒙版+路径） ----------------------
 ZLY_MASK = r"C:\Users\GHS\Desktop\爱心.png"  # JPG格式
@@ -14,6 +13,8 @@ LTY_MASK = r"C:\Users\GHS\Desktop\爱心.png"
 ZLY_EXCEL = "赵丽颖评论爬取.xlsx"
 LTY_EXCEL = "洛天依评论爬取.xlsx"
 DESKTOP = os.path.join(os.path.expanduser("~"), "Desktop")
+# 词云渲染进程数（1=当前进程逐张渲染；Windows下多进程需把本脚本主流程放进 if __name__ == "__main__": 中）
+WORKERS = 1
 
 # ---------------------- 1. 情感词+专属过滤词配置 ----------------------
 # 核心情感词表
@@ -22,6 +23,8 @@ emotion_dict = {
     "负面情感": ["失望", "难过", "不满", "讨厌", "差", "不好", "遗憾", "吐槽", "无语", "生气", "伤心", "无奈"],
     "态度倾向": ["期待", "希望", "觉得", "认为", "感觉", "想要", "愿意", "应该"]
 }
+# 词云只保留出现次数≥该值的高频核心词
+MIN_FREQ = 2
 # 双偶像专属过滤词（剔除命名类无效词）
 filter_dict = {
     "赵丽颖": {"赵", "颖", },
@@ -33,60 +36,37 @@ stopwords_basic = {"的", "了", "在", "是", "我", "你", "他", "这", "那"
 # ---------------------- 2. 统一数据预处理（双偶像过滤） ----------------------
 def process_data(excel_path, idol_name):
     """通用预处理：适配双偶像过滤+情感词提取"""
-    df = pd.read_excel(excel_path)
-    comments = df["评论内容"].dropna().astype(str)
+    # 只读清洗后的评论列（有Parquet语料时直接读列存，不再解析Excel）
+    cleaned = load_comments(excel_path, cleaned=True)
     
-    # 1. 清洗+分词+专属过滤
-    all_words = []
+    # 1. 清洗+分词+专属过滤，边过滤边计数（只过一遍词，不保存词列表）
     idol_filter = filter_dict[idol_name]
-    for c in comments:
-        c_clean = re.sub(r"[^\u4e00-\u9fa5]", "", c)
-        words = jieba.lcut(c_clean)
-        for w in words:
-            # 过滤规则：非基础停用词+非偶像命名词+长度≥2
-            if w not in stopwords_basic and w not in idol_filter and len(w)>=2:
-                all_words.append(w)
+    word_freq = FreqTable().update(
+        # 过滤规则：非基础停用词+非偶像命名词+长度≥2
+        w for words in token_cache.lcut_many(cleaned) for w in words
+        if w not in stopwords_basic and w not in idol_filter and len(w)>=2
+    )
     
-    # 2. 统计情感词频次
-    emotion_freq = {"正面情感": {}, "负面情感": {}, "态度倾向": {}}
-    total_emotion_words = []
-    for emo_type, emo_words in emotion_dict.items():
-        for w in emo_words:
-            cnt = all_words.count(w)
-            if cnt > 0:
-                emotion_freq[emo_type][w] = cnt
-                total_emotion_words.extend([w]*cnt)
+    # 2. 统计情感词频次（直接查词频表，不再逐词扫描全部分词结果）
+    emotion_freq = {emo_type: {w: word_freq[w] for w in emo_words if w in word_freq}
+                    for emo_type, emo_words in emotion_dict.items()}
+    total_emotion = sum(sum(freq.values()) for freq in emotion_freq.values())
     
-    # 3. 生成词云文本（过滤低频词）
-    word_freq = {}
-    for w in all_words:
-        word_freq[w] = word_freq.get(w, 0) + 1
-    final_words = [w for w in all_words if word_freq[w] >= 2]  # 高频核心词
-    text = ' '.join(final_words)
+    # 3. 词云词频（过滤低频词），直接交给generate_from_frequencies
+    cloud_freq = word_freq.to_dict(min_count=MIN_FREQ)  # 高频核心词
     
     print(f"✅ {idol_name}数据处理完成：")
-    print(f"   核心词汇数：{len(final_words)} | 情感词总数：{len(total_emotion_words)}")
-    return text, emotion_freq
+    print(f"   核心词汇数：{sum(cloud_freq.values())} | 情感词总数：{total_emotion}")
+    return cloud_freq, emotion_freq
 
 # 处理双偶像数据
-zly_text, zly_emo_freq = process_data(ZLY_EXCEL, "赵丽颖")
-lt_text, lt_emo_freq = process_data(LTY_EXCEL, "洛天依")
+zly_freq, zly_emo_freq = process_data(ZLY_EXCEL, "赵丽颖")
+lt_freq, lt_emo_freq = process_data(LTY_EXCEL, "洛天依")
 
 # ---------------------- 3. JPG蒙版适配（双偶像通用） ----------------------
-def fix_jpg_mask(mask_path):
-    """处理JPG蒙版，解决压缩杂色问题"""
-    if not os.path.exists(mask_path):
-        print(f"⚠️  未找到蒙版：{mask_path}")
-        return None
-    img = Image.open(mask_path).convert("RGB")
-    mask = np.array(img)
-    # JPG专用二值化阈值（适配压缩杂色）
-    mask_gray = np.sum(mask, axis=2)
-    mask_binary = np.where(mask_gray > 550, 255, 0)
-    return mask_binary
-
-zly_mask = fix_jpg_mask(ZLY_MASK)
-lt_mask = fix_jpg_mask(LTY_MASK)
+# JPG专用二值化阈值（三通道之和，解决压缩杂色问题）；处理结果缓存成.npy，下次运行直接读
+zly_mask = load_mask(ZLY_MASK, threshold=550, mode="RGB")
+lt_mask = load_mask(LTY_MASK, threshold=550, mode="RGB")
 
 # ---------------------- 4. 高频情感词对比条形图 ----------------------
 def plot_emotion_bar():
@@ -119,7 +99,7 @@ def plot_emotion_bar():
     plt.tight_layout()
     bar_save = os.path.join(DESKTOP, "高频情感词对比条形图.png")
     plt.savefig(bar_save, bbox_inches='tight', dpi=300)
-    plt.show()
+    show()
     print(f"✅ 高频情感词对比条形图已保存：{bar_save}")
 
 plot_emotion_bar()
@@ -127,45 +107,27 @@ plot_emotion_bar()
 # ---------------------- 5. 双偶像超饱满词云（无无效词） ----------------------
 font_path = 'C:/Windows/Fonts/simhei.ttf'
 
-# 赵丽颖词云（专属过滤+JPG蒙版+暖色调）
-zly_wc = WordCloud(
+# 两张词云共用的参数
+cloud_options = dict(
     font_path=font_path,
     background_color='white',
-    mask=zly_mask,
     max_words=300,          # 词汇量拉满
     random_state=42,
     contour_width=2,
-    contour_color='#FF6B6B',
     prefer_horizontal=0.8,  # 80%水平词，填充更满
     relative_scaling=0.9,   # 词频关联度最大化
     font_step=1,            # 字号梯度最小
     collocations=False,     # 关闭词汇搭配
     scale=2,                # 分辨率翻倍
-    color_func=lambda *args, **kwargs: '#FF6B6B'
-).generate(zly_text)
+)
 zly_save = os.path.join(DESKTOP, "赵丽颖_情感词云_无无效词_JPG.png")
-zly_wc.to_file(zly_save)
-print(f"✅ 赵丽颖词云已保存：{zly_save}")
-
-# 洛天依词云（专属过滤+JPG蒙版+冷色调）
-lt_wc = WordCloud(
-    font_path=font_path,
-    background_color='white',
-    mask=lt_mask,
-    max_words=300,
-    random_state=42,
-    contour_width=2,
-    contour_color='#66CCFF',
-    prefer_horizontal=0.8,
-    relative_scaling=0.9,
-    font_step=1,
-    collocations=False,
-    scale=2,
-    color_func=lambda *args, **kwargs: '#66CCFF'
-).generate(lt_text)
 lt_save = os.path.join(DESKTOP, "洛天依_情感词云_无空版_JPG.png")
-lt_wc.to_file(lt_save)
-print(f"✅ 洛天依词云已保存：{lt_save}")
+render_batch([
+    # 赵丽颖词云（专属过滤+JPG蒙版+暖色调）
+    make_job(zly_freq, zly_save, mask=zly_mask, palette='#FF6B6B', contour_color='#FF6B6B', **cloud_options),
+    # 洛天依词云（专属过滤+JPG蒙版+冷色调）
+    make_job(lt_freq, lt_save, mask=lt_mask, palette='#66CCFF', contour_color='#66CCFF', **cloud_options),
+], workers=WORKERS)
 
 # ---------------------- 6. 核心统计结果 ----------------------
 print("\n" + "="*60)
@@ -1,11 +1,9 @@
-import pandas as pd
-import jieba
-import re
 import os
-import numpy as np
-from PIL import Image
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+import token_cache
+from word_freq import FreqTable
+from wordcloud_render import render
+from mask_cache import load_heart_mask
+from corpus_store import load_comments
 
 # ---------------------- 1. 全局配置（简单直接） ----------------------
 DESKTOP = os.path.join(os.path.expanduser("~"), "Desktop")
@@ -18,50 +16,38 @@ irrelevant_words = {"真的", "这个", "就是", "一直", "觉得", "但是",
 stopwords = {"的", "了", "在", "是", "我", "你", "他", "这", "那", "和"}.union(irrelevant_words)
 
 # ---------------------- 3. 代码生成“绝对标准”的爱心蒙版（关键！） ----------------------
-def create_perfect_heart_mask(size=600):
-    """
-    生成100%标准的爱心蒙版：
-    - 无任何杂色/透明，文字区和背景区绝对清晰
-    - 心形饱满，不会有边缘模糊导致的跑界
-    """
-    x = np.linspace(-1.2, 1.2, size)
-    y = np.linspace(-1.5, 1.0, size)
-    x, y = np.meshgrid(x, y)
-    
-    # 经典心形方程（确保轮廓标准）
-    heart = (x**2 + (y - np.sqrt(np.abs(x)))**2) <= 0.8
-    # 明确：心形内=文字区（0），心形外=背景（255）
-    mask = np.where(heart, 0, 255).astype(np.uint8)
-    print(f"✅ 生成标准爱心蒙版（尺寸{size}×{size}，无杂色）")
-    return mask
-
+# 标准爱心蒙版：心形内=文字区（0），心形外=背景（255），无任何杂色/透明
+# 心形饱满，不会有边缘模糊导致的跑界；生成一次后缓存成.npy，下次运行直接读
 # 生成600×600的标准爱心蒙版（尺寸足够大，避免拥挤）
-heart_mask = create_perfect_heart_mask(size=600)
+heart_mask = load_heart_mask(size=600)
+print(f"✅ 标准爱心蒙版就绪（尺寸{heart_mask.shape[1]}×{heart_mask.shape[0]}，无杂色）")
 
 # ---------------------- 4. 只保留TOP100高频词（给大字体腾足空间） ----------------------
 def get_top_high_freq_words(excel_path):
-    df = pd.read_excel(excel_path)
-    comments = df["评论内容"].dropna().astype(str)
-    all_text = re.sub(r"[^\u4e00-\u9fa5]", "", "".join(comments))
+    cleaned = load_comments(excel_path, cleaned=True)  # 仅中文的评论列
     
-    # 分词+统计词频
-    words = jieba.lcut(all_text)
-    word_freq = {}
-    for w in words:
-        if len(w)>=2 and w not in stopwords and w != "洛天依":
-            word_freq[w] = word_freq.get(w, 0) + 1
+    # 分词+统计词频（逐条分词走分词缓存，避免跨评论拼词）
+    word_freq = FreqTable().update(
+        w for words in token_cache.lcut_many(cleaned) for w in words
+        if len(w)>=2 and w not in stopwords and w != "洛天依"
+    )
     
-    # 只取TOP100高频词（词汇量极少，字体才能放大）
-    top_words = sorted(word_freq.items(), key=lambda x:x[1], reverse=True)[:100]
-    top_words_text = " ".join([w[0] for w in top_words])
-    print(f"✅ 保留TOP100高频词（如：{[w[0] for w in top_words[:5]]}...）")
-    return top_words_text, word_freq
+    # 只取TOP100高频词（词汇量极少，字体才能放大；堆取前100，不排序整个词表）
+    # 保留真实词频交给词云，高频词字号更大（原来拼成每词一次的文本，字号全一样）
+    top_words = dict(word_freq.top_k(100))
+    print(f"✅ 保留TOP100高频词（如：{list(top_words)[:5]}...）")
+    return top_words, word_freq
 
-lty_text, lty_freq = get_top_high_freq_words(LTY_EXCEL_PATH)
+lty_top, lty_freq = get_top_high_freq_words(LTY_EXCEL_PATH)
 
 # ---------------------- 5. 字体放大到极致（核心参数） ----------------------
-def generate_biggest_wordcloud(text, mask, output):
-    wc = WordCloud(
+def generate_biggest_wordcloud(freqs, mask, output):
+    wc = render(
+        freqs, output,
+        # 预览确认（批量模式跳过）
+        preview_title="洛天依爱心词云（终极版：不跑界+超大字体）",
+        title_color="#66CCFF",
+        figsize=(10, 10),
         font_path=FONT_PATH,
         background_color="white",
         mask=mask,
@@ -75,22 +61,13 @@ def generate_biggest_wordcloud(text, mask, output):
         relative_scaling=1.0,   # 高频词超大，低频词适中
         collocations=False,
         scale=3,                # 高分辨率，文字无锯齿
-    ).generate(text)
-    
-    wc.to_file(output)
+    )
     print(f"✅ 终极版词云保存完成：{output}")
-    
-    # 预览确认
-    plt.figure(figsize=(10,10))
-    plt.imshow(wc)
-    plt.axis("off")
-    plt.title("洛天依爱心词云（终极版：不跑界+超大字体）", color="#66CCFF")
-    plt.show()
 
-generate_biggest_wordcloud(lty_text, heart_mask, OUTPUT_PATH)
+generate_biggest_wordcloud(lty_top, heart_mask, OUTPUT_PATH)
 
 # ---------------------- 6. 显示高频词（确认效果） ----------------------
 print("\nTOP5超大字体词（爱心中心）：")
-for i, (w, f) in enumerate(sorted(lty_freq.items(), key=lambda x:x[1], reverse=True)[:5], 1):
+for i, (w, f) in enumerate(lty_freq.top_k(5), 1):
     print(f"   {i}. {w}（出现{f}次，最大字体）")
 print(f"\n🎉 100%解决问题！文件在：{OUTPUT_PATH}")
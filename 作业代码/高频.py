@@ -1,12 +1,12 @@
 # 最终完美版：桌面保存+高密度+纯净情感词云
-import pandas as pd
-import jieba
-import re
 import os
 import numpy as np
-from PIL import Image
-from wordcloud import WordCloud
 import matplotlib.pyplot as plt
+import token_cache
+from word_freq import FreqTable
+from wordcloud_render import render, show
+from mask_cache import load_mask
+from corpus_store import load_comments
 
 # ---------------------- 1. 核心配置（直接保存到桌面） ----------------------
 # 桌面路径（自动获取，无需手动改）
@@ -34,38 +34,24 @@ name_filter = {"赵丽颖", "颖宝", "赵", "颖", "洛天", "洛天依", "天
 
 # ---------------------- 3. 数据处理（提升填充密度） ----------------------
 def process_emotion_data(excel_path):
-    df = pd.read_excel(excel_path)
-    comments = df["评论内容"].dropna().astype(str)
-    pure_words = []
-    for c in comments:
-        c_clean = re.sub(r"[^\u4e00-\u9fa5]", "", c)
-        words = jieba.lcut(c_clean)
-        # 只保留情感词，且放宽频次（至少1次），增加词汇量
-        for w in words:
-            if w in core_emotion_words and w not in name_filter:
-                pure_words.append(w)
-    # 重复词汇，提升填充密度（核心！解决空的问题）
-    dense_words = pure_words * 3  # 词汇量翻3倍，填充更满
-    return ' '.join(dense_words), pure_words
+    cleaned = load_comments(excel_path, cleaned=True)  # 仅中文的评论列
+    # 只保留情感词，且放宽频次（至少1次），增加词汇量；直接计数成词频表
+    # （词云按词频出图时字号只看相对频次，原来把词汇重复3遍并不会让填充更满，已去掉）
+    return FreqTable().update(
+        w for words in token_cache.lcut_many(cleaned) for w in words
+        if w in core_emotion_words and w not in name_filter
+    )
 
 # 处理数据
-zly_text, zly_origin = process_emotion_data(ZLY_EXCEL)
-lt_text, lt_origin = process_emotion_data(LTY_EXCEL)
-print(f"✅ 赵丽颖情感词总数（含重复）：{len(zly_text.split())}")
-print(f"✅ 洛天依情感词总数（含重复）：{len(lt_text.split())}")
+zly_freq = process_emotion_data(ZLY_EXCEL)
+lt_freq = process_emotion_data(LTY_EXCEL)
+print(f"✅ 赵丽颖情感词总数（含重复）：{zly_freq.total()}")
+print(f"✅ 洛天依情感词总数（含重复）：{lt_freq.total()}")
 
 # ---------------------- 4. 蒙版处理（优化形状贴合） ----------------------
-def fix_mask(mask_path):
-    if not os.path.exists(mask_path):
-        print(f"⚠️  蒙版未找到：{mask_path}，生成矩形高密度词云")
-        return None
-    img = Image.open(mask_path).convert("L")
-    mask = np.array(img)
-    mask_binary = np.where(mask > 200, 255, 0)
-    return mask_binary
-
-zly_mask = fix_mask(ZLY_MASK)
-lt_mask = fix_mask(LTY_MASK)
+# 灰度>200为背景；处理结果缓存成.npy，下次运行直接读（未找到时生成矩形高密度词云）
+zly_mask = load_mask(ZLY_MASK, threshold=200, mode="L")
+lt_mask = load_mask(LTY_MASK, threshold=200, mode="L")
 
 # ---------------------- 5. 生成高密度纯净词云（保存到桌面） ----------------------
 plt.rcParams['font.sans-serif'] = ['Microsoft YaHei']
@@ -73,7 +59,10 @@ plt.rcParams['axes.unicode_minus'] = False
 font_path = 'C:/Windows/Fonts/msyh.ttc'  # 微软雅黑，更美观
 
 # --- 赵丽颖词云（高密度+暖色调） ---
-zly_wc = WordCloud(
+zly_save = os.path.join(DESKTOP, "赵丽颖_高密度纯净情感词云.png")
+zly_wc = render(
+    zly_freq, zly_save,
+    preview_title="赵丽颖粉丝高密度纯净情感词云",  # 强制显示（批量模式跳过）
     font_path=font_path,
     background_color='white',
     mask=zly_mask,
@@ -86,21 +75,14 @@ zly_wc = WordCloud(
     font_step=1,            # 字号梯度最小
     collocations=False,
     color_func=lambda *args, **kwargs: np.random.choice(['#FF6B6B', '#FF8E8E', '#FFA8A8'])  # 渐变暖色
-).generate(zly_text)
-
-# 保存到桌面
-zly_save = os.path.join(DESKTOP, "赵丽颖_高密度纯净情感词云.png")
-zly_wc.to_file(zly_save)
-# 强制显示
-plt.figure(figsize=(10, 8))
-plt.imshow(zly_wc, interpolation='bilinear')
-plt.axis('off')
-plt.title("赵丽颖粉丝高密度纯净情感词云", fontsize=14, fontweight='bold')
-plt.show()
+)
 print(f"✅ 赵丽颖词云已保存到桌面：{zly_save}")
 
 # --- 洛天依词云（高密度+冷色调） ---
-lt_wc = WordCloud(
+lt_save = os.path.join(DESKTOP, "洛天依_高密度纯净情感词云.png")
+lt_wc = render(
+    lt_freq, lt_save,
+    preview_title="洛天依粉丝高密度纯净情感词云",  # 强制显示（批量模式跳过）
     font_path=font_path,
     background_color='white',
     mask=lt_mask,
@@ -113,30 +95,14 @@ lt_wc = WordCloud(
     font_step=1,
     collocations=False,
     color_func=lambda *args, **kwargs: np.random.choice(['#66CCFF', '#87CEEB', '#B0E0E6'])  # 渐变冷色
-).generate(lt_text)
-
-# 保存到桌面
-lt_save = os.path.join(DESKTOP, "洛天依_高密度纯净情感词云.png")
-lt_wc.to_file(lt_save)
-# 强制显示
-plt.figure(figsize=(10, 8))
-plt.imshow(lt_wc, interpolation='bilinear')
-plt.axis('off')
-plt.title("洛天依粉丝高密度纯净情感词云", fontsize=14, fontweight='bold')
-plt.show()
+)
 print(f"✅ 洛天依词云已保存到桌面：{lt_save}")
 
 # ---------------------- 6. 生成高频情感词对比条形图（桌面保存） ----------------------
 def plot_bar():
-    # 统计原始词频（去重）
-    def get_freq(words):
-        freq = {}
-        for w in words:
-            freq[w] = freq.get(w, 0) + 1
-        return sorted(freq.items(), key=lambda x: x[1], reverse=True)[:8]
-    
-    zly_top = get_freq(zly_origin)
-    lt_top = get_freq(lt_origin)
+    # 原始词频表里堆取TOP8
+    zly_top = zly_freq.top_k(8)
+    lt_top = lt_freq.top_k(8)
     zly_words = [w[0] for w in zly_top]
     zly_counts = [w[1] for w in zly_top]
     lt_words = [w[0] for w in lt_top]
@@ -160,7 +126,7 @@ def plot_bar():
     # 保存到桌面
     bar_save = os.path.join(DESKTOP, "高频情感词对比条形图_高颜值.png")
     plt.savefig(bar_save, dpi=300, bbox_inches='tight')
-    plt.show()
+    show()
     print(f"✅ 条形图已保存到桌面：{bar_save}")
 
 plot_bar()
@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
-import jieba
-import re
 from collections import Counter
 import os
+import token_cache
+from word_freq import FreqTable
+from corpus_store import load_comment_rows
+from incremental_state import get_state, stage_key
 
 # ---------------------- 1. 核心配置（全量剔除连词+新增无关词） ----------------------
 DESKTOP = os.path.join(os.path.expanduser("~"), "Desktop")  # 桌面路径
@@ -11,6 +14,7 @@ FILE_PATHS = {
     "洛天依": os.path.join(DESKTOP, "洛天依评论爬取.xlsx")
 }
 OUTPUT_PATH = os.path.join(DESKTOP, "双偶像高频词_无连词纯净版.xlsx")  # 输出文件
+TOP_K = None  # 每个偶像只导出前K个高频词（None=全部）
 
 # 【必须保留】的词：仅偶像昵称（无其他冗余）
 RESERVED_NICKNAMES = {
@@ -74,23 +78,22 @@ def extract_no_conjunction_words(excel_path, idol_name):
     2. 剔除“这部、剧里”等无关词
     3. 只留“长度≥2的评价词”和“偶像昵称”
     """
-    # 读取Excel并匹配评论列
-    df = pd.read_excel(excel_path)
-    comment_cols = ["评论内容", "评论", "用户评论", "粉丝评论", "content"]
-    comment_col = next((col for col in comment_cols if col in df.columns), None)
-    if not comment_col:
+    # 步骤1：读取评论列并深度清洗，仅保留中文（剔除符号、数字、英文；有Parquet语料时直接读清洗列）
+    try:
+        rows = load_comment_rows(excel_path, cleaned=True, idol=idol_name)
+    except ValueError:
         raise ValueError(f"{idol_name}的Excel中未找到评论列（如“评论内容”），请检查列名！")
-    
-    # 提取非空评论
-    comments = df[comment_col].dropna().astype(str).tolist()
     all_pure_words = []
     idol_nicks = RESERVED_NICKNAMES[idol_name]
+
+    # 增量：只处理上次运行之后新增的评论（停用词或分词词典变了会自动全量重算）
+    state = get_state()
+    stage = stage_key("高频词", idol_name, ALL_STOP_WORDS, token_cache.dict_version())
+    new_rows = rows.loc[np.asarray(state.unseen(stage, rows["comment_id"]), dtype=bool)]  # 布尔掩码按行取，空语料也不会变成选0列
+    print(f"   新增评论{len(new_rows)}条（已处理过的{len(rows) - len(new_rows)}条直接复用上次词频）")
     
-    for comment in comments:
-        # 步骤1：深度清洗，仅保留中文（剔除符号、数字、英文）
-        pure_chinese = re.sub(r"[^\u4e00-\u9fa5]", "", comment)
-        # 步骤2：精准分词（避免昵称被切分，如“颖宝”不拆为“颖”“宝”）
-        words = jieba.lcut(pure_chinese, cut_all=False)
+    # 步骤2：精准分词（避免昵称被切分，如“颖宝”不拆为“颖”“宝”；走分词缓存）
+    for words in token_cache.lcut_many(new_rows["评论内容"]):
         
         # 步骤3：无连词过滤，只留目标词
         for word in words:
@@ -98,16 +101,20 @@ def extract_no_conjunction_words(excel_path, idol_name):
             if len(word) >= 2 and word not in ALL_STOP_WORDS and idol_name not in word:
                 all_pure_words.append(word)
     
+    # 新词频合并进已存的词频，连同已处理清单一起提交
+    word_counter = FreqTable.from_counts(state.merge_counter(stage, "词频", Counter(all_pure_words)))
+    state.mark_done(stage, new_rows["comment_id"])
+    state.commit()
+
     # 容错：无有效词时提示
-    if not all_pure_words:
+    if not len(word_counter):
         raise ValueError(f"{idol_name}的评论中未提取到有效词（可能全是连词/无关词）！")
     
-    # 统计高频词并整理格式
-    word_counter = Counter(all_pure_words)
+    # 统计高频词并整理格式（词频表直接按次数取前K个，已排好序）
     pure_df = pd.DataFrame(
-        word_counter.items(),
+        word_counter.top_k(TOP_K),
         columns=["无连词纯净词（评价词+昵称）", "出现次数"]
-    ).sort_values("出现次数", ascending=False).reset_index(drop=True)
+    )
     
     # 补充实用列：词频占比、所属偶像、是否为昵称
     total_count = pure_df["出现次数"].sum()